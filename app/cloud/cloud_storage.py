@@ -90,3 +90,22 @@ class CloudStorageClient:
         bucket = self.storage_client.bucket(self.bucket_name)
         blob = bucket.blob(blob_name)
         return BytesIO(blob.download_as_bytes())
+
+    def get_generation(self, blob_name):
+        """
+        Returns the generation of a file, which changes every time it is
+        overwritten.
+
+        Args:
+            blob_name (str): The name/path of the file.
+
+        Returns:
+            int: The blob generation.
+
+        Raises:
+            google.cloud.exceptions.NotFound: If the file doesn't exist.
+        """
+        bucket = self.storage_client.bucket(self.bucket_name)
+        blob = bucket.blob(blob_name)
+        blob.reload()
+        return blob.generation
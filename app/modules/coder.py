@@ -72,7 +72,7 @@ def generate_open_ended_db(temp_file_name_xlsx: str, temp_file_name_sav: str):
 
     metadata = pyreadstat.read_sav(
         temp_file_name_sav,
-        apply_value_formats=False
+        metadataonly=True
     )[1]
 
     df = (
@@ -0,0 +1,152 @@
+import os
+import re
+import json
+import sqlite3
+import hashlib
+import tempfile
+
+CODING_CACHE_PATH = os.getenv(
+    "CODING_CACHE_PATH", os.path.join(tempfile.gettempdir(), "connecta-coding-cache.db")
+)
+# The default path is on the memory-backed /tmp of the container, so the file
+# is cleared once it grows past this size
+CODING_CACHE_MAX_BYTES = int(os.getenv("CODING_CACHE_MAX_MB", 32)) * 1024 * 1024
+
+# SQLite's default limit of host parameters in a single statement
+_QUERY_CHUNK = 500
+
+
+def normalize_answer(answer) -> str:
+    """
+    Normalizes an open ended answer so trivially different spellings ("bueno",
+    "Bueno.", "BUENO") share a cache entry. Accents are kept.
+    """
+    answer = re.sub(r"[^\w\s]", " ", str(answer).casefold())
+    return " ".join(answer.split())
+
+
+def hash_text(*texts) -> str:
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(str(text).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def hash_codebook(codebook: dict) -> str:
+    return hash_text(json.dumps(sorted(codebook.items()), default=str))
+
+
+class CodingCache:
+    """
+    Local SQLite store of the codes the model gave to normalized answers.
+
+    Entries are keyed by the normalized answer, the codebook hash, the model
+    and the prompt version, so changing any of them only misses the affected
+    answers. A connection is bound to the thread that opens the cache.
+
+    The cache is best effort: SQLite errors (e.g. a database locked by another
+    session) are reported and the coding goes on without caching. Entries are
+    dropped all at once when the file outgrows `max_bytes`.
+
+    Args:
+        path (str): SQLite database file.
+        max_bytes (int): Size of the file above which the cache is cleared.
+    """
+
+    def __init__(
+        self, path: str = CODING_CACHE_PATH, max_bytes: int = CODING_CACHE_MAX_BYTES
+    ):
+        self._connection = None
+        try:
+            connection = sqlite3.connect(path)
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS coding_cache (
+                    answer TEXT NOT NULL,
+                    codebook TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    codes TEXT NOT NULL,
+                    PRIMARY KEY (answer, codebook, model, prompt)
+                ) WITHOUT ROWID
+                """
+            )
+            connection.commit()
+            if os.path.getsize(path) > max_bytes:
+                connection.execute("DELETE FROM coding_cache")
+                connection.commit()
+                connection.execute("VACUUM")
+        except (sqlite3.Error, OSError) as e:
+            print(f"Coding cache disabled: {e}")
+            return
+
+        self._connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+
+    def get_many(
+        self, answers: list[str], codebook: str, model: str, prompt: str
+    ) -> dict[str, list]:
+        """
+        Returns the cached codes of the given normalized answers.
+
+        Args:
+            answers (list[str]): Normalized answers.
+            codebook (str): Codebook hash.
+            model (str): Model name.
+            prompt (str): Prompt version.
+
+        Returns:
+            dict[str, list]: Codes by normalized answer, for the answers found.
+        """
+        answers = list(answers)
+        cached = {}
+        if self._connection is None:
+            return cached
+
+        try:
+            for start in range(0, len(answers), _QUERY_CHUNK):
+                chunk = answers[start : start + _QUERY_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"""
+                    SELECT answer, codes FROM coding_cache
+                    WHERE codebook = ? AND model = ? AND prompt = ?
+                    AND answer IN ({placeholders})
+                    """,
+                    (codebook, model, prompt, *chunk),
+                )
+                cached.update((answer, json.loads(codes)) for answer, codes in rows)
+        except sqlite3.Error as e:
+            print(f"Error reading the coding cache: {e}")
+
+        return cached
+
+    def put_many(self, codes: dict[str, list], codebook: str, model: str, prompt: str):
+        """
+        Stores the codes of normalized answers, replacing previous entries.
+        """
+        if self._connection is None:
+            return
+
+        try:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO coding_cache VALUES (?, ?, ?, ?, ?)",
+                (
+                    (answer, codebook, model, prompt, json.dumps(answer_codes))
+                    for answer, answer_codes in codes.items()
+                ),
+            )
+            self._connection.commit()
+        except sqlite3.Error as e:
+            self._connection.rollback()
+            print(f"Error writing the coding cache: {e}")
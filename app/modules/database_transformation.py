@@ -1,5 +1,4 @@
 from io import BytesIO
-import tempfile
 
 import re
 from itertools import product
@@ -9,6 +8,8 @@ import numpy as np
 import pandas as pd
 import pyreadstat
 
+from app.modules.utils import temp_file, write_to_buffer
+
 def read_sav_file(filename: str):
     with warnings.catch_warnings():
         warnings.simplefilter("ignore", category=FutureWarning)
@@ -20,7 +21,7 @@ def read_sav_file(filename: str):
 
         metadata = pyreadstat.read_sav(
             filename,
-            apply_value_formats=True
+            metadataonly=True
         )[1]
 
     return db, metadata
@@ -92,31 +93,21 @@ def get_variable_value_labels_final(
 def get_item_by_partial_key(dictionary, partial_key):
     return next((value for key, value in dictionary.items() if key.startswith(partial_key)), None)
 
-def get_temp_file(file: BytesIO):
-    # Save BytesIO object to a temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-        tmp_file.write(file.getvalue())
-        temp_file_name = tmp_file.name
-
-    return temp_file_name
-
 def write_temp_sav(df: pd.DataFrame, column_labels: dict[str, str], variable_value_labels: dict[str, str]):
-    with tempfile.NamedTemporaryFile() as tmpfile:
-        # Write the DataFrame to the temporary SPSS file
-        pyreadstat.write_sav(
+    return write_to_buffer(
+        lambda file_name: pyreadstat.write_sav(
             df,
-            tmpfile.name,
+            file_name,
             column_labels=column_labels,
             variable_value_labels=variable_value_labels
-        )
-
-        with open(tmpfile.name, 'rb') as f:
-            return BytesIO(f.read())
+        ),
+        '.sav'
+    )
 
 
 def transform_database(sav_file: BytesIO, visit_names: list[str]):
-    temp_file_name_sav = get_temp_file(sav_file)
-    db, metadata = read_sav_file(temp_file_name_sav)
+    with temp_file(sav_file) as temp_file_name_sav:
+        db, metadata = read_sav_file(temp_file_name_sav)
 
     questions = get_questions(metadata, 'P')
     filter_questions = get_questions(metadata, 'F')
@@ -0,0 +1,110 @@
+from functools import lru_cache
+
+from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
+
+# Named styles shared by every generated workbook. openpyxl styles are
+# immutable, so a single instance can be assigned to any number of cells.
+
+
+def solid_fill(color: str) -> PatternFill:
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+RED_FILL = solid_fill("C80000")
+YELLOW_FILL = solid_fill("FFFF00")
+BLUE_FILL = solid_fill("C5D9F1")
+GRAY_FILL = solid_fill("DBDBDB")
+GREEN_TITLE_FILL = solid_fill("70AD47")
+
+KPI_GRAY_FILL = solid_fill("BFBFBF")
+KPI_GREEN_FILL = solid_fill("D8E4BC")
+KPI_RED_FILL = solid_fill("E6B8B7")
+
+INDEX_HEADER_FILL = PatternFill("solid", fgColor="F79646")
+INDEX_SECTIONS_FILL = PatternFill("solid", fgColor="FCD5B4")
+INDEX_SUBSECTIONS_FILL = PatternFill("solid", fgColor="FDE9D9")
+
+THIN = Side(style="thin")
+MEDIUM = Side(style="medium")
+THICK = Side(style="thick")
+
+MEDIUM_BORDER = Border(left=MEDIUM, right=MEDIUM, top=MEDIUM, bottom=MEDIUM)
+THIN_BORDER = Border(left=THIN, right=THIN, top=THIN, bottom=THIN)
+THIN_TOP_BOTTOM_BORDER = Border(top=THIN, bottom=THIN)
+THIN_BOTTOM_BORDER = Border(bottom=THIN)
+THICK_TOP_BORDER = Border(top=THICK)
+THICK_BOTTOM_BORDER = Border(bottom=THICK)
+
+BOLD_FONT = Font(bold=True)
+WHITE_FONT = Font(color="FFFFFF")
+LINK_FONT = Font(color="0000EE", underline="single")
+INDEX_TITLE_FONT = Font(bold=True, color="FFFFFF", size=14)
+HIGHLY_SIGNIFICANT_FONT = Font(color="000BDB")
+SIGNIFICANT_FONT = Font(color="FFC179")
+
+CENTER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+CENTER_HORIZONTAL_ALIGNMENT = Alignment(horizontal="center")
+CENTER_TOP_ALIGNMENT = Alignment(horizontal="center", vertical="top")
+TOP_WRAP_ALIGNMENT = Alignment(vertical="top", wrap_text=True)
+TOP_LEFT_WRAP_ALIGNMENT = Alignment(
+    horizontal="left", vertical="top", wrap_text=True
+)
+WRAP_ALIGNMENT = Alignment(wrap_text=True)
+CENTER_WRAP_ALIGNMENT = Alignment(
+    horizontal="center", vertical="center", wrap_text=True
+)
+
+
+@lru_cache(maxsize=None)
+def sides_border(left=None, right=None, top=None, bottom=None) -> Border:
+    """
+    Returns the shared Border for a combination of sides, so cells styled
+    side by side reuse one object instead of building a new one each.
+    """
+    return Border(left=left, right=right, top=top, bottom=bottom)
+
+
+_STYLE_ATTRIBUTES = {
+    "font": ("_fonts", "fontId"),
+    "fill": ("_fills", "fillId"),
+    "border": ("_borders", "borderId"),
+    "alignment": ("_alignments", "alignmentId"),
+}
+
+
+def style_range(
+    worksheet,
+    min_row: int,
+    min_col: int,
+    max_row: int,
+    max_col: int,
+    **styles,
+):
+    """
+    Applies the same font, fill, border and/or alignment to every cell of a
+    rectangular range.
+
+    Each style is registered in the workbook style tables once and the
+    resulting ids are stamped onto the cells, instead of hashing and looking
+    up the style object again for every single cell.
+
+    Args:
+        worksheet: openpyxl worksheet to style.
+        min_row, min_col, max_row, max_col: 1-based inclusive range bounds.
+        **styles: Any of `font`, `fill`, `border` or `alignment`.
+    """
+    if min_row > max_row or min_col > max_col:
+        return
+
+    workbook = worksheet.parent
+    style_ids = []
+    for attribute, style in styles.items():
+        collection, key = _STYLE_ATTRIBUTES[attribute]
+        style_ids.append((key, getattr(workbook, collection).add(style)))
+
+    for row in worksheet.iter_rows(
+        min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col
+    ):
+        for cell in row:
+            for key, style_id in style_ids:
+                setattr(cell._style, key, style_id)
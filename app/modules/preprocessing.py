@@ -1,19 +1,29 @@
+import os
 from json import JSONDecoder
 import re
 
-# from concurrent.futures import ThreadPoolExecutor
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import numpy as np
 import pandas as pd
 import pyreadstat
 
 import streamlit as st
-from streamlit.runtime.scriptrunner import add_script_run_ctx
-# from streamlit.runtime.scriptrunner.script_run_context import get_script_run_ctx
 
 from app.cloud import LLM
+from app.modules.coding_cache import (
+    CodingCache,
+    hash_codebook,
+    hash_text,
+    normalize_answer,
+)
 
+# Requests sent to the model at the same time, across all questions
+CODING_WORKERS = int(os.getenv("CODING_WORKERS", 4))
+# Approximate prompt tokens of the answers sent in a single request
+CODING_BATCH_TOKENS = int(os.getenv("CODING_BATCH_TOKENS", 4000))
+
+SYSTEM_PROMPT = "You are a highly skilled NLP model that classifies open ended answers of surveys into categories. You only respond with python dictionary objects."
 
 # Function to expand lists/tuples into columns
 def expand_lists(row, max_len):
@@ -140,7 +150,7 @@ def generate_open_ended_db(results: dict, temp_file_name_sav: str):
         temp_file_name_sav, apply_value_formats=False
     )[0]
 
-    metadata = pyreadstat.read_sav(temp_file_name_sav, apply_value_formats=False)[1]
+    metadata = pyreadstat.read_sav(temp_file_name_sav, metadataonly=True)[1]
 
     db_string_df = get_string_columns(db)
 
@@ -259,78 +269,76 @@ def calculate_timeout(num_answers, base_time=50, rate=2.25):
     return base_time + (num_answers * rate)
 
 
-def process_question(
-    question: str,
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count of a text, at about four characters per token.
+    """
+    return len(text) // 4 + 1
+
+
+def split_answers(survey_data: dict, max_tokens: int = CODING_BATCH_TOKENS):
+    """
+    Splits the answers of a question into batches whose prompt text stays
+    under `max_tokens`. An answer longer than the limit gets a batch of its
+    own.
+
+    Args:
+        survey_data (dict): Answers keyed by `question_id-Response_ID`.
+        max_tokens (int): Approximate token budget of a batch.
+
+    Returns:
+        list[dict]: The batches, in the original answer order.
+    """
+    batches = []
+    batch, batch_tokens = {}, 0
+    for answer_id, answer in survey_data.items():
+        tokens = estimate_tokens(f"{answer_id!r}: {answer!r}, ")
+        if batch and batch_tokens + tokens > max_tokens:
+            batches.append(batch)
+            batch, batch_tokens = {}, 0
+        batch[answer_id] = answer
+        batch_tokens += tokens
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+def code_batch(
+    batch: dict,
+    codebook: dict,
     prompt_template: str,
-    answers: dict,
-    code_books: dict,
     model: LLM,
-    ui_container,
-    results: dict,
 ):
-    ui_container.info(f"Coding question: `{question}`")
-
-    response_info = {}
-    try:
-        question_answer = [
-            question_answer
-            for question_answer in answers.keys()
-            if question_answer.split("_")[0] == question
-        ][0]
-    except Exception as e:
-        ui_container.error(f"Error in format question `{question}`: {e}")
-
-    if answers[question_answer].empty:
-        ui_container.warning(f"No answers to code for question: `{question}`")
-        return {
-            "coding_results": pd.DataFrame(),
-            "status_code": None,
-            "elapsed_time": None,
-            "usage": None,
-            "retries": None,
-        }
+    """
+    Codes one batch of answers of a question.
 
-    user_prompt = prompt_template.format(
-        survey_data={
-            row["question_id-Response_ID"]: row["answer"]
-            for _, row in answers[question_answer].iterrows()
-        },
-        codebook={
-            row["code_id"]: row["code_text"]
-            for _, row in code_books[question].iterrows()
-        },
-    )
-    timeout = calculate_timeout(len(answers[question_answer]))
-
-    st.info(f"Coding question `{question}`")
-    try:
-        response, elapsed_time, retries = model.send(
-            system_prompt="You are a highly skilled NLP model that classifies open ended answers of surveys into categories. You only respond with python dictionary objects.",
-            user_prompt=user_prompt,
-            timeout=timeout,
-        )
-    except Exception as e:
-        ui_container.error(f"Error in request for question `{question}`: {e}")
+    Args:
+        batch (dict): Answers keyed by `question_id-Response_ID`.
+        codebook (dict): Code texts keyed by code id.
+        prompt_template (str): Template with `survey_data` and `codebook` fields.
+        model (LLM): Model client.
 
-    formatted_time = format_time(elapsed_time)
+    Returns:
+        tuple: The coding DataFrame, the response usage, the request elapsed
+            time and the retries.
+    """
+    user_prompt = prompt_template.format(survey_data=batch, codebook=codebook)
 
-    response_json = response.json()
+    response, elapsed_time, retries = model.send(
+        system_prompt=SYSTEM_PROMPT,
+        user_prompt=user_prompt,
+        timeout=calculate_timeout(len(batch)),
+    )
 
-    response_info["status_code"] = response.status_code
-    response_info["retries"] = retries
+    response_json = response.json()
 
     if response.status_code != 200:
-        ui_container.error(
-            f"Model response unsuccessfull for question: `{question}` with status code {response.status_code}. JSON response: {response_json}"
-        )
         raise ValueError(
-            f"Model response unsuccessfull for question: `{question}` with status code {response.status_code}. JSON response: {response_json}"
+            f"Model response unsuccessfull with status code {response.status_code}. JSON response: {response_json}"
         )
 
-    response_info["elapsed_time"] = formatted_time
-
-    response_info["usage"] = response_json["usage"]
-
     coding_dict = (
         response_json["choices"][0]["message"]["content"]
         .replace("json", "")
@@ -339,26 +347,11 @@ def process_question(
         .replace("'", '"')
     )
 
-    try:
-        # Extract and validate the JSON string
-        coding_result = extract_json_string(coding_dict)[0]
-
-        if not coding_result:
-            print(f"Failed to extract JSON for question {question}")
-            response_info["error"] = "Failed to extract valid JSON"
-            response_info["coding_results_raw"] = coding_dict
-            # ui_container.write(response_info['coding_results_raw'])
-            return response_info
-
-    except Exception as e:
-        response_info["coding_results_raw"] = coding_dict
-        # with open(f"coding_dict_raw_{question}.txt", "w") as file:
-        #     file.write(coding_dict)
-        ui_container.error(
-            f"Error parsing Llama response to JSON for question `{question}`: {e}"
-        )
-        ui_container.write(coding_dict)
-        return response_info
+    # Extract and validate the JSON string
+    coding_results = extract_json_string(coding_dict)
+    if not coding_results or not coding_results[0]:
+        raise ValueError(f"Failed to extract valid JSON from response: {coding_dict}")
+    coding_result = coding_results[0]
 
     coding_df = pd.DataFrame(
         {
@@ -370,15 +363,247 @@ def process_question(
     # Check if the column 'A' is of type int
     if pd.api.types.is_integer_dtype(coding_df["codes"]):
         # Replace each integer in the column with a list containing that integer
-        coding_df["codes"] = coding_df["codes"].apply(lambda x: [x])
+        coding_df["codes"] = [[x] for x in coding_df["codes"].tolist()]
 
-    response_info["coding_results"] = coding_df
+    return coding_df, response_json["usage"], elapsed_time, retries
 
-    results[question] = response_info
 
-    ui_container.success(f"Model response successfull for question: `{question}`")
+def merge_usage(total: dict, usage: dict) -> dict:
+    for key, value in usage.items():
+        if isinstance(value, (int, float)):
+            total[key] = total.get(key, 0) + value
+    return total
 
-    # return response_info
+
+def get_question_batches(
+    questions,
+    answers: dict[str, pd.DataFrame],
+    code_books: dict[str, pd.DataFrame],
+    ui_containers: dict,
+    cache: CodingCache,
+    model_name: str,
+    prompt_version: str,
+    max_tokens: int = CODING_BATCH_TOKENS,
+):
+    """
+    Groups the answers of every question by their normalized text, takes the
+    codes of already coded answers from the cache and splits the remaining
+    ones into prompt sized batches, with a single answer per normalized text.
+
+    Returns:
+        tuple: The coding plan of each question (codebook, codebook hash,
+            answer ids by normalized answer, the normalized answer of each
+            answer sent and the codes known so far) and the
+            `(question, batch)` pairs to code.
+    """
+    plans = {}
+    batches = []
+    for question in questions:
+        question_answer = next(
+            (
+                question_answer
+                for question_answer in answers.keys()
+                if question_answer.split("_")[0] == question
+            ),
+            None,
+        )
+        if question_answer is None:
+            ui_containers[question].error(
+                f"Error in format question `{question}`: no open ended answers found"
+            )
+            continue
+
+        if answers[question_answer].empty:
+            ui_containers[question].warning(
+                f"No answers to code for question: `{question}`"
+            )
+            continue
+
+        answer_ids = {}
+        representatives = {}
+        survey_data = {}
+        for answer_id, answer in zip(
+            answers[question_answer]["question_id-Response_ID"],
+            answers[question_answer]["answer"],
+        ):
+            normalized = normalize_answer(answer)
+            if normalized not in answer_ids:
+                answer_ids[normalized] = []
+                representatives[answer_id] = normalized
+                survey_data[answer_id] = answer
+            answer_ids[normalized].append(answer_id)
+
+        codebook = dict(
+            zip(
+                code_books[question]["code_id"].tolist(),
+                code_books[question]["code_text"].tolist(),
+            )
+        )
+        codebook_hash = hash_codebook(codebook)
+        cached = cache.get_many(
+            answer_ids.keys(), codebook_hash, model_name, prompt_version
+        )
+
+        plans[question] = {
+            "codebook": codebook,
+            "codebook_hash": codebook_hash,
+            "answer_ids": answer_ids,
+            "representatives": representatives,
+            "codes": cached,
+        }
+
+        survey_data = {
+            answer_id: answer
+            for answer_id, answer in survey_data.items()
+            if representatives[answer_id] not in cached
+        }
+        batches.extend(
+            (question, batch) for batch in split_answers(survey_data, max_tokens)
+        )
+
+    return plans, batches
+
+
+def code_questions(
+    questions,
+    prompt_template: str,
+    answers: dict[str, pd.DataFrame],
+    code_books: dict[str, pd.DataFrame],
+    model: LLM,
+    ui_containers: dict,
+    max_workers: int = CODING_WORKERS,
+):
+    """
+    Codes the answers of every question in token bounded batches, with at most
+    `max_workers` requests in flight. Answers already coded with the same
+    codebook, model and prompt are taken from the coding cache, and answers
+    repeated within a question are sent only once. Batches of the same
+    question are merged back into a single result; a question with any failed
+    batch is left out.
+
+    Returns:
+        dict: Coding results, status code, elapsed time, usage and retries by
+            question.
+    """
+    prompt_version = hash_text(SYSTEM_PROMPT, prompt_template)
+
+    with CodingCache() as cache:
+        plans, batches = get_question_batches(
+            questions,
+            answers,
+            code_books,
+            ui_containers,
+            cache,
+            model.model,
+            prompt_version,
+        )
+
+        pending = {question: 0 for question in plans}
+        for question, _ in batches:
+            pending[question] += 1
+
+        for question, num_batches in pending.items():
+            num_cached = len(plans[question]["codes"])
+            if num_batches:
+                ui_containers[question].info(
+                    f"Coding question: `{question}` (0/{num_batches} batches, {num_cached} answers from cache)"
+                )
+            else:
+                ui_containers[question].success(
+                    f"All answers of question `{question}` coded from cache"
+                )
+
+        partial_results = {
+            question: {
+                "status_code": 200,
+                "elapsed_time": 0,
+                "usage": {},
+                "retries": 0,
+                "done": 0,
+            }
+            for question in plans
+        }
+        failed = set()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    code_batch,
+                    batch,
+                    plans[question]["codebook"],
+                    prompt_template,
+                    model,
+                ): question
+                for question, batch in batches
+            }
+
+            # Streamlit elements and the cache connection are only used from
+            # the script thread
+            for future in as_completed(futures):
+                question = futures[future]
+                plan = plans[question]
+                result = partial_results[question]
+                result["done"] += 1
+
+                try:
+                    coding_df, usage, elapsed_time, retries = future.result()
+                except Exception as e:
+                    failed.add(question)
+                    ui_containers[question].error(
+                        f"Error coding question `{question}`: {e}"
+                    )
+                    continue
+
+                new_codes = {
+                    plan["representatives"][answer_id]: codes
+                    for answer_id, codes in zip(
+                        coding_df["question_id-Response_ID"], coding_df["codes"]
+                    )
+                    if answer_id in plan["representatives"]
+                }
+                plan["codes"].update(new_codes)
+                cache.put_many(
+                    new_codes, plan["codebook_hash"], model.model, prompt_version
+                )
+
+                result["elapsed_time"] += elapsed_time
+                result["retries"] += retries
+                merge_usage(result["usage"], usage)
+
+                if question in failed:
+                    continue
+
+                if result["done"] < pending[question]:
+                    ui_containers[question].info(
+                        f"Coding question: `{question}` ({result['done']}/{pending[question]} batches)"
+                    )
+                else:
+                    ui_containers[question].success(
+                        f"Model response successfull for question: `{question}`"
+                    )
+
+    results = {}
+    for question, result in partial_results.items():
+        if question in failed:
+            continue
+
+        plan = plans[question]
+        coding_results = [
+            (answer_id, codes)
+            for normalized, codes in plan["codes"].items()
+            for answer_id in plan["answer_ids"].get(normalized, [])
+        ]
+        results[question] = {
+            "coding_results": pd.DataFrame(
+                coding_results, columns=["question_id-Response_ID", "codes"]
+            ),
+            "status_code": result["status_code"],
+            "elapsed_time": format_time(result["elapsed_time"]),
+            "usage": result["usage"],
+            "retries": result["retries"],
+        }
+
+    return results
 
 
 def preprocessing(temp_file_name_xlsx: str, temp_file_name_sav: str):
@@ -420,34 +645,8 @@ def preprocessing(temp_file_name_xlsx: str, temp_file_name_sav: str):
 
     model = LLM()
 
-    results = {}
-
-    threads = []
-    containers = []
-    for question in questions:
-        ui_container = st.empty()  # Create an empty placeholder for each thread
-        containers.append(ui_container)
-        t = Thread(
-            target=process_question,
-            args=(
-                question,
-                prompt_template,
-                answers,
-                code_books,
-                model,
-                ui_container,
-                results,
-            ),
-        )
-        add_script_run_ctx(t)  # Necessary for Streamlit to track the thread context
-        threads.append(t)
-        try:
-            t.start()
-            # time.sleep(0.5)
-        except Exception as e:
-            st.error(f"Question {question} generated an exception: {e}")
-            raise ValueError(f"Question {question} generated an exception: {e}")
-    for t in threads:
-        t.join()  # Wait for all threads to finish before continuing
+    ui_containers = {question: st.empty() for question in questions}
 
-    return results
+    return code_questions(
+        questions, prompt_template, answers, code_books, model, ui_containers
+    )
@@ -1,7 +1,11 @@
-import warnings
+import time
+import logging
 from io import BytesIO
+from copy import copy
 import string
 from itertools import product
+from bisect import bisect_left
+from collections import defaultdict
 
 import streamlit as st
 from firebase_admin import firestore
@@ -9,7 +13,8 @@ from google.cloud.firestore_v1.base_query import FieldFilter
 
 import numpy as np
 import pandas as pd
-from statsmodels.stats.proportion import proportions_ztest
+from pandas.io.parsers import TextParser
+from scipy.stats import norm
 
 from openpyxl import Workbook, load_workbook
 from openpyxl.cell.text import InlineFont
@@ -20,7 +25,26 @@ from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.styles import PatternFill, Border, Side, Alignment, Protection, Font
 
 from app.cloud.firestore import create_document
-from app.modules.utils import get_temp_file, write_temp_excel
+from app.modules.excel_styles import (
+    BLUE_FILL,
+    BOLD_FONT,
+    CENTER_HORIZONTAL_ALIGNMENT,
+    RED_FILL,
+    THICK_BOTTOM_BORDER,
+    THICK_TOP_BORDER,
+    THIN_BOTTOM_BORDER,
+    THIN_TOP_BOTTOM_BORDER,
+    TOP_WRAP_ALIGNMENT,
+    YELLOW_FILL,
+    style_range,
+)
+from app.modules.excel_writer import WriteOnlyWorkbook
+from app.modules.utils import (
+    get_temp_file,
+    release_temp_file,
+    worker_pool,
+    write_temp_excel,
+)
 from app.modules.business_definition import (
     get_category_id,
     get_subcategory_id,
@@ -28,6 +52,8 @@ from app.modules.business_definition import (
 
 letters_list = list(string.ascii_uppercase)
 
+logger = logging.getLogger(__name__)
+
 
 @st.cache_data(show_spinner=False)
 def get_question_types():
@@ -79,22 +105,34 @@ def calculate_percentages(
     return percentage_inner_df
 
 
+def two_proportions_pvalues(
+    x1: np.ndarray, x2: np.ndarray, n1: np.ndarray, n2: np.ndarray
+) -> np.ndarray:
+    """
+    Two-sided pooled two-proportion z-test, broadcast over its inputs.
+
+    Same statistic as `statsmodels.stats.proportion.proportions_ztest` with its
+    defaults, but computed for every cell at once instead of one call per cell.
+
+    Returns:
+        np.ndarray: The p-values, `nan` where the test is undefined.
+    """
+    x1, x2, n1, n2 = (np.asarray(value, dtype=float) for value in (x1, x2, n1, n2))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        diff = x1 / n1 - x2 / n2
+        prop = (x1 + x2) / (n1 + n2)
+        std_diff = np.sqrt(prop * (1 - prop) * (1 / n1 + 1 / n2))
+        return norm.sf(np.abs(diff / std_diff)) * 2
+
+
 def calculate_differences(
     x1: int, x2: int, n1: int, n2: int, sigma: float = 0.05
 ) -> bool:
     if n1 < 30 or n2 < 30 or x1 == 0 or x2 == 0 or n1 == 0 or n2 == 0:
         return False
 
-    # Número de éxitos y tamaño de muestra en cada grupo
-    counts = np.array([x1, x2])
-    nobs = np.array([n1, n2])
-
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", category=RuntimeWarning)
-        # Prueba z de dos proporciones
-        _, p_value = proportions_ztest(counts, nobs)
-
-    return p_value < sigma
+    return bool(two_proportions_pvalues(x1, x2, n1, n2) < sigma)
 
 
 def significant_differences(
@@ -102,46 +140,33 @@ def significant_differences(
     data: pd.DataFrame,
     total_index: int,
     letters_inner_dict: dict[str, str],
+    sigma: float = 0.05,
 ) -> pd.DataFrame:
     columns = inner_df.columns
-    n_cols = len(columns)
 
-    inner_differences_df = pd.DataFrame(
-        "", index=inner_df.index, columns=inner_df.columns
-    )
-
-    for i in range(n_cols):
-        for j in range(i + 1, n_cols):
-            col1 = columns[i]
-            col2 = columns[j]
-
-            for index in inner_df.index:
-                x1 = inner_df.at[index, col1]
-                x2 = inner_df.at[index, col2]
-                n1 = data.loc[total_index, col1]
-                n2 = data.loc[total_index, col2]
-
-                if calculate_differences(x1, x2, n1, n2):
-                    if (x1 / n1) > (x2 / n2):
-                        if inner_differences_df.at[index, col1]:
-                            inner_differences_df.at[index, col1] += (
-                                f",{letters_inner_dict[col2]}"
-                            )
-                        else:
-                            inner_differences_df.at[index, col1] = letters_inner_dict[
-                                col2
-                            ]
-                    else:
-                        if inner_differences_df.at[index, col2]:
-                            inner_differences_df.at[index, col2] += (
-                                f",{letters_inner_dict[col1]}"
-                            )
-                        else:
-                            inner_differences_df.at[index, col2] = letters_inner_dict[
-                                col1
-                            ]
+    # Rows x columns counts against one base per column
+    x = inner_df.to_numpy(dtype=float)
+    n = data.loc[total_index, columns].to_numpy(dtype=float)
+
+    # [row, i, j] compares column i against column j
+    x1, x2 = x[:, :, None], x[:, None, :]
+    n1, n2 = n[None, :, None], n[None, None, :]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        higher = (x1 / n1) > (x2 / n2)
+    valid = (n1 >= 30) & (n2 >= 30) & (x1 != 0) & (x2 != 0)
+    wins = valid & higher & (two_proportions_pvalues(x1, x2, n1, n2) < sigma)
+
+    # Letters of the beaten columns, in column order
+    differences = np.full(x.shape, "", dtype=object)
+    for j, column in enumerate(columns):
+        beaten = wins[:, :, j]
+        letter = letters_inner_dict[column]
+        differences[beaten] = np.where(
+            differences[beaten] == "", letter, differences[beaten] + "," + letter
+        )
 
-    return inner_differences_df
+    return pd.DataFrame(differences, index=inner_df.index, columns=columns)
 
 
 def combine_values(num: int | float, string: str, decimals: int = 2):
@@ -178,66 +203,93 @@ def combine_dataframes(df1, df2, decimals=2):
 
 
 # Function to copy cell styles
-def copy_styles(cell_source, cell_target):
-    if cell_source.has_style:
-        cell_target.font = Font(
-            name=cell_source.font.name,
-            size=cell_source.font.size,
-            bold=cell_source.font.bold,
-            italic=cell_source.font.italic,
-            vertAlign=cell_source.font.vertAlign,
-            underline=cell_source.font.underline,
-            strike=cell_source.font.strike,
-            color=cell_source.font.color,
-        )
+def copy_styles(cell_source, cell_target, styles_cache: dict | None = None):
+    if not cell_source.has_style:
+        return
+
+    # Source cells sharing a style end up with the same style ids in the
+    # target workbook, so the style objects are only rebuilt once per style.
+    if styles_cache is not None:
+        style_key = tuple(cell_source._style)
+        if style_key in styles_cache:
+            cell_target._style = copy(styles_cache[style_key])
+            return
+
+    cell_target.font = Font(
+        name=cell_source.font.name,
+        size=cell_source.font.size,
+        bold=cell_source.font.bold,
+        italic=cell_source.font.italic,
+        vertAlign=cell_source.font.vertAlign,
+        underline=cell_source.font.underline,
+        strike=cell_source.font.strike,
+        color=cell_source.font.color,
+    )
 
-        cell_target.border = Border(
-            left=Side(
-                border_style=cell_source.border.left.style,
-                color=cell_source.border.left.color,
-            ),
-            right=Side(
-                border_style=cell_source.border.right.style,
-                color=cell_source.border.right.color,
-            ),
-            top=Side(
-                border_style=cell_source.border.top.style,
-                color=cell_source.border.top.color,
-            ),
-            bottom=Side(
-                border_style=cell_source.border.bottom.style,
-                color=cell_source.border.bottom.color,
-            ),
-        )
+    cell_target.border = Border(
+        left=Side(
+            border_style=cell_source.border.left.style,
+            color=cell_source.border.left.color,
+        ),
+        right=Side(
+            border_style=cell_source.border.right.style,
+            color=cell_source.border.right.color,
+        ),
+        top=Side(
+            border_style=cell_source.border.top.style,
+            color=cell_source.border.top.color,
+        ),
+        bottom=Side(
+            border_style=cell_source.border.bottom.style,
+            color=cell_source.border.bottom.color,
+        ),
+    )
 
-        cell_target.fill = PatternFill(
-            fill_type=cell_source.fill.fill_type,
-            start_color=cell_source.fill.start_color,
-            end_color=cell_source.fill.end_color,
-        )
+    cell_target.fill = PatternFill(
+        fill_type=cell_source.fill.fill_type,
+        start_color=cell_source.fill.start_color,
+        end_color=cell_source.fill.end_color,
+    )
 
-        cell_target.number_format = cell_source.number_format
-        cell_target.protection = Protection(
-            locked=cell_source.protection.locked, hidden=cell_source.protection.hidden
-        )
-        cell_target.alignment = Alignment(
-            horizontal=cell_source.alignment.horizontal,
-            vertical=cell_source.alignment.vertical,
-            text_rotation=cell_source.alignment.text_rotation,
-            wrap_text=cell_source.alignment.wrap_text,
-            shrink_to_fit=cell_source.alignment.shrink_to_fit,
-            indent=cell_source.alignment.indent,
-        )
+    cell_target.number_format = cell_source.number_format
+    cell_target.protection = Protection(
+        locked=cell_source.protection.locked, hidden=cell_source.protection.hidden
+    )
+    cell_target.alignment = Alignment(
+        horizontal=cell_source.alignment.horizontal,
+        vertical=cell_source.alignment.vertical,
+        text_rotation=cell_source.alignment.text_rotation,
+        wrap_text=cell_source.alignment.wrap_text,
+        shrink_to_fit=cell_source.alignment.shrink_to_fit,
+        indent=cell_source.alignment.indent,
+    )
+
+    if styles_cache is not None:
+        styles_cache[style_key] = copy(cell_target._style)
 
 
 def delete_col_with_merged_ranges(sheet, idx):
-    sheet.delete_cols(idx)
+    delete_cols_with_merged_ranges(sheet, [idx])
 
+
+def delete_cols_with_merged_ranges(sheet, cols):
+    """
+    Deletes several columns at once, numbered as the sheet is before the call.
+
+    The cell grid is compacted and the merged ranges are moved in one pass.
+    """
+    cols = sorted(set(cols))
+    if not cols:
+        return
+
+    _compact_cells(sheet, cols, "col")
     for mcr in sheet.merged_cells:
-        if idx < mcr.min_col:
-            mcr.shift(col_shift=-1)
-        elif idx < mcr.max_col:
-            mcr.shrink(right=1)
+        shift = bisect_left(cols, mcr.min_col)
+        shrink = bisect_left(cols, mcr.max_col) - shift
+        if shift:
+            mcr.shift(col_shift=-shift)
+        if shrink:
+            mcr.shrink(right=shrink)
 
 
 # Function to apply red color to the letter in the cell
@@ -309,10 +361,11 @@ def write_statistical_siginificance_sheet(
     category_indexes,
 ):
     # Copy styles and merged cells from existing sheet to new sheet
+    styles_cache = {}
     for row in ws_existing.iter_rows():
         for cell in row:
             new_cell = ws_new.cell(row=cell.row, column=cell.column, value=cell.value)
-            copy_styles(cell, new_cell)
+            copy_styles(cell, new_cell, styles_cache)
 
     # Copy column widths
     for col in ws_existing.columns:
@@ -349,9 +402,7 @@ def write_statistical_siginificance_sheet(
             )
 
     # Apply bold formatting to the first two columns
-    for row in ws_new.iter_rows():
-        for cell in row[:3]:  # First two columns
-            cell.font = Font(bold=True)
+    style_range(ws_new, 1, 1, ws_new.max_row, 3, font=BOLD_FONT)
 
     # Delete column B
     delete_col_with_merged_ranges(ws_new, 2)
@@ -382,22 +433,25 @@ def write_statistical_siginificance_sheet(
         ws_new.row_dimensions[row].height = fixed_row_height
 
     # Iterate through the rows and columns starting from the second column
+    unwrapped_alignments = {}
     for row in ws_new.iter_rows(min_col=2):
         for cell in row:
             if cell.alignment.wrap_text:
                 # Preserve other alignment properties and set wrap_text to False
-                alignment = cell.alignment
-                new_alignment = Alignment(
-                    horizontal=alignment.horizontal,
-                    vertical=alignment.vertical,
-                    text_rotation=alignment.text_rotation,
-                    wrap_text=False,
-                    shrink_to_fit=alignment.shrink_to_fit,
-                    indent=alignment.indent,
-                    justifyLastLine=alignment.justifyLastLine,
-                    readingOrder=alignment.readingOrder,
-                )
-                cell.alignment = new_alignment
+                alignment_id = cell._style.alignmentId
+                if alignment_id not in unwrapped_alignments:
+                    alignment = cell.alignment
+                    unwrapped_alignments[alignment_id] = Alignment(
+                        horizontal=alignment.horizontal,
+                        vertical=alignment.vertical,
+                        text_rotation=alignment.text_rotation,
+                        wrap_text=False,
+                        shrink_to_fit=alignment.shrink_to_fit,
+                        indent=alignment.indent,
+                        justifyLastLine=alignment.justifyLastLine,
+                        readingOrder=alignment.readingOrder,
+                    )
+                cell.alignment = unwrapped_alignments[alignment_id]
 
 
 def write_penalty_sheet(result_df: pd.DataFrame, worksheet):
@@ -419,9 +473,16 @@ def write_penalty_sheet(result_df: pd.DataFrame, worksheet):
         for col_num, header in enumerate(headers, 2):
             cell = worksheet.cell(row=start_row + 1, column=col_num)
             cell.value = header
-            cell.font = Font(bold=True)
-            cell.border = Border(bottom=Side(border_style="thin"))
-            cell.alignment = Alignment(horizontal="center")
+        style_range(
+            worksheet,
+            start_row + 1,
+            2,
+            start_row + 1,
+            len(headers) + 1,
+            font=BOLD_FONT,
+            border=THIN_BOTTOM_BORDER,
+            alignment=CENTER_HORIZONTAL_ALIGNMENT,
+        )
 
         # Write the data
         for row_num, row_data in enumerate(
@@ -432,16 +493,21 @@ def write_penalty_sheet(result_df: pd.DataFrame, worksheet):
                 cell.value = cell_value
                 if col_num > 2:  # Apply number format to numeric columns
                     cell.number_format = "0.00"
-                # Apply thin borders to data cells
-                if col_num > 1:
-                    cell.border = Border(
-                        top=Side(border_style="thin"), bottom=Side(border_style="thin")
-                    )
+
+        # Apply thin borders to data cells
+        style_range(
+            worksheet,
+            start_row + 2,
+            2,
+            start_row + 1 + len(df),
+            len(df.columns),
+            border=THIN_TOP_BOTTOM_BORDER,
+        )
 
         # Write the question in the merged cell
         cell = worksheet.cell(row=start_row + 2, column=1)
         cell.value = question
-        cell.alignment = Alignment(vertical="top", wrapText=True)
+        cell.alignment = TOP_WRAP_ALIGNMENT
         worksheet.merge_cells(
             start_row=start_row + 2,
             start_column=1,
@@ -449,13 +515,12 @@ def write_penalty_sheet(result_df: pd.DataFrame, worksheet):
             end_column=1,
         )
 
-        for col in range(1, len(df.columns) + 1):
-            worksheet.cell(row=start_row + 1, column=col).border = Border(
-                top=Side(border_style="thick")
-            )
-            worksheet.cell(row=start_row + 1 + len(df), column=col).border = Border(
-                bottom=Side(border_style="thick")
-            )
+        end_row = start_row + 1 + len(df)
+        end_col = len(df.columns)
+        style_range(
+            worksheet, start_row + 1, 1, start_row + 1, end_col, border=THICK_TOP_BORDER
+        )
+        style_range(worksheet, end_row, 1, end_row, end_col, border=THICK_BOTTOM_BORDER)
 
         worksheet.column_dimensions["A"].width = 400 / 8.43
         worksheet.column_dimensions["B"].width = 250 / 8.43
@@ -464,13 +529,49 @@ def write_penalty_sheet(result_df: pd.DataFrame, worksheet):
         start_row += len(df) + 3
 
 
+def _compact_cells(sheet, indexes: list[int], row_or_col: str):
+    # Same cell moves `sheet.delete_rows` / `sheet.delete_cols` make, but for
+    # every deleted index in a single pass over the grid
+    deleted = set(indexes)
+    cells = {}
+    for (row, col), cell in sheet._cells.items():
+        index = row if row_or_col == "row" else col
+        if index in deleted:
+            continue
+        offset = bisect_left(indexes, index)
+        if row_or_col == "row":
+            cell.row = row - offset
+        else:
+            cell.column = col - offset
+        cells[cell.row, cell.column] = cell
+
+    sheet._cells = cells
+    sheet._current_row = sheet.max_row if cells else 0
+
+
 def delete_row_with_merged_ranges(sheet, idx):
-    sheet.delete_rows(idx)
+    delete_rows_with_merged_ranges(sheet, [idx])
+
+
+def delete_rows_with_merged_ranges(sheet, rows):
+    """
+    Deletes several rows at once, numbered as the sheet is before the call.
+
+    The cell grid is compacted and the merged ranges are moved in one pass,
+    with the same result as deleting the rows one by one.
+    """
+    rows = sorted(set(rows))
+    if not rows:
+        return
+
+    _compact_cells(sheet, rows, "row")
     for mcr in sheet.merged_cells:
-        if idx < mcr.min_row:
-            mcr.shift(row_shift=-1)
-        elif idx < mcr.max_row:
-            mcr.shrink(bottom=1)
+        shift = bisect_left(rows, mcr.min_row)
+        shrink = bisect_left(rows, mcr.max_row) - shift
+        if shift:
+            mcr.shift(row_shift=-shift)
+        if shrink:
+            mcr.shrink(bottom=shrink)
 
 
 def transform_headers(data: pd.DataFrame):
@@ -501,10 +602,10 @@ def get_totals_from_pretables(xlsx_file: BytesIO):
     # Load the existing Excel file
     wb_existing = load_workbook(temp_file_name_xlsx)
 
-    wb_new = Workbook()
-    default_sheet = wb_new.active
-    wb_new.remove(default_sheet)
+    # Report only, so it is buffered and streamed instead of kept as openpyxl cells
+    wb_new = WriteOnlyWorkbook()
     sheets_dfs = pd.read_excel(temp_file_name_xlsx, sheet_name=None)
+    release_temp_file(temp_file_name_xlsx)
 
     ws_totals = wb_new.create_sheet(title="TOTALES")
     ws_option_5 = wb_new.create_sheet(title="OPCION 5")
@@ -521,18 +622,6 @@ def get_totals_from_pretables(xlsx_file: BytesIO):
             ws_totals.cell(row=1, column=index_col_totals).value = sheet_name
             ws_option_5.cell(row=1, column=index_col_opt_5).value = sheet_name
 
-            redFill = PatternFill(
-                start_color="C80000", end_color="C80000", fill_type="solid"
-            )
-
-            yellowFill = PatternFill(
-                start_color="FFFF00", end_color="FFFF00", fill_type="solid"
-            )
-
-            blueFill = PatternFill(
-                start_color="C5D9F1", end_color="C5D9F1", fill_type="solid"
-            )
-
             max_col = ws_existing.max_column
             index_row_totals = 2
             index_ini = 0
@@ -557,14 +646,14 @@ def get_totals_from_pretables(xlsx_file: BytesIO):
                         if ws_existing.cell(row=row_actual, column=i).value is np.nan:
                             ws_totals.cell(
                                 row=index_row_totals, column=index_col_totals + i - 3
-                            ).fill = redFill
+                            ).fill = RED_FILL
                         elif (
                             not ws_existing.cell(row=row_actual, column=i).value
                             == ws_existing.cell(row=index_ini, column=i).value
                         ):
                             ws_totals.cell(
                                 row=index_row_totals, column=index_col_totals + i - 3
-                            ).fill = yellowFill
+                            ).fill = YELLOW_FILL
                     index_row_totals += 1
                 if val_b == "NETO TOP TWO BOX":
                     ws_option_5.cell(
@@ -581,7 +670,7 @@ def get_totals_from_pretables(xlsx_file: BytesIO):
                     ):
                         ws_option_5.cell(
                             row=index_row_opt_5, column=index_col_opt_5 + 1
-                        ).fill = yellowFill
+                        ).fill = YELLOW_FILL
                     index_row_opt_5 += 1
                     flag_opt_5 = True
 
@@ -591,475 +680,580 @@ def get_totals_from_pretables(xlsx_file: BytesIO):
     separators = []
 
     for col in range(1, ws_totals.max_column + 1):
-        column_letter = get_column_letter(col)
         if (
             ws_totals.cell(row=1, column=col).value is None
             and ws_totals.cell(row=1, column=col + 1).value is None
         ):
-            ws_totals.column_dimensions[column_letter].width = 3
+            ws_totals.column_widths[col] = 3
         if (
             ws_totals.cell(row=1, column=col).value is None
             and ws_totals.cell(row=1, column=col + 1).value is not None
         ):
-            ws_totals.column_dimensions[column_letter].width = 4
+            ws_totals.column_widths[col] = 4
             separators.append(col)
         if ws_totals.cell(row=1, column=col).value is not None:
-            ws_totals.column_dimensions[column_letter].width = 14
+            ws_totals.column_widths[col] = 14
 
     for col in separators:
-        for i in range(1, ws_totals.max_row + 1):
-            ws_totals.cell(row=i, column=col).fill = blueFill
+        ws_totals.style_range(1, col, ws_totals.max_row, col, fill=BLUE_FILL)
 
     separators = []
 
     for col in range(1, ws_option_5.max_column + 1):
-        column_letter = get_column_letter(col)
         if (
             ws_option_5.cell(row=1, column=col).value is None
             and ws_option_5.cell(row=1, column=col + 1).value is None
         ):
-            ws_option_5.column_dimensions[column_letter].width = 10
+            ws_option_5.column_widths[col] = 10
         if (
             ws_option_5.cell(row=1, column=col).value is None
             and ws_option_5.cell(row=1, column=col + 1).value is not None
         ):
-            ws_option_5.column_dimensions[column_letter].width = 4
+            ws_option_5.column_widths[col] = 4
             separators.append(col)
         if ws_option_5.cell(row=1, column=col).value is not None:
-            ws_option_5.column_dimensions[column_letter].width = 14
+            ws_option_5.column_widths[col] = 14
 
     for col in separators:
         for i in range(1, ws_option_5.max_row + 1):
             ws_option_5.cell(row=i, column=col).value = " "
-            ws_option_5.cell(row=i, column=col).fill = blueFill
-
-    return write_temp_excel(wb_new)
+        ws_option_5.style_range(1, col, ws_option_5.max_row, col, fill=BLUE_FILL)
 
+    return wb_new.save()
 
-# @st.cache_data(show_spinner=False)
-def processing(xlsx_file: BytesIO):
-    temp_file_name_xlsx = get_temp_file(xlsx_file, ".xlsx")
 
-    # Load the existing Excel file
-    wb_existing = load_workbook(temp_file_name_xlsx)
+def _is_neto(valb) -> bool:
+    return (
+        bool(valb)
+        and valb.startswith("NETO")
+        and valb != "NETO TOP TWO BOX"
+        and valb != "NETO BOTTOM TWO BOX"
+    )
 
-    for sheet in wb_existing:
-        if not sheet.title.lower().startswith("penal"):
-            wstemp = wb_existing[sheet.title]
-            maxcol = wstemp.max_column
-            dictionary_netos = {}
-            for rowi in range(1, wstemp.max_row + 1):
-                valb = wstemp["B" + str(rowi)].value
-                if (
-                    valb
-                    and valb.startswith("NETO")
-                    and valb != "NETO TOP TWO BOX"
-                    and valb != "NETO BOTTOM TWO BOX"
-                ):
-                    if valb not in dictionary_netos or dictionary_netos[valb] == 0:
-                        dictionary_netos[valb] = 1
-                        for rowf in range(rowi + 1, wstemp.max_row + 1):
-                            if valb == wstemp["B" + str(rowf)].value:
-                                for i in range(2, maxcol + 1):
-                                    wstemp[get_column_letter(i) + str(rowi)] = wstemp[
-                                        get_column_letter(i) + str(rowf)
-                                    ].value
-                                for merged_range in list(wstemp.merged_cells.ranges):
-                                    if (
-                                        merged_range.min_row >= rowf - 7
-                                        and merged_range.min_row <= rowf + 5
-                                    ):
-                                        wstemp.merged_cells.ranges.remove(merged_range)
-                                break
-                    else:
-                        dictionary_netos[valb] = dictionary_netos[valb] - 1
-            for rowi in range(1, wstemp.max_row + 1):
-                valb = wstemp["B" + str(rowi)].value
-                if (
-                    valb
-                    and valb.startswith("NETO")
-                    and valb != "NETO TOP TWO BOX"
-                    and valb != "NETO BOTTOM TWO BOX"
-                ):
-                    for rowf in range(rowi + 1, wstemp.max_row + 1):
-                        if valb == wstemp["B" + str(rowf)].value:
-                            for j in range(11):
-                                delete_row_with_merged_ranges(wstemp, rowf - 7)
-                            break
-
-            for rowi in range(wstemp.max_row + 1, 1, -1):
-                if (
-                    not wstemp["D" + str(rowi)].value
-                    and not wstemp["C" + str(rowi)].value
-                ):
-                    delete_row_with_merged_ranges(wstemp, rowi)
-
-    wb_existing.save(temp_file_name_xlsx)
 
-    # Create a new Workbook
-    wb_new = Workbook()
+def prepare_pretables_sheet(wstemp):
+    # Moves every NETO block over its first occurrence and drops blank rows
+    maxcol = wstemp.max_column
+    column_b = [
+        valb for (valb,) in wstemp.iter_rows(min_col=2, max_col=2, values_only=True)
+    ]
 
-    # Remove the default sheet created with the new workbook
-    default_sheet = wb_new.active
-    wb_new.remove(default_sheet)
+    netos_rows = defaultdict(list)
+    for rowi, valb in enumerate(column_b, start=1):
+        if _is_neto(valb):
+            netos_rows[valb].append(rowi)
 
-    sheets_dfs = pd.read_excel(temp_file_name_xlsx, sheet_name=None)
+    # Occurrences pair up in order, the later one is copied over the first
+    moves = sorted(
+        (rowi, rowf)
+        for neto_rows in netos_rows.values()
+        for rowi, rowf in zip(neto_rows[::2], neto_rows[1::2])
+    )
+    for rowi, rowf in moves:
+        for i in range(2, maxcol + 1):
+            wstemp.cell(row=rowi, column=i).value = wstemp.cell(
+                row=rowf, column=i
+            ).value
+
+    moved_block_rows = {
+        row for _, rowf in moves for row in range(rowf - 7, rowf + 6)
+    }
+    for merged_range in list(wstemp.merged_cells.ranges):
+        if merged_range.min_row in moved_block_rows:
+            wstemp.merged_cells.ranges.remove(merged_range)
+
+    # Every NETO with a later twin drops the 11 row block around the twin.
+    # Planned on a copy of column B that shifts like the sheet would.
+    rows = list(range(1, len(column_b) + 1))
+    deleted_rows = []
+    for rowi in range(1, len(column_b) + 1):
+        if rowi > len(column_b):
+            break
+        valb = column_b[rowi - 1]
+        if not _is_neto(valb):
+            continue
+        try:
+            rowf = column_b.index(valb, rowi) + 1
+        except ValueError:
+            continue
+        for j in range(11):
+            if 1 <= rowf - 7 <= len(column_b):
+                del column_b[rowf - 8]
+                deleted_rows.append(rows.pop(rowf - 8))
+    delete_rows_with_merged_ranges(wstemp, deleted_rows)
+
+    blank_rows = [
+        rowi
+        for rowi, (valc, vald) in enumerate(
+            wstemp.iter_rows(min_col=3, max_col=4, values_only=True), start=1
+        )
+        if rowi > 1 and not vald and not valc
+    ]
+    delete_rows_with_merged_ranges(wstemp, blank_rows)
+
+
+def get_statistical_significance(data: pd.DataFrame):
+    """
+    Computes the significance letters of a grilla sheet.
+
+    Only works on the sheet values so it can run in a worker process.
+
+    Args:
+        data (pd.DataFrame): The sheet as `pd.read_excel` returns it.
+
+    Returns:
+        tuple: The combined values and letters dataframe, the question groups,
+        the category indexes and the first all-NaN row index.
+    """
+    if "TOTAL" not in data.columns:
+        data = transform_headers(data)
+    data["Unnamed: 2"] = (
+        pd.to_numeric(data["Unnamed: 2"], errors="coerce")
+        .fillna(data["Unnamed: 2"])
+        .fillna("")
+    )
+    data_differences = data.copy()
 
-    ws_totals = wb_new.create_sheet(title="TOTALES")
-    index_totals = 1
+    float_types = data["Unnamed: 2"].apply(lambda x: isinstance(x, float))
+    float_types = float_types[float_types]
 
-    # Iterate over all sheets
-    for sheet_name, data in sheets_dfs.items():
-        if data.empty:
-            continue
+    question_groups = group_consecutive_indexes(list(float_types.index))
 
-        if sheet_name.lower().startswith("penal"):
-            first_row_with_data = data[~data.iloc[:, 3].isna()].index[0]
-            data = data.iloc[first_row_with_data:]
-            data.columns = [
-                f"Unnamed: {i}" if pd.isna(col) else col
-                for i, col in enumerate(data.iloc[0])
-            ]
-            data = data[1:]
-            data = data.reset_index(drop=True)
-
-            # Create a dataframe with the column names as the first row
-            column_names_df = pd.DataFrame(
-                [
-                    [
-                        column if not column.startswith("Unnamed") else np.nan
-                        for column in data.columns
-                    ]
-                ],
-                columns=list(range(len(data.columns))),
-            )
+    partial_df = data[
+        data.index.isin([question_groups[0][0] - 1] + question_groups[0])
+    ]
+    initial_category_group = partial_df.loc[partial_df.index[0], "TOTAL"]  # (A)
+    category_groups_columns = (
+        partial_df.loc[partial_df.index[0], :].to_frame().reset_index()
+    )
 
-            data.columns = range(len(data.columns))
-            # Concatenate the new row with the original dataframe
-            data = pd.concat([column_names_df, data]).reset_index(drop=True)
+    initial_category_indexes = group_consecutive_indexes(
+        list(
+            category_groups_columns[
+                category_groups_columns[1] == initial_category_group
+            ][1:].index
+        )
+    )
 
-            # Rename the columns to integers
-            data.columns = range(len(data.columns))
+    category_indexes = [
+        (
+            initial_category_indexes[i][-1],
+            initial_category_indexes[i + 1][0] - 1,
+        )
+        for i in range(len(initial_category_indexes) - 1)
+    ] + [(initial_category_indexes[-1][0], len(category_groups_columns) - 1)]
+    for cat in initial_category_indexes:
+        if len(cat) > 1:
+            for cat1 in cat:
+                if cat1 != cat[-1]:
+                    category_indexes += [(cat1, cat1)]
+
+    total_differeces_df = pd.DataFrame(
+        index=range(len(data_differences)), columns=data_differences.columns
+    )
 
-            questions = (
-                data[data[0].str.startswith("P", na=False)][0]
-                .dropna()
-                .unique()
-                .tolist()
-            )
+    for question_group in question_groups:
+        df_total_search = data_differences.loc[
+            question_group[-1] : question_group[-1] + 6, :
+        ]
+        total_index = df_total_search[
+            df_total_search["Unnamed: 2"].str.contains("Total", na=False)
+        ].index[0]
+        data_differences.loc[total_index, "TOTAL"] = int(
+            data_differences.loc[total_index, "TOTAL"]
+        )
 
-            question_idexes = np.array(
-                [
-                    data[data[0] == question].first_valid_index()
-                    for question in questions
-                ]
+        data_differences.update(
+            calculate_percentages(
+                data_differences[["TOTAL"]].loc[question_group, :].astype(int),
+                data_differences,
+                total_index,
             )
+        )
 
-            tables_first_indexes = (question_idexes - 2).tolist()
-
-            tables_last_indexes = [
-                data.iloc[start_idx + 2 :][
-                    (data[1].iloc[start_idx + 2 :].isna())
-                    & (data[2].iloc[start_idx + 2 :].isna())
-                ].index[0]
-                for start_idx in tables_first_indexes
-            ]
+        for category_group in category_indexes:
+            columns_category_groups = category_groups_columns.loc[
+                category_group[0] : category_group[1]
+            ]["index"].to_list()
 
-            samples = data.loc[1, 3:].values.tolist()
-            data.columns = ["question", "grouped_variable", "answer_option"] + samples
+            inner_df = (
+                data.loc[question_group, columns_category_groups]
+                .map(extract_digits)
+                .replace({None: np.nan})
+                .dropna(axis=1, how="all")
+            )
 
-            tables_range_indexes = list(zip(tables_first_indexes, tables_last_indexes))
+            data_differences.update(inner_df)
 
-            results_dfs = []
+            data_differences.loc[total_index, inner_df.columns] = (
+                data_differences.loc[total_index, inner_df.columns]
+                .infer_objects(copy=False)
+                .fillna(0)
+                .astype(int)
+            )
 
-            for question, (start, end) in zip(questions, tables_range_indexes):
-                question_df = data.loc[start:end, :]
+            data_differences.update(
+                calculate_percentages(inner_df, data_differences, total_index)
+            )
 
-                # # Finding the index of the first occurrence
-                # first_occurrence_index = question_df[
-                #     question_df["grouped_variable"].str.contains("Total", na=False)
-                # ].index[0]
+            if len(inner_df.columns) > len(letters_list):
+                letters_inner_dict = {
+                    column: letter
+                    for column, letter in zip(
+                        inner_df.columns,
+                        composite_columns(len(inner_df.columns)),
+                    )
+                }
+            else:
+                letters_inner_dict = {
+                    column: letter
+                    for column, letter in zip(
+                        inner_df.columns, letters_list[: len(inner_df.columns)]
+                    )
+                }
 
-                total_rows = question_df[
-                    question_df["grouped_variable"].str.contains("Total", na=False)
-                ]
+            inner_differences_df = significant_differences(
+                inner_df, data_differences, total_index, letters_inner_dict
+            )
 
-                if total_rows.empty:
-                    continue
+            total_differeces_df.update(inner_differences_df)
 
-                first_occurrence_index = total_rows.index[0]
+    combined_differences_df = combine_dataframes(
+        data_differences, total_differeces_df, 0
+    )
+    combined_differences_df["Unnamed: 2"] = np.where(
+        combined_differences_df["Unnamed: 2"] == "1",
+        combined_differences_df["Unnamed: 1"],
+        combined_differences_df["Unnamed: 2"],
+    )
 
-                grouped_variables = (
-                    question_df.loc[: first_occurrence_index - 1]
-                    .dropna(subset="grouped_variable")["grouped_variable"]
-                    .to_list()
-                )
+    combined_differences_df["Unnamed: 2"] = combined_differences_df[
+        "Unnamed: 2"
+    ].replace("", np.nan)
+    nan_df = combined_differences_df[combined_differences_df.isna().all(axis=1)]
+    if not nan_df.empty:
+        first_all_nan_index = combined_differences_df[
+            combined_differences_df.isna().all(axis=1)
+        ].index[0]
+    else:
+        first_all_nan_index = 2
 
-                results_calculations = (
-                    grouped_variables
-                    + [
-                        f"MEAN {grouped_variable} VS. IC"
-                        for grouped_variable in grouped_variables
-                    ]
-                    + [
-                        f"PENALTY {grouped_variable}"
-                        for grouped_variable in grouped_variables
-                        if "just" not in grouped_variable.lower()
-                    ]
-                    + ["TOTAL"]
-                )
+    return (
+        combined_differences_df,
+        question_groups,
+        category_indexes,
+        first_all_nan_index,
+    )
 
-                base_inner_df = pd.DataFrame(index=results_calculations)
 
-                sub_df = question_df.loc[first_occurrence_index:]
+def worksheet_to_dataframe(worksheet) -> pd.DataFrame:
+    """
+    Builds the same dataframe `pd.read_excel` returns for a sheet, straight
+    from a loaded worksheet, so it does not have to be saved and parsed again.
+    """
+    data = []
+    for row in worksheet.iter_rows(values_only=True):
+        values = [
+            "" if value is None
+            else int(value) if isinstance(value, float) and value.is_integer()
+            else value
+            for value in row
+        ]
+        while values and values[-1] == "":
+            values.pop()
+        data.append(values)
 
-                for sample in samples:
-                    total = np.nan
-                    for grouped_variable in grouped_variables:
-                        grouped_variable_index_df = sub_df[
-                            sub_df["grouped_variable"] == grouped_variable
-                        ]
-                        if grouped_variable_index_df.empty:
-                            continue
-                        grouped_variable_index = grouped_variable_index_df.index[0]
-                        grouped_variable_df = sub_df.loc[
-                            grouped_variable_index : grouped_variable_index + 4
-                        ]
+    while data and not data[-1]:
+        data.pop()
+    if not data:
+        return pd.DataFrame()
 
-                        if grouped_variable_df[sample].sum() == 0:
-                            continue
+    width = max(len(row) for row in data)
+    data = [row + [""] * (width - len(row)) for row in data]
+    return TextParser(data, header=0, skip_blank_lines=False).read()
 
-                        total = sub_df[:1][sample].values[0]
 
-                        base_inner_df.loc[grouped_variable, sample] = (
-                            grouped_variable_df[sample].sum() / total
-                        )  # Percentage
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
 
-                        base_inner_df.loc[f"MEAN {grouped_variable} VS. IC", sample] = (
-                            grouped_variable_df[sample]
-                            * np.array(list(range(0, 101, 25)))
-                        ).sum() / grouped_variable_df[sample].sum()  # Mean
 
-                    for grouped_variable in grouped_variables:
-                        if (
-                            "just" not in grouped_variable.lower()
-                            and total is not np.nan
-                        ):
-                            percentage = base_inner_df.loc[grouped_variable, sample]
-                            mean = base_inner_df.loc[
-                                f"MEAN {grouped_variable} VS. IC", sample
-                            ]
-                            jr_mean = base_inner_df.loc[
-                                f"MEAN {grouped_variables[1]} VS. IC", sample
-                            ]
+# @st.cache_data(show_spinner=False)
+def processing(xlsx_file: BytesIO):
+    temp_file_name_xlsx = get_temp_file(xlsx_file, ".xlsx")
 
-                            base_inner_df.loc[f"PENALTY {grouped_variable}", sample] = (
-                                mean - jr_mean
-                            ) * percentage  # Penalty
+    # Load the existing Excel file
+    wb_existing = load_workbook(temp_file_name_xlsx)
+    release_temp_file(temp_file_name_xlsx)
 
-                    base_inner_df.loc["TOTAL", sample] = total  # Total
+    timings = {}
+    sheets_dfs = {}
+    for sheet in wb_existing:
+        start = time.perf_counter()
+        if not sheet.title.lower().startswith("penal"):
+            prepare_pretables_sheet(sheet)
+        sheets_dfs[sheet.title] = worksheet_to_dataframe(sheet)
+        timings[sheet.title] = {"prepare": time.perf_counter() - start}
 
-                base_inner_df = base_inner_df.reset_index(names="grouped_variable")
-                base_inner_df.insert(0, "question", question)
+    # Create a new Workbook
+    wb_new = Workbook()
 
-                results_dfs.append(base_inner_df)
+    # Remove the default sheet created with the new workbook
+    default_sheet = wb_new.active
+    wb_new.remove(default_sheet)
 
-            result_df = pd.concat(results_dfs).reset_index(drop=True)
+    ws_totals = wb_new.create_sheet(title="TOTALES")
+    index_totals = 1
 
-            worksheet = wb_new.create_sheet(title=sheet_name)
-            write_penalty_sheet(result_df, worksheet)
+    grilla_sheets = [
+        sheet_name
+        for sheet_name, data in sheets_dfs.items()
+        if not data.empty and not sheet_name.lower().startswith("penal")
+    ]
 
-        else:
-            ws_existing = wb_existing[sheet_name]
-            if "TOTAL" not in data.columns:
-                data = transform_headers(data)
-                delete_row_with_merged_ranges(ws_existing, 0)
-            # data = pd.read_excel(temp_file_name_xlsx, sheet_name=sheet_name)
-            data["Unnamed: 2"] = (
-                pd.to_numeric(data["Unnamed: 2"], errors="coerce")
-                .fillna(data["Unnamed: 2"])
-                .fillna("")
+    with worker_pool(len(grilla_sheets)) as executor:
+        significance_futures = {
+            sheet_name: executor.submit(
+                _timed, get_statistical_significance, sheets_dfs[sheet_name]
             )
-            data_differences = data.copy()
+            for sheet_name in grilla_sheets
+        }
+
+        # Iterate over all sheets
+        for sheet_name, data in sheets_dfs.items():
+            if data.empty:
+                continue
+
+            start = time.perf_counter()
+
+            if sheet_name.lower().startswith("penal"):
+                first_row_with_data = data[~data.iloc[:, 3].isna()].index[0]
+                data = data.iloc[first_row_with_data:]
+                data.columns = [
+                    f"Unnamed: {i}" if pd.isna(col) else col
+                    for i, col in enumerate(data.iloc[0])
+                ]
+                data = data[1:]
+                data = data.reset_index(drop=True)
 
-            float_types = data["Unnamed: 2"].apply(lambda x: isinstance(x, float))
-            float_types = float_types[float_types]
+                # Create a dataframe with the column names as the first row
+                column_names_df = pd.DataFrame(
+                    [
+                        [
+                            column if not column.startswith("Unnamed") else np.nan
+                            for column in data.columns
+                        ]
+                    ],
+                    columns=list(range(len(data.columns))),
+                )
 
-            question_groups = group_consecutive_indexes(list(float_types.index))
+                data.columns = range(len(data.columns))
+                # Concatenate the new row with the original dataframe
+                data = pd.concat([column_names_df, data]).reset_index(drop=True)
 
-            partial_df = data[
-                data.index.isin([question_groups[0][0] - 1] + question_groups[0])
-            ]
-            initial_category_group = partial_df.loc[partial_df.index[0], "TOTAL"]  # (A)
-            category_groups_columns = (
-                partial_df.loc[partial_df.index[0], :].to_frame().reset_index()
-            )
+                # Rename the columns to integers
+                data.columns = range(len(data.columns))
 
-            initial_category_indexes = group_consecutive_indexes(
-                list(
-                    category_groups_columns[
-                        category_groups_columns[1] == initial_category_group
-                    ][1:].index
+                questions = (
+                    data[data[0].str.startswith("P", na=False)][0]
+                    .dropna()
+                    .unique()
+                    .tolist()
                 )
-            )
 
-            category_indexes = [
-                (
-                    initial_category_indexes[i][-1],
-                    initial_category_indexes[i + 1][0] - 1,
+                question_idexes = np.array(
+                    [
+                        data[data[0] == question].first_valid_index()
+                        for question in questions
+                    ]
                 )
-                for i in range(len(initial_category_indexes) - 1)
-            ] + [(initial_category_indexes[-1][0], len(category_groups_columns) - 1)]
-            for cat in initial_category_indexes:
-                if len(cat) > 1:
-                    for cat1 in cat:
-                        if cat1 != cat[-1]:
-                            category_indexes += [(cat1, cat1)]
-
-            total_differeces_df = pd.DataFrame(
-                index=range(len(data_differences)), columns=data_differences.columns
-            )
 
-            for question_group in question_groups:
-                df_total_search = data_differences.loc[
-                    question_group[-1] : question_group[-1] + 6, :
+                tables_first_indexes = (question_idexes - 2).tolist()
+
+                tables_last_indexes = [
+                    data.iloc[start_idx + 2 :][
+                        (data[1].iloc[start_idx + 2 :].isna())
+                        & (data[2].iloc[start_idx + 2 :].isna())
+                    ].index[0]
+                    for start_idx in tables_first_indexes
                 ]
-                total_index = df_total_search[
-                    df_total_search["Unnamed: 2"].str.contains("Total", na=False)
-                ].index[0]
-                data_differences.loc[total_index, "TOTAL"] = int(
-                    data_differences.loc[total_index, "TOTAL"]
-                )
 
-                data_differences.update(
-                    calculate_percentages(
-                        data_differences[["TOTAL"]].loc[question_group, :].astype(int),
-                        data_differences,
-                        total_index,
-                    )
-                )
+                samples = data.loc[1, 3:].values.tolist()
+                data.columns = ["question", "grouped_variable", "answer_option"] + samples
 
-                for category_group in category_indexes:
-                    columns_category_groups = category_groups_columns.loc[
-                        category_group[0] : category_group[1]
-                    ]["index"].to_list()
+                tables_range_indexes = list(zip(tables_first_indexes, tables_last_indexes))
 
-                    inner_df = (
-                        data.loc[question_group, columns_category_groups]
-                        .map(extract_digits)
-                        .replace({None: np.nan})
-                        .dropna(axis=1, how="all")
-                    )
+                results_dfs = []
 
-                    data_differences.update(inner_df)
+                for question, (start, end) in zip(questions, tables_range_indexes):
+                    question_df = data.loc[start:end, :]
 
-                    data_differences.loc[total_index, inner_df.columns] = (
-                        data_differences.loc[total_index, inner_df.columns]
-                        .infer_objects(copy=False)
-                        .fillna(0)
-                        .astype(int)
-                    )
+                    # # Finding the index of the first occurrence
+                    # first_occurrence_index = question_df[
+                    #     question_df["grouped_variable"].str.contains("Total", na=False)
+                    # ].index[0]
 
-                    data_differences.update(
-                        calculate_percentages(inner_df, data_differences, total_index)
+                    total_rows = question_df[
+                        question_df["grouped_variable"].str.contains("Total", na=False)
+                    ]
+
+                    if total_rows.empty:
+                        continue
+
+                    first_occurrence_index = total_rows.index[0]
+
+                    grouped_variables = (
+                        question_df.loc[: first_occurrence_index - 1]
+                        .dropna(subset="grouped_variable")["grouped_variable"]
+                        .to_list()
                     )
 
-                    if len(inner_df.columns) > len(letters_list):
-                        letters_inner_dict = {
-                            column: letter
-                            for column, letter in zip(
-                                inner_df.columns,
-                                composite_columns(len(inner_df.columns)),
-                            )
-                        }
-                    else:
-                        letters_inner_dict = {
-                            column: letter
-                            for column, letter in zip(
-                                inner_df.columns, letters_list[: len(inner_df.columns)]
-                            )
-                        }
-
-                    inner_differences_df = significant_differences(
-                        inner_df, data_differences, total_index, letters_inner_dict
+                    results_calculations = (
+                        grouped_variables
+                        + [
+                            f"MEAN {grouped_variable} VS. IC"
+                            for grouped_variable in grouped_variables
+                        ]
+                        + [
+                            f"PENALTY {grouped_variable}"
+                            for grouped_variable in grouped_variables
+                            if "just" not in grouped_variable.lower()
+                        ]
+                        + ["TOTAL"]
                     )
 
-                    total_differeces_df.update(inner_differences_df)
+                    base_inner_df = pd.DataFrame(index=results_calculations)
 
-            combined_differences_df = combine_dataframes(
-                data_differences, total_differeces_df, 0
-            )
-            combined_differences_df["Unnamed: 2"] = np.where(
-                combined_differences_df["Unnamed: 2"] == "1",
-                combined_differences_df["Unnamed: 1"],
-                combined_differences_df["Unnamed: 2"],
-            )
+                    sub_df = question_df.loc[first_occurrence_index:]
 
-            combined_differences_df["Unnamed: 2"] = combined_differences_df[
-                "Unnamed: 2"
-            ].replace("", np.nan)
-            nan_df = combined_differences_df[combined_differences_df.isna().all(axis=1)]
-            if not nan_df.empty:
-                first_all_nan_index = combined_differences_df[
-                    combined_differences_df.isna().all(axis=1)
-                ].index[0]
-            else:
-                first_all_nan_index = 2
+                    for sample in samples:
+                        total = np.nan
+                        for grouped_variable in grouped_variables:
+                            grouped_variable_index_df = sub_df[
+                                sub_df["grouped_variable"] == grouped_variable
+                            ]
+                            if grouped_variable_index_df.empty:
+                                continue
+                            grouped_variable_index = grouped_variable_index_df.index[0]
+                            grouped_variable_df = sub_df.loc[
+                                grouped_variable_index : grouped_variable_index + 4
+                            ]
 
-            ws_new = wb_new.create_sheet(title=sheet_name)
+                            if grouped_variable_df[sample].sum() == 0:
+                                continue
 
-            write_statistical_siginificance_sheet(
-                ws_existing,
-                ws_new,
-                first_all_nan_index,
-                combined_differences_df,
-                question_groups,
-                category_indexes,
-            )
+                            total = sub_df[:1][sample].values[0]
 
-            ws_totals.cell(row=1, column=index_totals).value = sheet_name
+                            base_inner_df.loc[grouped_variable, sample] = (
+                                grouped_variable_df[sample].sum() / total
+                            )  # Percentage
 
-            redFill = PatternFill(
-                start_color="C80000", end_color="C80000", fill_type="solid"
-            )
+                            base_inner_df.loc[f"MEAN {grouped_variable} VS. IC", sample] = (
+                                grouped_variable_df[sample]
+                                * np.array(list(range(0, 101, 25)))
+                            ).sum() / grouped_variable_df[sample].sum()  # Mean
 
-            yellowFill = PatternFill(
-                start_color="FFFF00", end_color="FFFF00", fill_type="solid"
-            )
+                        for grouped_variable in grouped_variables:
+                            if (
+                                "just" not in grouped_variable.lower()
+                                and total is not np.nan
+                            ):
+                                percentage = base_inner_df.loc[grouped_variable, sample]
+                                mean = base_inner_df.loc[
+                                    f"MEAN {grouped_variable} VS. IC", sample
+                                ]
+                                jr_mean = base_inner_df.loc[
+                                    f"MEAN {grouped_variables[1]} VS. IC", sample
+                                ]
 
-            blueFill = PatternFill(
-                start_color="C5D9F1", end_color="C5D9F1", fill_type="solid"
-            )
+                                base_inner_df.loc[f"PENALTY {grouped_variable}", sample] = (
+                                    mean - jr_mean
+                                ) * percentage  # Penalty
 
-            max_col = ws_new.max_column
-            index_row = 2
-            index_ini = 0
-            for row_actual in range(1, ws_new.max_row + 1):
-                val_a = ws_new["A" + str(row_actual)].value
-                val_b = ws_new["B" + str(row_actual)].value
-                if val_a:
-                    ws_totals.cell(row=index_row, column=index_totals).value = val_a
-                elif val_b == "Total":
-                    if index_ini == 0:
-                        index_ini = row_actual
-                    for i in range(2, max_col):
-                        ws_totals.cell(
-                            row=index_row, column=index_totals + i - 1
-                        ).value = ws_new.cell(row=row_actual, column=i + 1).value
-                        if ws_new.cell(row=row_actual, column=i + 1).value is np.nan:
-                            ws_totals.cell(
-                                row=index_row, column=index_totals + i - 1
-                            ).fill = redFill
-                        elif (
-                            not ws_new.cell(row=row_actual, column=i + 1).value
-                            == ws_new.cell(row=index_ini, column=i + 1).value
-                        ):
+                        base_inner_df.loc["TOTAL", sample] = total  # Total
+
+                    base_inner_df = base_inner_df.reset_index(names="grouped_variable")
+                    base_inner_df.insert(0, "question", question)
+
+                    results_dfs.append(base_inner_df)
+
+                result_df = pd.concat(results_dfs).reset_index(drop=True)
+
+                worksheet = wb_new.create_sheet(title=sheet_name)
+                write_penalty_sheet(result_df, worksheet)
+
+            else:
+                ws_existing = wb_existing[sheet_name]
+                if "TOTAL" not in data.columns:
+                    delete_row_with_merged_ranges(ws_existing, 0)
+
+                significance, timings[sheet_name]["significance"] = (
+                    significance_futures[sheet_name].result()
+                )
+                (
+                    combined_differences_df,
+                    question_groups,
+                    category_indexes,
+                    first_all_nan_index,
+                ) = significance
+                start = time.perf_counter()
+
+                ws_new = wb_new.create_sheet(title=sheet_name)
+
+                write_statistical_siginificance_sheet(
+                    ws_existing,
+                    ws_new,
+                    first_all_nan_index,
+                    combined_differences_df,
+                    question_groups,
+                    category_indexes,
+                )
+
+                ws_totals.cell(row=1, column=index_totals).value = sheet_name
+
+                max_col = ws_new.max_column
+                index_row = 2
+                index_ini = 0
+                for row_actual in range(1, ws_new.max_row + 1):
+                    val_a = ws_new["A" + str(row_actual)].value
+                    val_b = ws_new["B" + str(row_actual)].value
+                    if val_a:
+                        ws_totals.cell(row=index_row, column=index_totals).value = val_a
+                    elif val_b == "Total":
+                        if index_ini == 0:
+                            index_ini = row_actual
+                        for i in range(2, max_col):
                             ws_totals.cell(
                                 row=index_row, column=index_totals + i - 1
-                            ).fill = yellowFill
-                    index_row += 1
+                            ).value = ws_new.cell(row=row_actual, column=i + 1).value
+                            if ws_new.cell(row=row_actual, column=i + 1).value is np.nan:
+                                ws_totals.cell(
+                                    row=index_row, column=index_totals + i - 1
+                                ).fill = RED_FILL
+                            elif (
+                                not ws_new.cell(row=row_actual, column=i + 1).value
+                                == ws_new.cell(row=index_ini, column=i + 1).value
+                            ):
+                                ws_totals.cell(
+                                    row=index_row, column=index_totals + i - 1
+                                ).fill = YELLOW_FILL
+                        index_row += 1
+
+                index_totals += max_col
+
+            timings[sheet_name]["build"] = time.perf_counter() - start
+
+    for sheet_name, sheet_timings in timings.items():
+        logger.info(
+            "Processed sheet '%s' in %.2fs (%s)",
+            sheet_name,
+            sum(sheet_timings.values()),
+            ", ".join(
+                f"{stage} {seconds:.2f}s" for stage, seconds in sheet_timings.items()
+            ),
+        )
 
-            index_totals += max_col
     separators = []
 
     for col in range(1, ws_totals.max_column + 1):
@@ -1079,8 +1273,7 @@ def processing(xlsx_file: BytesIO):
             ws_totals.column_dimensions[column_letter].width = 14
 
     for col in separators:
-        for i in range(1, ws_totals.max_row + 1):
-            ws_totals.cell(row=i, column=col).fill = blueFill
+        style_range(ws_totals, 1, col, ws_totals.max_row, col, fill=BLUE_FILL)
 
     return write_temp_excel(wb_new), wb_new
 
@@ -1,8 +1,11 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Literal, Callable
-from functools import reduce
+from functools import partial, reduce, lru_cache
 import traceback
-import ast
-import re
+from html import escape
 
 from firebase_admin import firestore
 from google.cloud.firestore_v1.base_query import FieldFilter
@@ -20,14 +23,36 @@ from app.modules.processing import (
 from app.modules.utils import (
     get_countries,
     get_temp_file,
+    release_temp_file,
+    read_sav,
+    load_json,
+    StudyCache,
     column_letters,
     roman,
     _to_show,
     _to_code,
+    ValueLabels,
+    parse_value_labels,
+    worker_pool,
 )
 
 cs_client = CloudStorageClient("connecta-app-1-service-processing")
 
+study_cache = StudyCache(
+    os.path.join(tempfile.gettempdir(), "connecta-study-cache"),
+    int(os.getenv("STUDY_CACHE_MAX_MB", 128)) * 1024 * 1024,
+)
+
+# Concurrent requests to the storage bucket when loading studies
+IO_WORKERS = 8
+
+# Rows rendered at once by `create_html_table`
+HTML_TABLE_PAGE_ROWS = 500
+
+# Threads building question tables in parallel. Opt-in for hosts with spare
+# CPUs, by default (1) tables are built serially
+QUESTION_WORKERS = int(os.getenv("VIEWER_QUESTION_WORKERS", 1))
+
 db = firestore.client()
 
 # CSS to highlight headers and index of the dataframe
@@ -367,26 +392,148 @@ def get_available_countries(studies_id: str) -> list[str]:
     ]
 
 
-@st.cache_data(show_spinner=True)
-def download_studies_data(
+@st.cache_data(show_spinner=False, ttl=60)
+def get_blob_generation(blob_name: str) -> int:
+    return cs_client.get_generation(blob_name)
+
+
+def get_study_generation(blob_name: str) -> str:
+    return "-".join(
+        str(get_blob_generation(f"{blob_name}.{file}")) for file in ("sav", "json")
+    )
+
+
+def download_study(blob_name: str) -> dict[str, str]:
+    """Download the respective files (.sav, .json) of a study from storage bucket."""
+    files = {}
+    for file in ("sav", "json"):
+        file_bytes = cs_client.download_as_bytes(f"{blob_name}.{file}")
+        files[file] = get_temp_file(file_bytes, f".{file}")
+    return files
+
+
+def decode_study(blob_name: str, generation: str, files: dict[str, str]):
+    """Decode the downloaded files of a study into the local study cache."""
+    db, metadata_df = read_sav(files["sav"])
+    config = load_json(files["json"])["config"]
+    study_cache.store(blob_name, generation, db, metadata_df, config)
+
+
+def load_study(
+    blob_name: str, generation: str
+) -> tuple[pd.DataFrame, pd.DataFrame, dict]:
+    """
+    Load a study from the local study cache, downloading and decoding it again
+    if another session evicted it since it was stored.
+    """
+    cached = study_cache.load(blob_name, generation)
+    if cached is None:
+        files = download_study(blob_name)
+        try:
+            decode_study(blob_name, generation, files)
+        finally:
+            for temp_file_name in files.values():
+                release_temp_file(temp_file_name)
+
+        cached = study_cache.load(blob_name, generation)
+        if cached is None:
+            raise RuntimeError(f"Study {blob_name} could not be loaded.")
+
+    return cached
+
+
+def load_studies_data(
     category: str, subcategory: str, country_code: str, company: str, studies: list[str]
-) -> dict[str, dict[str, str]]:
-    """Download the respective files (.sav, .json) from storage bucket for the
-    selected studies."""
+) -> dict[str, dict]:
+    """
+    Loads the data, metadata and config of the selected studies from the local
+    study cache. Studies are only downloaded and decoded again when their files
+    changed in the storage bucket.
+
+    Downloads run in a thread pool. SPSS decoding runs in this process, in
+    threads when several studies are missing and more than one CPU is
+    available.
+
+    Returns:
+        dict[str, dict]: `db`, `metadata`, `config` and `generation` of every study.
+    """
     category = _to_code(category)
     subcategory = _to_code(subcategory)
     blob_path = f"databases/{category}/{subcategory}/{country_code}/{company}"
 
-    studies_files = {}
+    blob_names = {study: f"{blob_path}/{_to_code(study)}" for study in studies}
+
+    with ThreadPoolExecutor(max_workers=IO_WORKERS) as io_executor:
+        generations = dict(
+            zip(studies, io_executor.map(get_study_generation, blob_names.values()))
+        )
+        missing_studies = [
+            study
+            for study in studies
+            if not study_cache.contains(blob_names[study], generations[study])
+        ]
+
+        if missing_studies:
+            steps = 2 * len(missing_studies)
+            progress_bar = st.progress(0.0, text="Downloading studies...")
+
+            downloads = {
+                io_executor.submit(download_study, blob_names[study]): study
+                for study in missing_studies
+            }
+            studies_files = {}
+            for future in as_completed(downloads):
+                studies_files[downloads[future]] = future.result()
+                progress_bar.progress(
+                    len(studies_files) / steps, text="Downloading studies..."
+                )
+
+    if missing_studies:
+        with worker_pool(len(missing_studies)) as decode_executor:
+            decodes = [
+                decode_executor.submit(
+                    decode_study,
+                    blob_names[study],
+                    generations[study],
+                    studies_files[study],
+                )
+                for study in missing_studies
+            ]
+            for decoded, future in enumerate(as_completed(decodes), start=1):
+                future.result()
+                progress_bar.progress(
+                    (len(missing_studies) + decoded) / steps,
+                    text="Decoding studies...",
+                )
+
+        # The decoded copies are what gets loaded from now on
+        for files in studies_files.values():
+            for temp_file_name in files.values():
+                release_temp_file(temp_file_name)
+
+        progress_bar.empty()
 
-    for study in studies:
-        studies_files[study] = {}
-        for file in ("sav", "json"):
-            blob_name = f"{blob_path}/{_to_code(study)}.{file}"
-            file_bytes = cs_client.download_as_bytes(blob_name)
-            studies_files[study][file] = get_temp_file(file_bytes, f".{file}")
+    with ThreadPoolExecutor(max_workers=IO_WORKERS) as io_executor:
+        cached_studies = io_executor.map(
+            load_study,
+            [blob_names[study] for study in studies],
+            [generations[study] for study in studies],
+        )
+
+        studies_data = {
+            study: {
+                "db": db,
+                "metadata": metadata_df,
+                "config": config,
+                "generation": generations[study],
+            }
+            for study, (db, metadata_df, config) in zip(studies, cached_studies)
+        }
 
-    return studies_files
+    # The studies in use stay, the rest is trimmed to the cache size
+    study_cache.evict([(blob_names[study], generations[study]) for study in studies])
+
+    return studies_data
 
 
 def df_to_html(df: pd.DataFrame) -> str:
@@ -449,13 +596,25 @@ def combine_dictionaries(
     return result
 
 
+def get_value_labels(metadata_df: pd.DataFrame, code: str) -> ValueLabels:
+    """
+    Value labels of a variable, parsed from its metadata `values` string.
+
+    Args:
+        metadata_df (pd.DataFrame): Metadata as returned by `read_sav_metadata`.
+        code (str): Variable name.
+
+    Returns:
+        ValueLabels: Code -> label dict, with the reverse index in `codes`.
+    """
+    return parse_value_labels(metadata_df.at[code, "values"]) or ValueLabels()
+
+
 def combine_dataframes(df1: pd.DataFrame, df2: pd.DataFrame) -> pd.DataFrame:
     # --- Function to merge dict strings ---
     def merge_dicts(d1, d2):
-        d1 = ast.literal_eval(d1) if isinstance(d1, str) and d1.strip() else {}
-        d2 = ast.literal_eval(d2) if isinstance(d2, str) and d2.strip() else {}
-        d1 = {float(k): v for k, v in d1.items()}
-        d2 = {float(k): v for k, v in d2.items()}
+        d1 = {float(k): v for k, v in (parse_value_labels(d1) or {}).items()}
+        d2 = {float(k): v for k, v in (parse_value_labels(d2) or {}).items()}
         d1.update(d2)  # if keys overlap, d2 overwrites
         return str(d1)  # JSON string
 
@@ -487,45 +646,106 @@ def combine_metadata(
     return reduce(combine_dataframes, metadata_list)
 
 
+class FilterIndex:
+    """
+    Category index of the filter variables of a combined database.
+
+    Every variable is factorized once, so the rows matching a selection are a
+    lookup on small integer codes, and filters are combined by ANDing boolean
+    row masks instead of copying the database once per filter.
+
+    Args:
+        db (pd.DataFrame): Combined database.
+        variables (list[str]): Filter variables. `F2` is indexed by value, as
+            it is filtered by range.
+    """
+
+    def __init__(self, db: pd.DataFrame, variables: list[str]):
+        self.n_rows = len(db)
+        self._codes: dict[str, np.ndarray] = {}
+        self._uniques: dict[str, pd.Index] = {}
+        self._values: dict[str, np.ndarray] = {}
+
+        for variable in variables:
+            if variable == "F2":
+                self._values[variable] = db[variable].to_numpy(dtype=float)
+            else:
+                codes, uniques = pd.factorize(db[variable])
+                self._codes[variable] = codes
+                self._uniques[variable] = uniques
+
+    def all_rows(self) -> np.ndarray:
+        return np.ones(self.n_rows, dtype=bool)
+
+    def values(self, variable: str, mask: np.ndarray) -> set:
+        """Distinct non-missing values of `variable` in the rows of `mask`."""
+        codes = self._codes[variable][mask]
+        return set(self._uniques[variable][np.unique(codes[codes >= 0])])
+
+    def isin(self, variable: str, selection: list) -> np.ndarray:
+        """Row mask of the rows where `variable` is one of `selection`."""
+        uniques = self._uniques[variable]
+        # Last slot stays False, it is where missing values (code -1) land
+        lookup = np.zeros(len(uniques) + 1, dtype=bool)
+        positions = uniques.get_indexer(selection)
+        lookup[positions[positions >= 0]] = True
+        return lookup[self._codes[variable]]
+
+    def numeric_values(self, variable: str, mask: np.ndarray) -> np.ndarray:
+        values = self._values[variable][mask]
+        return values[~np.isnan(values)]
+
+    def between(self, variable: str, low: float, high: float) -> np.ndarray:
+        values = self._values[variable]
+        return (values >= low) & (values <= high)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_filter_index(
+    _db: pd.DataFrame, studies_key: tuple, variables: tuple[str, ...]
+) -> FilterIndex:
+    """
+    Filter index of a combined database, built once per `studies_key` (see
+    `get_studies_key`).
+    """
+    return FilterIndex(_db, list(variables))
+
+
 def filter_df(
     fields: list[DeltaGenerator],
     filters: list[dict],
     metadata_df: pd.DataFrame,
-    db: pd.DataFrame,
-) -> pd.DataFrame:
+    filter_index: FilterIndex,
+) -> np.ndarray:
+    """
+    Renders the filter widgets and returns the row mask of the current
+    selection. The options of each filter only include the values left by the
+    filters before it.
+    """
+    mask = filter_index.all_rows()
+
     for field, filter in zip(fields, filters):
         filter_name = filter["label"]
         filter_variable = filter["variable"]
         if filter_variable == "F2":
-            if db["F2"].isna().all():
+            f2_values = filter_index.numeric_values("F2", mask)
+            if not len(f2_values):
+                st.session_state["filter_F2"] = None
                 continue
-            disabled = len(db["F2"].dropna().unique()) == 0
             selection = field.slider(
                 filter_name,
-                value=(
-                    int(min(db["F2"].dropna().unique())) if not disabled else 0,
-                    int(max(db["F2"].dropna().unique())) if not disabled else 0,
-                ),
-                disabled=disabled,
+                value=(int(f2_values.min()), int(f2_values.max())),
             )
-            db = db[
-                (db["F2"] >= selection[0]) & (db["F2"] <= selection[1])
-            ].reset_index(drop=True)
+            st.session_state["filter_F2"] = selection
+            mask &= filter_index.between("F2", *selection)
         else:
-            options_str = metadata_df[metadata_df.index == filter_variable].loc[
-                filter_variable, "values"
-            ]
-            if options_str:
-                try:
-                    options = eval(options_str)
-                    mirrored_options = {v: k for k, v in options.items()}
-                except Exception:
-                    options = []
+            options = get_value_labels(metadata_df, filter_variable)
+            present_values = filter_index.values(filter_variable, mask)
 
             options_cleaned = {
                 value: option
                 for value, option in options.items()
-                if value in db[filter_variable].unique()
+                if value in present_values
             }
 
             # Always store the latest cleaned options in session state
@@ -540,13 +760,43 @@ def filter_df(
                 key=f"{session_key}_display",
             )
             # Map display values back to original values and store in session state
-            selection = [mirrored_options[option] for option in display_selection]
+            selection = [options.codes[option] for option in display_selection]
             st.session_state[session_key] = selection
 
             if selection:
-                db = db[db[filter_variable].isin(selection)].reset_index(drop=True)
+                mask &= filter_index.isin(filter_variable, selection)
+
+    return mask
+
+
+def get_studies_key(
+    studies_data: dict[str, dict], current_references: list[dict[str, str]]
+) -> tuple:
+    """Small key identifying the combined database of the loaded studies."""
+    return (
+        tuple((study, data["generation"]) for study, data in studies_data.items()),
+        tuple((ref["id"], ref["label"]) for ref in current_references),
+    )
 
-    return db
+
+def get_db_key(
+    studies_data: dict[str, dict],
+    current_references: list[dict[str, str]],
+    filters: list[dict],
+) -> tuple:
+    """
+    Small key identifying the filtered database, so cached stages don't have to
+    hash the whole DataFrame on every rerun.
+    """
+    return get_studies_key(studies_data, current_references) + (
+        tuple(
+            (
+                filter["variable"],
+                str(st.session_state.get(f"filter_{filter['variable']}")),
+            )
+            for filter in filters
+        ),
+    )
 
 
 def get_question_codes(
@@ -569,7 +819,7 @@ def transform_variable(
     db: pd.DataFrame,
     metadata_df: pd.DataFrame,
 ) -> pd.Series:
-    mapping: dict = eval(metadata_df.loc[question_code]["values"])
+    mapping: dict = get_value_labels(metadata_df, question_code)
     if len(mapping) == 1 and not next(iter(mapping.values())):
         return (
             db[db.columns[db.columns.str.contains(question_code)][0]]
@@ -592,7 +842,7 @@ def transform_cross_variable(
     db: pd.DataFrame,
     metadata_df: pd.DataFrame,
 ) -> pd.Series:
-    mapping: dict = eval(metadata_df.loc[cross_question_code]["values"])
+    mapping: dict = get_value_labels(metadata_df, cross_question_code)
     return db[cross_question_code].map(mapping).rename(cross_question_label).fillna(0)
 
 
@@ -604,7 +854,7 @@ def reorder_contingency_table(
     selected_question: str,
 ) -> pd.DataFrame:
     group = selected_question.split(" | ")[0]
-    column_mapping: dict = eval(metadata_df.loc[cross_question_code]["values"])
+    column_mapping: dict = get_value_labels(metadata_df, cross_question_code)
     new_columns = [
         column_name.strip()
         for column_name in column_mapping.values()
@@ -615,7 +865,7 @@ def reorder_contingency_table(
 
     reordered_df = df[new_columns]
 
-    index_mapping: dict = eval(metadata_df.loc[question_code]["values"])
+    index_mapping: dict = get_value_labels(metadata_df, question_code)
     index_mapping = {key: value.strip() for key, value in index_mapping.items()}
 
     if len(index_mapping) == 1 and not next(iter(index_mapping.values())):
@@ -818,17 +1068,7 @@ def get_filter_questions(metadata_df: pd.DataFrame) -> list[str]:
         label = metadata_df.loc[idx]["label"]
         values_str = metadata_df.loc[idx]["values"]
 
-        is_candidate = False
-        if values_str:
-            try:
-                evaluated_values = ast.literal_eval(values_str)
-                if isinstance(evaluated_values, dict):
-                    is_candidate = True
-            except (ValueError, SyntaxError):
-                # Handle cases where values_str is not a valid Python literal
-                pass
-
-        if is_candidate:
+        if parse_value_labels(values_str) is not None:
             filtered_labels.append(label)
 
     all_labels_in_index_order = filtered_labels
@@ -868,27 +1108,173 @@ def get_related_question_codes(
     return result
 
 
-def concat_update(base_df: pd.DataFrame, appended_df: pd.DataFrame) -> pd.DataFrame:
+class SignificanceTable:
     """
-    Concatenate values from df1 and df2 at each cell (as strings), similar to update but concatenating.
+    Percentages of the significance table, with the identifiers of the columns
+    every cell is significantly higher than kept in parallel frames.
+
+    Args:
+        values (pd.DataFrame): Percentages, and stats rows as they are.
+        letters (pd.DataFrame | None): Comma separated letters of the columns
+            of the same cross variable a cell beats, "" when none.
+        romans (pd.DataFrame | None): Same for the visits of a cross value.
     """
 
-    def concat(x, y):
-        if x == "":
-            x = np.nan
-        if y == "":
-            y = np.nan
-        if pd.isna(x) and pd.isna(y):
-            return np.nan
-        return " ".join([str(val) for val in [x, y] if pd.notna(val)])
+    def __init__(
+        self,
+        values: pd.DataFrame,
+        letters: pd.DataFrame | None = None,
+        romans: pd.DataFrame | None = None,
+    ):
+        self.values = values
+        self.letters = letters if letters is not None else self._blank_like(values)
+        self.romans = romans if romans is not None else self._blank_like(values)
+
+    @staticmethod
+    def _blank_like(df: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame("", index=df.index, columns=df.columns, dtype=object)
+
+    @property
+    def index(self) -> pd.Index:
+        return self.values.index
+
+    @property
+    def columns(self) -> pd.Index:
+        return self.values.columns
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def map_frames(
+        self, func: Callable[[pd.DataFrame], pd.DataFrame]
+    ) -> "SignificanceTable":
+        """Applies the same row/column transformation to every frame."""
+        return SignificanceTable(
+            func(self.values), func(self.letters), func(self.romans)
+        )
 
-    # Apply combine on each column
-    result = base_df.copy()
+    def filter_columns(self, mask) -> "SignificanceTable":
+        return self.map_frames(lambda df: df.loc[:, mask])
 
-    for col in result.columns.intersection(appended_df.columns):
-        result[col] = result[col].combine(appended_df[col], concat)
 
-    return result
+class CrosstabCube:
+    """
+    Counts of questions against every cross variable of a table.
+
+    Cross variables are mapped to their labels and encoded to integer codes
+    once. Each question is encoded the first time it is requested and counted
+    against all cross variables with a single `np.bincount`, so the tables
+    `pd.crosstab` would give are slices of that count matrix. Questions can
+    be requested from several threads.
+
+    Args:
+        db (pd.DataFrame): Survey data.
+        metadata_df (pd.DataFrame): Metadata with the value labels.
+        cross_questions_codes (list[list[str]]): Sub codes of each cross variable.
+        cross_variables (list[str]): Labels of the cross variables.
+    """
+
+    def __init__(
+        self,
+        db: pd.DataFrame,
+        metadata_df: pd.DataFrame,
+        cross_questions_codes: list[list[str]],
+        cross_variables: list[str],
+    ):
+        self.db = db
+        self.metadata_df = metadata_df
+        self._cross_codes: dict[str, tuple[int, pd.Index]] = {}
+        self._counts: dict[str, tuple[np.ndarray, pd.Index, str]] = {}
+        self._counts_lock = threading.Lock()
+
+        columns_codes = []
+        offset = 0
+        for cross_question_code, cross_question_label in zip(
+            cross_questions_codes, cross_variables
+        ):
+            for sub_cross_question_code in cross_question_code:
+                if sub_cross_question_code in self._cross_codes:
+                    continue
+                codes, labels = pd.factorize(
+                    transform_cross_variable(
+                        sub_cross_question_code, cross_question_label, db, metadata_df
+                    ),
+                    sort=True,
+                )
+                # Each cross variable gets its own block of columns
+                columns_codes.append(np.where(codes >= 0, codes + offset, -1))
+                self._cross_codes[sub_cross_question_code] = (offset, labels)
+                offset += len(labels)
+
+        self._width = offset
+        self._columns_codes = (
+            np.concatenate(columns_codes) if columns_codes else np.array([], dtype=int)
+        )
+
+    def _question_counts(self, question_code: str):
+        with self._counts_lock:
+            cached = self._counts.get(question_code)
+        if cached is None:
+            transformed_variable = transform_variable(
+                question_code, self.db, self.metadata_df
+            )
+            rows_codes, labels = pd.factorize(transformed_variable, sort=True)
+            rows_codes = np.tile(rows_codes, len(self._cross_codes))
+
+            valid = (rows_codes >= 0) & (self._columns_codes >= 0)
+            counts = np.bincount(
+                rows_codes[valid] * self._width + self._columns_codes[valid],
+                minlength=len(labels) * self._width,
+            ).reshape(len(labels), self._width)
+
+            # Counted outside the lock, the first thread to finish wins
+            with self._counts_lock:
+                cached = self._counts.setdefault(
+                    question_code, (counts, labels, transformed_variable.name)
+                )
+
+        return cached
+
+    def crosstab(
+        self,
+        question_code: str,
+        sub_cross_question_code: str,
+        cross_question_label: str,
+        margins: bool = False,
+    ) -> pd.DataFrame:
+        """
+        Same table as `pd.crosstab` of the transformed question and cross
+        variable.
+
+        Args:
+            question_code (str): Question in the rows.
+            sub_cross_question_code (str): Cross variable in the columns.
+            cross_question_label (str): Name of the columns axis.
+            margins (bool): Add the "All" row and column totals.
+
+        Returns:
+            pd.DataFrame: Counts of every observed pair of values.
+        """
+        counts, row_labels, row_name = self._question_counts(question_code)
+        offset, column_labels = self._cross_codes[sub_cross_question_code]
+        table = counts[:, offset : offset + len(column_labels)]
+
+        # Keep only the values observed together, as `pd.crosstab` does
+        rows_present = table.any(axis=1)
+        columns_present = table.any(axis=0)
+        table = pd.DataFrame(
+            table[rows_present][:, columns_present],
+            index=pd.Index(row_labels[rows_present], name=row_name),
+            columns=pd.Index(
+                column_labels[columns_present], name=cross_question_label
+            ),
+        )
+
+        if margins:
+            table["All"] = table.sum(axis=1)
+            table.loc["All"] = table.sum(axis=0)
+
+        return table
 
 
 def build_cross_contingency_table(
@@ -900,22 +1286,22 @@ def build_cross_contingency_table(
     selected_question: str,
     view_type: Literal["Grouped", "Detailed"] = "Detailed",
     questions_by_group: dict[str, list[str]] | None = None,
+    cube: CrosstabCube | None = None,
 ) -> list[pd.DataFrame]:
+    if cube is None:
+        cube = CrosstabCube(db, metadata_df, cross_questions_codes, cross_variables)
+
     contingency_tables_count = []
 
     for i, (cross_question_code, cross_question_label) in enumerate(
         zip(cross_questions_codes, cross_variables)
     ):
-        transformed_variable = transform_variable(question_code, db, metadata_df)
         sub_contingency_tables_count = []
         for j, sub_cross_question_code in enumerate(cross_question_code):
-            transformed_cross_variable = transform_cross_variable(
-                sub_cross_question_code, cross_question_label, db, metadata_df
-            )
-
-            contingency_table_count = pd.crosstab(
-                transformed_variable,
-                transformed_cross_variable,
+            contingency_table_count = cube.crosstab(
+                question_code,
+                sub_cross_question_code,
+                cross_question_label,
                 margins=True if i == 0 and j == 0 else False,
             )
 
@@ -952,7 +1338,7 @@ def build_cross_contingency_table(
 
         contingency_table_count = pd.concat(sub_contingency_tables_count, axis=1)
 
-        index_mapping: dict = eval(metadata_df.loc[question_code]["values"])
+        index_mapping: dict = get_value_labels(metadata_df, question_code)
         index_mapping = {key: value.strip() for key, value in index_mapping.items()}
 
         new_column_tuples = []
@@ -1060,6 +1446,21 @@ def create_grouped_df(
     return collapsed_table
 
 
+def get_question_responses(db: pd.DataFrame, question_code: str) -> pd.Series:
+    """
+    Answers of a question as integers, with missing answers counted as 0.
+
+    Numeric columns are converted directly; only text columns go through the
+    strip and parse round-trip.
+    """
+    responses = db[question_code]
+    if pd.api.types.is_numeric_dtype(responses):
+        responses = responses.fillna(0)
+    else:
+        responses = responses.fillna("0").astype(str).str.strip()
+    return responses.astype(float).astype(int)
+
+
 def append_summary_rows(
     db: pd.DataFrame,
     metadata_df: pd.DataFrame,
@@ -1070,8 +1471,7 @@ def append_summary_rows(
 ) -> pd.DataFrame:
     # Only operate on numeric columns for calculations
     numeric_df = df.select_dtypes(include=[np.number])
-    value_mapping = eval(metadata_df.loc[sub_cross_question_code, "values"])
-    value_mapping = {int(k): v for k, v in value_mapping.items()}
+    label_codes = get_value_labels(metadata_df, sub_cross_question_code).codes
 
     # Prepare row labels (adapt for index type)
     stats_labels = question_type_config["properties"]
@@ -1081,42 +1481,39 @@ def append_summary_rows(
         columns=df.columns,
     )
 
-    for value in numeric_df.columns:
-        if value == "All":
-            filtered_db = db.copy()
-        else:
-            value_code = [
-                code for code, label in value_mapping.items() if label == value
-            ][0]
-            filtered_db = db[db[sub_cross_question_code] == value_code].reset_index(
-                drop=True
-            )
+    # Stats of every cross value at once, plus the whole base as "All"
+    question_responses = get_question_responses(db, question_code)
+    aggregations = ["mean", "std", "count"]
+    grouped_stats = question_responses.groupby(db[sub_cross_question_code]).agg(
+        aggregations
+    )
+    grouped_stats.loc["All"] = question_responses.agg(aggregations)
 
-        question_responses = (
-            filtered_db[question_code]
-            .fillna("0")
-            .astype(str)
-            .str.strip()
-            .astype(float)
-            .astype(int)
-        )
+    value_keys = [
+        value if value == "All" else int(label_codes[value])
+        for value in numeric_df.columns
+    ]
+    value_stats = grouped_stats.reindex(value_keys)
+
+    count = value_stats["count"].fillna(0)
+    std = value_stats["std"]
+    stats_values = stats_template.copy()
+    stats_values.update(
+        {
+            "Mean": value_stats["mean"],
+            "Standard Deviation": std,
+            "Standard Error": std / np.sqrt(count),
+            "Total": count,
+            "Total Answers": count,
+            "%": (count / count) * 100,
+        }
+    )
 
-        stats_values = stats_template.copy()
-        stats_values.update(
-            {
-                "Mean": question_responses.mean(),
-                "Standard Deviation": question_responses.std(),
-                "Standard Error": question_responses.std()
-                / np.sqrt(question_responses.count()),
-                "Total": question_responses.count(),
-                "Total Answers": question_responses.count(),
-                "%": (question_responses.count() / question_responses.count()) * 100,
-            }
+    for stat_label in stats_labels:
+        stats_df.loc[stat_label, numeric_df.columns] = (
+            stats_values[stat_label].to_numpy()
         )
 
-        for stat_label in stats_labels:
-            stats_df.loc[stat_label, value] = stats_values[stat_label]
-
     combined_df = pd.concat([df, stats_df])
 
     return combined_df
@@ -1383,7 +1780,7 @@ def compose_statistical_significance_df(
 
 
 def get_inner_statistical_significance(
-    df_percentage: pd.DataFrame,
+    identifiers_df: pd.DataFrame,
     idx_group_df: pd.DataFrame,
     idx_group_key: tuple,
     col_identifier_func: Callable,
@@ -1398,45 +1795,42 @@ def get_inner_statistical_significance(
             statistical_significance = reorder_header_levels(
                 statistical_significance, levels_order
             )
-        percentage_inner_df = df_percentage.loc[inner_df.index]
 
-        contingency_table_percentage = concat_update(
-            percentage_inner_df,
-            statistical_significance,
-        )
-
-        df_percentage.update(contingency_table_percentage)
+        identifiers_df.loc[
+            statistical_significance.index, statistical_significance.columns
+        ] = statistical_significance.to_numpy()
 
-    return df_percentage
+    return identifiers_df
 
 
 def concatenate_statistical_significance(
     df_count: pd.DataFrame,
     df_percentage: pd.DataFrame,
-) -> pd.DataFrame:
+) -> SignificanceTable:
+    table = SignificanceTable(df_percentage)
     df_count_moment = reorder_header_levels(df_count, [1, 2, 0])
 
     for (idx_group_key, idx_group_df), (
         idx_group_key_moment,
         idx_group_df_moment,
     ) in zip(iterate_index_groups(df_count), iterate_index_groups(df_count_moment)):
-        df_percentage = get_inner_statistical_significance(
-            df_percentage,
+        get_inner_statistical_significance(
+            table.letters,
             idx_group_df,
             idx_group_key,
             column_letters,
         )
 
-        df_percentage = get_inner_statistical_significance(
-            df_percentage, idx_group_df_moment, idx_group_key_moment, roman, [2, 0, 1]
+        get_inner_statistical_significance(
+            table.romans, idx_group_df_moment, idx_group_key_moment, roman, [2, 0, 1]
         )
 
-    return df_percentage
+    return table
 
 
 def append_general_total_row(
-    df_count: pd.DataFrame, df_percentage: pd.DataFrame
-) -> pd.DataFrame:
+    df_count: pd.DataFrame, table: SignificanceTable
+) -> SignificanceTable:
     total_rows = df_count[df_count.index.get_level_values(-1) == "Total"]
     general_total_rows = total_rows[(total_rows != 0).all(axis=1)]
     general_total_rows.index = pd.MultiIndex.from_tuples(
@@ -1446,10 +1840,17 @@ def append_general_total_row(
         ],
         names=general_total_rows.index.names,
     )
-    if not general_total_rows.empty:
-        final_df = pd.concat([general_total_rows.iloc[[0]], df_percentage])
+    if general_total_rows.empty:
+        return table
 
-    return final_df
+    total_row = general_total_rows.iloc[[0]]
+    blank_row = SignificanceTable._blank_like(total_row)
+
+    return SignificanceTable(
+        pd.concat([total_row, table.values]),
+        pd.concat([blank_row, table.letters]),
+        pd.concat([blank_row, table.romans]),
+    )
 
 
 def remap_references(
@@ -1465,7 +1866,7 @@ def remap_references(
         reference["label"]: reference["id"] for reference in current_references
     }
 
-    metadata_mapping = eval(metadata_df.loc["REF.1", "values"])
+    metadata_mapping = get_value_labels(metadata_df, "REF.1")
 
     unregistered_references = [
         reference
@@ -1505,7 +1906,7 @@ def reorder_by_references(
 
     reordered_dfs = []
 
-    references_mapping = eval(metadata_df.loc["REF.1", "values"])
+    references_mapping = get_value_labels(metadata_df, "REF.1")
     reference_names = [references_mapping[id_] for id_ in reference_ids]
 
     for df in dfs:
@@ -1535,18 +1936,167 @@ def reorder_by_references(
     return reordered_dfs
 
 
-@st.cache_data(show_spinner=False)
-def build_statistical_significance_df(
+def build_question_count_table(
     db: pd.DataFrame,
     metadata_df: pd.DataFrame,
+    cube: CrosstabCube,
+    cross_questions_codes: list[list[str]],
+    cross_variables: list[str],
+    selected_question: str,
+    question_label: str,
+    question_codes: list[str],
+    view_type: Literal["Grouped", "Detailed"],
+    questions_by_group: dict[str, list[str]],
+    references: list[str],
+) -> tuple[pd.DataFrame | None, list[tuple[str, str]]]:
+    """
+    Count table of one selected question with all its visits.
+
+    Errors and warnings are returned as `(level, message)` pairs instead of
+    being shown, so the function can run in a worker thread.
+
+    Returns:
+        tuple[pd.DataFrame | None, list[tuple[str, str]]]: The count table, or
+            None if no code of the question could be processed, and the messages.
+    """
+    messages = []
+
+    question_composed_count_dfs = []
+
+    question_count_with_visit = []
+
+    for question_code in question_codes:
+        try:
+            contingency_tables_count = build_cross_contingency_table(
+                db,
+                metadata_df,
+                cross_questions_codes,
+                cross_variables,
+                question_code,
+                selected_question,
+                view_type,
+                questions_by_group,
+                cube,
+            )
+
+            contingency_tables_count = reorder_by_references(
+                contingency_tables_count, references, metadata_df
+            )
+
+            question_composed_count_df = pd.concat(contingency_tables_count, axis=1)
+
+            # Add question label as the first level of the index
+            question_composed_count_df.index = pd.MultiIndex.from_product(
+                [[question_label], question_composed_count_df.index]
+            )
+
+            # convert the index to string
+            question_composed_count_df.index = question_composed_count_df.index.map(
+                lambda x: tuple(str(i) for i in x)
+            )
+
+            question_composed_count_dfs.append(question_composed_count_df)
+
+        except Exception:
+            messages.append(
+                ("error", f"An error occurred processing question `{question_label}`")
+            )
+            messages.append(("error", f"```\n{traceback.format_exc()}\n```"))
+            continue
+
+    if question_composed_count_dfs:
+        # Before concatenation, add the visit as a new level to each DataFrame's columns
+        question_count_with_visit = []
+        seen = set()
+        repeated = set()
+        for question_code, df_count in zip(
+            question_codes,
+            question_composed_count_dfs,
+        ):
+            question_code_parts = question_code.split("_")
+            composed_variable = "_".join(question_code_parts[:2])
+            if len(question_code_parts) > 2 and composed_variable in seen:
+                repeated.add(composed_variable)
+                continue
+            seen.add(composed_variable)
+            if len(question_code_parts) == 1:
+                visit = "V1"
+            else:
+                visit = question_code_parts[1]  # e.g., 'V1'
+
+            if isinstance(df_count.columns, pd.MultiIndex):
+                new_columns = pd.MultiIndex.from_tuples(
+                    [(visit, *col) for col in df_count.columns]
+                )
+            else:
+                new_columns = pd.MultiIndex.from_tuples(
+                    [(visit, col) for col in df_count.columns]
+                )
+            df_count.columns = new_columns
+            question_count_with_visit.append(df_count)
+        if len(repeated) > 0:
+            messages.append(
+                (
+                    "warning",
+                    f"The variable `{question_label}`"
+                    " has been processed multiple times. "
+                    "Only the first instance will be processed and shown.",
+                )
+            )
+        if len(question_count_with_visit) > 1:
+            column_lists = [
+                tuple(df.columns.tolist()) for df in question_count_with_visit
+            ]
+            all_columns_same = len(set(column_lists)) == 1
+            question_table_count = question_count_with_visit[0].copy()
+            if not all_columns_same:
+                for df in question_count_with_visit[1:]:
+                    index_order = question_table_count.index.tolist()
+                    question_table_count = question_table_count.merge(
+                        df,
+                        how="outer",
+                        left_index=True,
+                        right_index=True,
+                        sort=False,
+                    )
+                    question_table_count = question_table_count.reindex(
+                        index_order, axis=0
+                    )
+            else:
+                for df in question_count_with_visit[1:]:
+                    question_table_count = question_table_count.combine_first(df)
+        else:
+            question_table_count = pd.concat(question_count_with_visit, axis=1)
+    else:
+        return None, messages
+
+    return question_table_count, messages
+
+
+@st.cache_data(show_spinner=False)
+def build_count_table(
+    _db: pd.DataFrame,
+    _mask: np.ndarray,
+    _metadata_df: pd.DataFrame,
+    db_key: tuple,
     cross_variables: list[str],
     selected_questions: list[str],
     config: dict,
     questions_by_group: dict[str, list[str]],
     view_type: Literal["Grouped", "Detailed"] = "Detailed",
-    show_question_text: bool = False,
     references: list[str] = [],
 ) -> pd.DataFrame:
+    """
+    Counts of the selected questions against the cross variables, indexed by
+    group, label, question text and option.
+
+    The database, its filter mask and its metadata are not hashed by the
+    cache; they are identified by `db_key` (see `get_db_key`) instead. The
+    filtered rows are only copied out when the counts are not cached.
+    """
+    db = _db if _mask.all() else _db[_mask].reset_index(drop=True)
+    metadata_df = _metadata_df
+
     parsed_questions = parse_question_codes(db.columns, metadata_df)
 
     cross_questions_codes = get_cross_questions_codes(
@@ -1561,121 +2111,50 @@ def build_statistical_significance_df(
         selected_questions_codes, parsed_questions
     )
 
-    question_tables_count = []
-
-    for selected_question, (question_label, question_codes) in zip(
-        selected_questions, selected_questions_codes.items()
-    ):
-        question_composed_count_dfs = []
-
-        question_count_with_visit = []
+    cube = CrosstabCube(db, metadata_df, cross_questions_codes, cross_variables)
 
-        for question_code in question_codes:
-            try:
-                contingency_tables_count = build_cross_contingency_table(
-                    db,
-                    metadata_df,
-                    cross_questions_codes,
-                    cross_variables,
-                    question_code,
-                    selected_question,
-                    view_type,
-                    questions_by_group,
-                )
-
-                contingency_tables_count = reorder_by_references(
-                    contingency_tables_count, references, metadata_df
-                )
-
-                question_composed_count_df = pd.concat(contingency_tables_count, axis=1)
-
-                # Add question label as the first level of the index
-                question_composed_count_df.index = pd.MultiIndex.from_product(
-                    [[question_label], question_composed_count_df.index]
-                )
-
-                # convert the index to string
-                question_composed_count_df.index = question_composed_count_df.index.map(
-                    lambda x: tuple(str(i) for i in x)
-                )
-
-                question_composed_count_dfs.append(question_composed_count_df)
+    # Question types are cached beforehand, so worker threads only read them
+    for selected_question in selected_questions:
+        group, label = selected_question.split(" | ")
+        for question in questions_by_group[group]:
+            if question.get("label") == label:
+                get_question_type(question["question_type_id"])
+
+    build_question = partial(
+        build_question_count_table,
+        db,
+        metadata_df,
+        cube,
+        cross_questions_codes,
+        cross_variables,
+        view_type=view_type,
+        questions_by_group=questions_by_group,
+        references=references,
+    )
+    jobs = [
+        (selected_question, question_label, question_codes)
+        for selected_question, (question_label, question_codes) in zip(
+            selected_questions, selected_questions_codes.items()
+        )
+    ]
 
-            except Exception:
-                st.error(f"An error occurred processing question `{question_label}`")
-                st.error(f"```\n{traceback.format_exc()}\n```")
-                continue
+    # Threads share the filtered database instead of copying it per worker
+    with worker_pool(len(jobs), QUESTION_WORKERS) as executor:
+        results = list(executor.map(lambda job: build_question(*job), jobs))
 
-        if question_composed_count_dfs:
-            # Before concatenation, add the visit as a new level to each DataFrame's columns
-            question_count_with_visit = []
-            seen = set()
-            repeated = set()
-            for question_code, df_count in zip(
-                question_codes,
-                question_composed_count_dfs,
-            ):
-                question_code_parts = question_code.split("_")
-                composed_variable = "_".join(question_code_parts[:2])
-                if len(question_code_parts) > 2 and composed_variable in seen:
-                    repeated.add(composed_variable)
-                    continue
-                seen.add(composed_variable)
-                if len(question_code_parts) == 1:
-                    visit = "V1"
-                else:
-                    visit = question_code_parts[1]  # e.g., 'V1'
-
-                if isinstance(df_count.columns, pd.MultiIndex):
-                    new_columns = pd.MultiIndex.from_tuples(
-                        [(visit, *col) for col in df_count.columns]
-                    )
-                else:
-                    new_columns = pd.MultiIndex.from_tuples(
-                        [(visit, col) for col in df_count.columns]
-                    )
-                df_count.columns = new_columns
-                question_count_with_visit.append(df_count)
-            if len(repeated) > 0:
-                st.warning(
-                    f"The variable `{question_label}`"
-                    " has been processed multiple times. "
-                    "Only the first instance will be processed and shown."
-                )
-            if len(question_count_with_visit) > 1:
-                column_lists = [
-                    tuple(df.columns.tolist()) for df in question_count_with_visit
-                ]
-                all_columns_same = len(set(column_lists)) == 1
-                question_table_count = question_count_with_visit[0].copy()
-                if not all_columns_same:
-                    for df in question_count_with_visit[1:]:
-                        index_order = question_table_count.index.tolist()
-                        question_table_count = question_table_count.merge(
-                            df,
-                            how="outer",
-                            left_index=True,
-                            right_index=True,
-                            sort=False,
-                        )
-                        question_table_count = question_table_count.reindex(
-                            index_order, axis=0
-                        )
-                else:
-                    for df in question_count_with_visit[1:]:
-                        question_table_count = question_table_count.combine_first(df)
-            else:
-                question_table_count = pd.concat(question_count_with_visit, axis=1)
-        else:
-            continue
-
-        question_tables_count.append(question_table_count)
+    # Messages are shown in question order, whatever order workers finished in
+    question_tables_count = []
+    for (selected_question, _, _), (question_table_count, messages) in zip(
+        jobs, results
+    ):
+        for level, message in messages:
+            getattr(st, level)(message)
+        if question_table_count is not None:
+            question_tables_count.append((selected_question, question_table_count))
 
     final_tables = []
 
-    for selected_question, question_table_count in zip(
-        selected_questions, question_tables_count
-    ):
+    for selected_question, question_table_count in question_tables_count:
         group, label = selected_question.split(" | ")
         group_questions = questions_by_group[group]
 
@@ -1702,119 +2181,178 @@ def build_statistical_significance_df(
                     ]
                 )
 
-            # Create three-level multiindex
-            new_index = []
-
-            for i in range(len(question_table_count)):
-                first_level = question_table_count.index[i][0]
-                second_level = question_table_count.index[i][1]
+            question_table_count.index = pd.MultiIndex.from_tuples(
+                [(group, label, *index) for index in question_table_count.index]
+            )
 
-                composed_label = (
-                    f"{label} - {first_level}" if show_question_text else label
-                )
+            final_tables.append(question_table_count)
 
-                new_index.append((group, composed_label, second_level))
+    return pd.concat(final_tables).fillna(0)
 
-            question_table_count.index = pd.MultiIndex.from_tuples(new_index)
 
-            final_tables.append(question_table_count)
+@st.cache_data(show_spinner=False)
+def build_statistical_significance_df(
+    count_table: pd.DataFrame,
+    view_type: Literal["Grouped", "Detailed"] = "Detailed",
+    show_question_text: bool = False,
+) -> SignificanceTable:
+    final_table_count = count_table.copy()
 
-    final_table_count = pd.concat(final_tables).fillna(0)
+    # Create three-level multiindex, the question text is part of the groups
+    # the significance is computed on
+    final_table_count.index = pd.MultiIndex.from_tuples(
+        [
+            (
+                group,
+                f"{label} - {question_text}" if show_question_text else label,
+                option,
+            )
+            for group, label, question_text, option in final_table_count.index
+        ]
+    )
 
     final_table_count.index.names = ["Group", "Question", "Options"]
 
     final_table_percentage = get_percentage_df(final_table_count)
 
-    concatenate_statistical_significance(
+    significance_table = concatenate_statistical_significance(
         final_table_count,
         final_table_percentage,
     )
 
     if view_type == "Grouped":
         # Drop all rows that are stats in the last level of the index
-        final_table_percentage = remove_stats(final_table_percentage)
+        significance_table = significance_table.map_frames(remove_stats)
 
-        final_table_percentage = append_general_total_row(
-            final_table_count, final_table_percentage
+        significance_table = append_general_total_row(
+            final_table_count, significance_table
         )
 
-    final_table_percentage = add_letter_level_per_group(final_table_percentage)
+    return significance_table.map_frames(add_letter_level_per_group)
 
-    return final_table_percentage
 
-
-def format_mixed_cell(x, decimal_precision: int):
-    # Only try to match if x is a string
-    if isinstance(x, str):
-        match = re.match(r"^\s*([+-]?\d+(?:\.\d+)?)\s+(.+)$", x)
-        if match:
-            num, s = match.groups()
-            num = round(float(num), decimal_precision)
-            if decimal_precision == 0 or num % 1 == 0:
-                num_str = "{:d}".format(int(num))
-            else:
-                num_str = f"{num:,.{decimal_precision}f}"
-
-            # Tokenize by spaces and classify
-            tokens = s.split()
-            letters = []
-            romans = []
-            if len(tokens) == 1:
-                token_clean = tokens[0].replace(",", "")
-                if re.fullmatch(r"[IVXL]+", token_clean):
-                    romans.append(tokens[0])
-                elif re.fullmatch(r"[A-Za-z,]+", tokens[0]):
-                    letters.append(tokens[0])
-                else:
-                    letters.append(tokens[0])  # fallback
-            else:
-                for i, token in enumerate(tokens):
-                    # Remove commas for classification, but keep for display
-                    token_clean = token.replace(",", "")
-                    if i == 0:
-                        if re.fullmatch(r"[A-Za-z,]+", token_clean):
-                            letters.append(token)
-                    else:
-                        if re.fullmatch(r"[IVXLCDM]+", token_clean):
-                            romans.append(token)
-
-            out = []
-            if letters:
-                out.append(
-                    f"<span style='color: #ff4d4d; background: #fff0f0; border-radius: 3px; padding: 1px 3px'>{' '.join(letters)}</span>"
-                )
-            if romans:
-                out.append(
-                    f"<span style='color: #2563eb; background: #e0f2ff; border-radius: 3px; padding: 1px 3px'>{' '.join(romans)}</span>"
-                )
-            s = " ".join(out)
-            return f"{num_str} {s}"
-        else:
-            try:
-                num = float(x)
-            except Exception:
-                return x
-            num = round(num, decimal_precision)
-            if decimal_precision == 0 or num % 1 == 0:
-                return "{:d}".format(int(num))
-            else:
-                return f"{num:,.{decimal_precision}f}"
-    elif isinstance(x, (int, float)):
-        num = round(float(x), decimal_precision)
-        if decimal_precision == 0 or num % 1 == 0:
-            return "{:d}".format(int(num))
-        else:
-            return f"{num:,.{decimal_precision}f}"
+def format_number(x, decimal_precision: int) -> str:
+    try:
+        num = float(x)
+    except (TypeError, ValueError):
+        return str(x)
+    if np.isnan(num):
+        return ""
+    num = round(num, decimal_precision)
+    if decimal_precision == 0 or num % 1 == 0:
+        return "{:d}".format(int(num))
     else:
-        return x
+        return f"{num:,.{decimal_precision}f}"
 
 
-def create_html_table(df: pd.DataFrame, decimal_precision: int) -> str:
+def format_significance_cell(
+    value, letters: str, romans: str, decimal_precision: int
+) -> str:
+    out = [format_number(value, decimal_precision)]
+    if letters:
+        out.append(
+            f"<span style='color: #ff4d4d; background: #fff0f0; border-radius: 3px; padding: 1px 3px'>{letters}</span>"
+        )
+    if romans:
+        out.append(
+            f"<span style='color: #2563eb; background: #e0f2ff; border-radius: 3px; padding: 1px 3px'>{romans}</span>"
+        )
+    return " ".join(out)
+
+
+def _row_spans(keys: list[tuple]) -> list[int]:
+    """
+    Length of every run of equal consecutive keys, set on the first row of the
+    run and 0 on the rest.
+    """
+    spans = [0] * len(keys)
+    start = 0
+    for i in range(1, len(keys) + 1):
+        if i == len(keys) or keys[i] != keys[start]:
+            spans[start] = i - start
+            start = i
+    return spans
+
+
+def _table_header(df: pd.DataFrame) -> str:
+    n_index_levels = df.index.nlevels
+    column_tuples = [
+        column if isinstance(column, tuple) else (column,) for column in df.columns
+    ]
+    blank_index_cells = '<th class="blank"></th>' * n_index_levels
+
+    rows = []
+    for level in range(df.columns.nlevels):
+        keys = [column[: level + 1] for column in column_tuples]
+        cells = [
+            f'<th colspan="{span}">{escape(str(key[-1]))}</th>'
+            for key, span in zip(keys, _row_spans(keys))
+            if span
+        ]
+        rows.append(f"<tr>{blank_index_cells}{''.join(cells)}</tr>")
+
+    if any(name is not None for name in df.index.names):
+        index_names = "".join(
+            f"<th>{escape(str(name)) if name is not None else ''}</th>"
+            for name in df.index.names
+        )
+        rows.append(f'<tr>{index_names}<th colspan="{df.shape[1]}"></th></tr>')
+
+    return f"<thead>{''.join(rows)}</thead>"
+
+
+def _table_body(df: pd.DataFrame, cells: list[list[str]]) -> str:
+    index_tuples = [
+        index if isinstance(index, tuple) else (index,) for index in df.index
+    ]
+    index_spans = [
+        _row_spans([index[: level + 1] for index in index_tuples])
+        for level in range(df.index.nlevels)
+    ]
+
+    rows = []
+    for i, (index, row_cells) in enumerate(zip(index_tuples, cells)):
+        index_cells = "".join(
+            f'<th rowspan="{spans[i]}">{escape(str(label))}</th>'
+            for label, spans in zip(index, index_spans)
+            if spans[i]
+        )
+        data_cells = "".join(f"<td>{cell}</td>" for cell in row_cells)
+        rows.append(f"<tr>{index_cells}{data_cells}</tr>")
+
+    return f"<tbody>{''.join(rows)}</tbody>"
+
+
+def get_html_table_pages(table: SignificanceTable) -> int:
+    return max(1, -(-len(table) // HTML_TABLE_PAGE_ROWS))
+
+
+@st.cache_data(show_spinner=False)
+def create_html_table(
+    table: SignificanceTable, decimal_precision: int, page: int | None = None
+) -> str:
+    """
+    Renders the significance table as HTML.
+
+    Args:
+        table (SignificanceTable): Significance table.
+        decimal_precision (int): Decimals shown for percentages and stats.
+        page (int | None): 0-based page of `HTML_TABLE_PAGE_ROWS` rows to
+            render, the whole table when None.
+
+    Returns:
+        str: HTML with the table and its styles.
+    """
+    if page is not None:
+        rows = slice(page * HTML_TABLE_PAGE_ROWS, (page + 1) * HTML_TABLE_PAGE_ROWS)
+        table = table.map_frames(lambda df: df.iloc[rows])
+    df = table.values
+
     nlevels = df.columns.nlevels
     row_height = 38  # px
     sticky_css = ""
-    # Sticky column header CSS (as before)
-    for i in range(nlevels + 3):
+    # Sticky column header CSS, one row per column level plus the index names
+    for i in range(nlevels + 1):
         top = i * row_height
         # Increase z-index with each header row to avoid overlap
         z_index = 10 + nlevels - i
@@ -1825,6 +2363,13 @@ def create_html_table(df: pd.DataFrame, decimal_precision: int) -> str:
             f"}}"
         )
 
+    rows_css = "".join(
+        f".significance-table {style['selector']} {{"
+        + "; ".join(f"{prop}: {value}" for prop, value in style["props"])
+        + "}"
+        for style in table_styles
+    )
+
     css = (
         "<style>"
         ".sticky-table-container {max-height: 600px; overflow-y: auto; width: 100%; border: 1px solid #ccc; margin: 10px 0;}"
@@ -1833,12 +2378,28 @@ def create_html_table(df: pd.DataFrame, decimal_precision: int) -> str:
         "th, td {border: 1px solid #ddd !important; padding: 8px !important; text-align: center !important;}"
         "tr { text-align: center !important; margin: 0; }"
         f"{sticky_css}"
+        f"{rows_css}"
         "</style>"
     )
 
+    # Tables repeat a small set of values, so each one is formatted once
+    format_cell = lru_cache(maxsize=None)(
+        lambda value, letters, romans: format_significance_cell(
+            value, letters, romans, decimal_precision
+        )
+    )
+    cells = [
+        list(map(format_cell, values, letters, romans))
+        for values, letters, romans in zip(
+            df.to_numpy(dtype=object),
+            table.letters.to_numpy(dtype=object),
+            table.romans.to_numpy(dtype=object),
+        )
+    ]
+
     html_table = (
-        df.style.format(lambda x: format_mixed_cell(x, decimal_precision))
-        .set_table_styles(table_styles)
-        .to_html(escape=False, border=5)
+        '<table class="significance-table" border="5">'
+        f"{_table_header(df)}{_table_body(df, cells)}"
+        "</table>"
     )
     return f"{css}<div class='sticky-table-container'>{html_table}</div>"
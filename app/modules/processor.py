@@ -9,85 +9,100 @@ from itertools import combinations, permutations
 from openpyxl import Workbook, load_workbook
 from difflib import SequenceMatcher
 from openpyxl.utils import get_column_letter, range_boundaries,quote_sheetname
-from openpyxl.styles import PatternFill, Border, Side, Font, Alignment
+from openpyxl.styles import Border, Side
 from openpyxl.cell.cell import MergedCell
 
+from app.modules.excel_styles import (
+    BLUE_FILL,
+    BOLD_FONT,
+    CENTER_ALIGNMENT,
+    CENTER_WRAP_ALIGNMENT,
+    GRAY_FILL,
+    GREEN_TITLE_FILL,
+    INDEX_HEADER_FILL,
+    INDEX_SECTIONS_FILL,
+    INDEX_SUBSECTIONS_FILL,
+    INDEX_TITLE_FONT,
+    KPI_GRAY_FILL,
+    KPI_GREEN_FILL,
+    KPI_RED_FILL,
+    LINK_FONT,
+    MEDIUM,
+    MEDIUM_BORDER,
+    RED_FILL,
+    THIN,
+    THIN_BORDER,
+    WHITE_FONT,
+    WRAP_ALIGNMENT,
+    YELLOW_FILL,
+    sides_border,
+    style_range,
+)
 from app.modules.segment_spss import get_temp_file
 from app.modules.text_function import processSavMulti
-from app.modules.utils import write_temp_excel
+from app.modules.utils import PlantillaSpec, SavSession, write_temp_excel
 from app.modules.processing import apply_red_and_blue_color_to_letter,calculate_differences,processing
 
-import pyreadstat
 
-
-def getPreProcessCode(spss_file: BytesIO, xlsx_file: BytesIO,xlsx_file_LC: BytesIO):
+def getPreProcessCode(
+    spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec, xlsx_file_LC: BytesIO | PlantillaSpec
+):
     try:
-        file_xlsx = get_temp_file(xlsx_file)
-        inverseVarsList = pd.read_excel(
-            file_xlsx, usecols="A,E", skiprows=3, names=["vars", "inverses"]
-        ).dropna()
+        sav = SavSession.from_file(spss_file)
+        plantilla = PlantillaSpec.from_file(xlsx_file)
+        inverseVarsList = plantilla.columns("A,E", ["vars", "inverses"]).dropna()
         inverseVarsList = inverseVarsList[inverseVarsList["inverses"] == "I"].iloc[:, 0]
-        scaleVarsList = pd.read_excel(
-            file_xlsx, usecols="A,D", skiprows=3, names=["vars", "scale"]
-        ).dropna()
+        scaleVarsList = plantilla.columns("A,D", ["vars", "scale"]).dropna()
 
         preprocesscode = ""
-        preprocesscode += processSavMulti(spss_file)[1] + processSavMulti(spss_file)[0]
-        preprocesscode += getGroupCreateMultisCode(spss_file)
+        recodes, labels = processSavMulti(sav)
+        preprocesscode += labels + recodes
+        preprocesscode += getGroupCreateMultisCode(sav)
         if not inverseVarsList.empty:
-            preprocesscode += getInverseCodeVars(spss_file, inverseVarsList)
+            preprocesscode += getInverseCodeVars(sav, inverseVarsList)
         if not scaleVarsList.empty:
-            preprocesscode += getScaleCodeVars(spss_file, scaleVarsList)
+            preprocesscode += getScaleCodeVars(sav, scaleVarsList)
         preprocesscode += "\nCOMPUTE TOTAL=1.\nVARIABLE LABELS TOTAL 'TOTAL'.\nVALUE LABELS TOTAL 1 \"TOTAL\".\nEXECUTE.\n"
-        preprocesscode += getCloneCodeVars(spss_file, xlsx_file)
-        preprocesscode += getPreProcessAbiertas(spss_file, xlsx_file,xlsx_file_LC)
+        preprocesscode += getCloneCodeVars(sav, plantilla)
+        preprocesscode += getPreProcessAbiertas(sav, plantilla,xlsx_file_LC)
         return preprocesscode
     except Exception:
         return "Error with plantilla hwen try to get preprocess code"
 
 
-def checkPreProcessCodeUnique(spss_file: BytesIO, xlsx_file: BytesIO):
-    file_xlsx = get_temp_file(xlsx_file)
-    inverseVarsList = pd.read_excel(
-        file_xlsx, usecols="A,E", skiprows=3, names=["vars", "inverses"]
-    ).dropna()
+def checkPreProcessCodeUnique(spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec):
+    sav = SavSession.from_file(spss_file)
+    plantilla = PlantillaSpec.from_file(xlsx_file)
+    inverseVarsList = plantilla.columns("A,E", ["vars", "inverses"]).dropna()
     inverseVarsList = inverseVarsList[inverseVarsList["inverses"] == "I"].iloc[:, 0]
-    scaleVarsList = pd.read_excel(
-        file_xlsx, usecols="A,D", skiprows=3, names=["vars", "scale"]
-    ).dropna()
+    scaleVarsList = plantilla.columns("A,D", ["vars", "scale"]).dropna()
     flag1 = False
     flag2 = False
     if not inverseVarsList.empty:
-        flag1 = checkInverseCodeVars(spss_file, inverseVarsList)
+        flag1 = checkInverseCodeVars(sav, inverseVarsList)
     if not scaleVarsList.empty:
-        flag2 = getScaleCodeVars(spss_file, scaleVarsList) != ""
+        flag2 = getScaleCodeVars(sav, scaleVarsList) != ""
     return flag1, flag2
 
 
-def getPreProcessCode2(spss_file: BytesIO):
-    preprocesscode = processSavMulti(spss_file)[1] + processSavMulti(spss_file)[0]
+def getPreProcessCode2(spss_file: BytesIO | SavSession):
+    recodes, labels = processSavMulti(spss_file)
+    preprocesscode = labels + recodes
     return preprocesscode
 
 
 def getProcessCode2(
-    spss_file: BytesIO, xlsx_file: BytesIO, xlsx_file_LC: BytesIO, checkinclude=False, rutaarchivo=""
+    spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec, xlsx_file_LC: BytesIO | PlantillaSpec, checkinclude=False, rutaarchivo=""
 ):
-    result, warning2 = getProcessCode(spss_file, xlsx_file, xlsx_file_LC, checkinclude)
-    file_xlsx = get_temp_file(xlsx_file)
-    nombrehoja = (
-        pd.read_excel(file_xlsx, usecols="O", skiprows=3, names=["name"])
-        .dropna()
-        .iloc[0, 0]
+    sav = SavSession.from_file(spss_file)
+    plantilla = PlantillaSpec.from_file(xlsx_file)
+    libro_codigos = PlantillaSpec.from_file(xlsx_file_LC)
+    template = getProcessCodeTemplate(sav, plantilla, checkinclude)
+    result, warning2 = stampProcessCode(
+        template, sav, plantilla, libro_codigos, checkinclude
     )
-    try:
-        sufijo = (
-            pd.read_excel(file_xlsx, usecols="P", skiprows=3, names=["name"])
-            .dropna()
-            .iloc[0, 0]
-        )
-        sufijo = " " + str(sufijo)
-    except Exception:
-        sufijo = ""
+    nombrehoja = plantilla.sheet_name
+    sufijo = plantilla.suffix
     warning = ""
     if warning2 != "":
         warning += "/" + nombrehoja + "/ " + warning2
@@ -103,26 +118,15 @@ def getProcessCode2(
         + "'\n     LOCATION=LASTCOLUMN  NOTESCAPTIONS=NO.\n"
         + "OUTPUT CLOSE NAME=*.\nEXECUTE.\n"
     )
-    temp_file_name = get_temp_file(spss_file)
-    data, study_metadata = pyreadstat.read_sav(
-        temp_file_name, apply_value_formats=False
-    )
+    data, study_metadata = sav.data, sav.metadata
     result += (
         "\n*___TOTAL____________________________________________________________________________\n ____________________________________________________________________________________\n ______"
         + nombrehoja
         + sufijo
         + "______________________________________________________________________________.\n"
     )
-    varsList = (
-        pd.read_excel(file_xlsx, usecols="M", skiprows=3, names=["varsSegment"])
-        .dropna()["varsSegment"]
-        .tolist()
-    )
-    varsList_segment = (
-        pd.read_excel(file_xlsx, usecols="N", skiprows=3, names=["vars_Segment"])
-        .dropna()["vars_Segment"]
-        .tolist()
-    )
+    varsList = plantilla.segment_vars
+    varsList_segment = plantilla.vars_segment
 
     if not varsList_segment:
         for var in varsList:
@@ -147,8 +151,8 @@ def getProcessCode2(
                     )
                 result += "DATASET ACTIVATE REF_" + name_dataset + ".\n"
                 condition = data[var] == refindex
-                result_preg, _ = getProcessCode(
-                    spss_file, xlsx_file, xlsx_file_LC, checkinclude, condition=condition
+                result_preg, _ = stampProcessCode(
+                    template, sav, plantilla, libro_codigos, checkinclude, condition=condition
                 )
                 result += result_preg
                 result += "\nOUTPUT MODIFY\n  /SELECT ALL EXCEPT (TABLES)\n  /DELETEOBJECT DELETE = YES."
@@ -204,8 +208,8 @@ def getProcessCode2(
                         condition1 = data[var] == refindex
                         condition2 = data[var_segment] == refindex_segment
                         condition = condition1 & condition2
-                        result_preg, _ = getProcessCode(
-                            spss_file, xlsx_file, xlsx_file_LC, checkinclude, condition=condition
+                        result_preg, _ = stampProcessCode(
+                            template, sav, plantilla, libro_codigos, checkinclude, condition=condition
                         )
                         result += result_preg
                         result += "\nOUTPUT MODIFY\n  /SELECT ALL EXCEPT (TABLES)\n  /DELETEOBJECT DELETE = YES."
@@ -257,25 +261,68 @@ def getProcessCode2(
 
 
 def getProcessCode(
-    spss_file: BytesIO, xlsx_file: BytesIO, xlsx_file_LC: BytesIO, checkinclude=False, condition=None
+    spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec, xlsx_file_LC: BytesIO | PlantillaSpec, checkinclude=False, condition=None
 ):
-    file_xlsx = get_temp_file(xlsx_file)
-    varsList = pd.read_excel(
-        file_xlsx,
-        usecols="A,B,D,E",
-        skiprows=3,
-        names=["vars", "varsTypes", "Scales", "descendOrder"],
-    ).dropna(subset=["vars"])
-    colVarsList = pd.melt(
-        pd.read_excel(file_xlsx, nrows=2), var_name="colVars", value_name="colVarsNames"
-    ).drop(0)
+    template = getProcessCodeTemplate(spss_file, xlsx_file, checkinclude)
+    return stampProcessCode(
+        template, spss_file, xlsx_file, xlsx_file_LC, checkinclude, condition=condition
+    )
+
+
+def stampProcessCode(
+    template: list[tuple[str, str | None]],
+    spss_file: BytesIO | SavSession,
+    xlsx_file: BytesIO | PlantillaSpec,
+    xlsx_file_LC: BytesIO | PlantillaSpec,
+    checkinclude=False,
+    condition=None,
+):
+    """
+    Fills a `getProcessCodeTemplate` template for one base condition.
+
+    Only the open questions depend on the condition, since their codes are
+    ordered by frequency, so they are the only part computed again.
+
+    Returns:
+        tuple[str, str]: The tables syntax and the open questions warnings.
+    """
     result = ""
     warning = ""
-    colvars = colVarsList.iloc[:, 0]
-    temp_file_name = get_temp_file(spss_file)
-    data, study_metadata = pyreadstat.read_sav(
-        temp_file_name, apply_value_formats=False
-    )
+    for syntax, varAbierta in template:
+        result += syntax
+        if varAbierta is not None:
+            result_abierta, result_warning = getProcessAbiertas(
+                spss_file,
+                xlsx_file,
+                xlsx_file_LC,
+                checkinclude,
+                varAbierta,
+                condition=condition,
+            )
+            result += result_abierta
+            warning += result_warning
+    return result, warning
+
+
+def getProcessCodeTemplate(
+    spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec, checkinclude=False
+) -> list[tuple[str, str | None]]:
+    """
+    Builds the tables syntax that does not depend on the base condition.
+
+    Returns:
+        list[tuple[str, str | None]]: Pairs of closed questions syntax and the
+        open question that follows it, `None` for the last chunk.
+    """
+    plantilla = PlantillaSpec.from_file(xlsx_file)
+    varsList = plantilla.columns(
+        "A,B,D,E", ["vars", "varsTypes", "Scales", "descendOrder"]
+    ).dropna(subset=["vars"])
+    template = []
+    result = ""
+    colvars = plantilla.col_vars
+    sav = SavSession.from_file(spss_file)
+    study_metadata = sav.metadata
     for i in range(len(colvars)):
         var = colvars[i + 1]
         if re.search("^[PFSV].*[1-90].*A", var):
@@ -546,35 +593,26 @@ def getProcessCode(
                     + '".'
                 )
         elif varsList.iloc[i][1] == "A":
-            result_abierta, result_warning = getProcessAbiertas(
-                spss_file,
-                xlsx_file,
-                xlsx_file_LC,
-                checkinclude,
-                varsList.iloc[i][0],
-                condition=condition,
-            )
-            result += result_abierta
-            warning += result_warning
-    return result, warning
+            template.append((result, varsList.iloc[i][0]))
+            result = ""
+    template.append((result, None))
+    return template
 
 def getWarning(
-    spss_file: BytesIO, xlsx_file: BytesIO, xlsx_file_LC: BytesIO, checkinclude=False, condition=None
+    spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec, xlsx_file_LC: BytesIO | PlantillaSpec, checkinclude=False, condition=None
 ):
-    file_xlsx = get_temp_file(xlsx_file)
-    varsList = pd.read_excel(
-        file_xlsx,
-        usecols="A,B,D,E",
-        skiprows=3,
-        names=["vars", "varsTypes", "Scales", "descendOrder"],
+    sav = SavSession.from_file(spss_file)
+    plantilla = PlantillaSpec.from_file(xlsx_file)
+    varsList = plantilla.columns(
+        "A,B,D,E", ["vars", "varsTypes", "Scales", "descendOrder"]
     ).dropna(subset=["vars"])
     warning = ""
 
     for i in range(len(varsList)):
         if varsList.iloc[i][1] == "A":
             _, result_warning = getProcessAbiertas(
-                spss_file,
-                xlsx_file,
+                sav,
+                plantilla,
                 xlsx_file_LC,
                 checkinclude,
                 varsList.iloc[i][0],
@@ -584,24 +622,19 @@ def getWarning(
     return warning
 
 
-def getPreProcessAbiertas(spss_file: BytesIO, xlsx_file: BytesIO, xlsx_file_LC: BytesIO):
+def getPreProcessAbiertas(spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec, xlsx_file_LC: BytesIO | PlantillaSpec):
     result = ""
-    temp_file_name = get_temp_file(spss_file)
-    data, study_metadata = pyreadstat.read_sav(
-        temp_file_name, apply_value_formats=False
-    )
-    file_xlsx = get_temp_file(xlsx_file)
-    file_xlsx_LC = get_temp_file(xlsx_file_LC)
-    varsList = pd.read_excel(
-        file_xlsx, usecols="A,C", skiprows=3, names=["vars", "sheetNames"]
-    ).dropna()
+    sav = SavSession.from_file(spss_file)
+    study_metadata = sav.metadata
+    plantilla = PlantillaSpec.from_file(xlsx_file)
+    libro_codigos = PlantillaSpec.from_file(xlsx_file_LC)
+    varsList = plantilla.columns("A,C", ["vars", "sheetNames"]).dropna()
     for i in range(len(varsList)):
-        lcTable = pd.read_excel(
-            file_xlsx_LC,
-            sheet_name=varsList.iloc[i][1],
-            usecols="A,B",
+        lcTable = libro_codigos.columns(
+            "A,B",
+            ["vars", "sheetNames"],
             skiprows=1,
-            names=["vars", "sheetNames"],
+            sheet_name=varsList.iloc[i][1],
         )
         varAbierta = varsList.iloc[i][0]
 
@@ -664,37 +697,29 @@ def getAbiertasPreCode(var, lcTable):
 
 
 def getProcessAbiertas(
-    spss_file: BytesIO,
-    xlsx_file: BytesIO,
-    xlsx_file_LC: BytesIO,
+    spss_file: BytesIO | SavSession,
+    xlsx_file: BytesIO | PlantillaSpec,
+    xlsx_file_LC: BytesIO | PlantillaSpec,
     checkinclude=False,
     namevar="",
     condition=None,
 ):
     result = ""
     warning = ""
-    temp_file_name = get_temp_file(spss_file)
-    data2, study_metadata = pyreadstat.read_sav(
-        temp_file_name, apply_value_formats=False
-    )
+    sav = SavSession.from_file(spss_file)
+    data2, study_metadata = sav.data, sav.metadata
 
     if condition is None:
         data = data2
     else:
         data = data2[condition]
 
-    file_xlsx = get_temp_file(xlsx_file)
-    file_xlsx_LC = get_temp_file(xlsx_file_LC)
-    varsList = pd.read_excel(
-        file_xlsx,
-        usecols="A,C,D,E",
-        skiprows=3,
-        names=["vars", "sheetNames", "varanidada", "typesegment"],
+    plantilla = PlantillaSpec.from_file(xlsx_file)
+    libro_codigos = PlantillaSpec.from_file(xlsx_file_LC)
+    varsList = plantilla.columns(
+        "A,C,D,E", ["vars", "sheetNames", "varanidada", "typesegment"]
     ).dropna(subset=["sheetNames"])
-    colVarsList = pd.melt(
-        pd.read_excel(file_xlsx, nrows=2), var_name="colVars", value_name="colVarsNames"
-    ).drop(0)
-    colvars = colVarsList.iloc[:, 0]
+    colvars = plantilla.col_vars
     for i in range(len(colvars)):
         var = colvars[i + 1]
         if re.search("^[PFSV].*[1-90].*A", var):
@@ -703,12 +728,11 @@ def getProcessAbiertas(
             colvars[i + 1] = "COL_" + var
     for i in range(len(varsList)):
         if namevar == "" or namevar == varsList.iloc[i][0]:
-            lcTable = pd.read_excel(
-                file_xlsx_LC,
-                sheet_name=varsList.iloc[i][1],
-                usecols="A,B",
+            lcTable = libro_codigos.columns(
+                "A,B",
+                ["vars", "sheetNames"],
                 skiprows=1,
-                names=["vars", "sheetNames"],
+                sheet_name=varsList.iloc[i][1],
             ).dropna()
             varAbierta = varsList.iloc[i][0]
             varlabeloriginal = ""
@@ -740,12 +764,11 @@ def getProcessAbiertas(
                     parNeto[1].append(lcTable.iloc[j][0])
                 lista_final_codigos.append(lcTable.iloc[j][0])
 
-            lcTable2 = pd.read_excel(
-                file_xlsx_LC,
-                sheet_name=varsList.iloc[i][1],
-                usecols="A,B",
+            lcTable2 = libro_codigos.columns(
+                "A,B",
+                ["vars", "sheetNames"],
                 skiprows=1,
-                names=["vars", "sheetNames"],
+                sheet_name=varsList.iloc[i][1],
             )
             for j in range(len(lcTable2)):
                 lista_codigos.append(lcTable2.iloc[j][0])
@@ -1182,20 +1205,12 @@ def getListOrderConditions(multis, data, listNetos, condition):
     return listafinalorde
 
 
-def getPenaltysCode2(spss_file: BytesIO, xlsx_file: BytesIO, rutaarchivo=""):
-    result = getPenaltysCode(xlsx_file)
-    if getPenaltysCode(xlsx_file) != "":
-        file_xlsx = get_temp_file(xlsx_file)
+def getPenaltysCode2(spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec, rutaarchivo=""):
+    plantilla = PlantillaSpec.from_file(xlsx_file)
+    result = getPenaltysCode(plantilla)
+    if result != "":
         nombrehoja = "Penaltys"
-        try:
-            sufijo = (
-                pd.read_excel(file_xlsx, usecols="P", skiprows=3, names=["name"])
-                .dropna()
-                .iloc[0, 0]
-            )
-            sufijo = " " + str(sufijo)
-        except Exception:
-            sufijo = ""
+        sufijo = plantilla.suffix
         result += (
             "\nOUTPUT EXPORT\n  /CONTENTS  EXPORT=VISIBLE  LAYERS=VISIBLE  MODELVIEWS=PRINTSETTING\n  /XLSX  DOCUMENTFILE='"
             + rutaarchivo
@@ -1205,28 +1220,18 @@ def getPenaltysCode2(spss_file: BytesIO, xlsx_file: BytesIO, rutaarchivo=""):
             + "'\n     LOCATION=LASTCOLUMN  NOTESCAPTIONS=NO.\n"
             + "OUTPUT CLOSE NAME=*.\nEXECUTE.\n"
         )
-        temp_file_name = get_temp_file(spss_file)
-        data, study_metadata = pyreadstat.read_sav(
-            temp_file_name, apply_value_formats=False
-        )
+        sav = SavSession.from_file(spss_file)
+        data, study_metadata = sav.data, sav.metadata
         result += (
             "\n*___TOTAL____________________________________________________________________________\n ____________________________________________________________________________________\n ______"
             + nombrehoja
             + sufijo
             + "______________________________________________________________________________.\n"
         )
-        varsList = (
-            pd.read_excel(file_xlsx, usecols="M", skiprows=3, names=["varsSegment"])
-            .dropna()["varsSegment"]
-            .tolist()
-        )
-        varsList_segment = (
-            pd.read_excel(file_xlsx, usecols="N", skiprows=3, names=["vars_Segment"])
-            .dropna()["vars_Segment"]
-            .tolist()
-        )
+        varsList = plantilla.segment_vars
+        varsList_segment = plantilla.vars_segment
 
-        penaltys_code = getPenaltysCode(xlsx_file)
+        penaltys_code = getPenaltysCode(plantilla)
         if not varsList_segment:
             for var in varsList:
                 refdict = study_metadata.variable_value_labels[var]
@@ -1347,15 +1352,11 @@ def getPenaltysCode2(spss_file: BytesIO, xlsx_file: BytesIO, rutaarchivo=""):
     return result
 
 
-def getPenaltysCode(xlsx_file: BytesIO):
+def getPenaltysCode(xlsx_file: BytesIO | PlantillaSpec):
     try:
-        file_xlsx = get_temp_file(xlsx_file)
-        varsList = pd.read_excel(
-            file_xlsx, usecols="A,B", skiprows=3, names=["vars", "varsTypes"]
-        ).dropna()
-        penaltyList = pd.read_excel(
-            file_xlsx, usecols="K", skiprows=3, names=["penaltyVars"]
-        ).dropna()
+        plantilla = PlantillaSpec.from_file(xlsx_file)
+        varsList = plantilla.columns("A,B", ["vars", "varsTypes"]).dropna()
+        penaltyList = plantilla.columns("K", ["penaltyVars"]).dropna()
         ref = penaltyList.iloc[0][0]
         penaltyList = penaltyList.drop(0)
         penaltyList = penaltyList.iloc[:, 0]
@@ -1418,21 +1419,14 @@ def getPenaltysCode(xlsx_file: BytesIO):
 
 
 def getCruces2(
-    spss_file: BytesIO, xlsx_file: BytesIO, checkinclude=False, rutaarchivo=""
+    spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec, checkinclude=False, rutaarchivo=""
 ):
-    result = getCruces(spss_file, xlsx_file, checkinclude)
-    if getCruces(spss_file, xlsx_file, checkinclude) != "":
-        file_xlsx = get_temp_file(xlsx_file)
+    sav = SavSession.from_file(spss_file)
+    plantilla = PlantillaSpec.from_file(xlsx_file)
+    result = getCruces(sav, plantilla, checkinclude)
+    if result != "":
         nombrehoja = "Cruces"
-        try:
-            sufijo = (
-                pd.read_excel(file_xlsx, usecols="P", skiprows=3, names=["name"])
-                .dropna()
-                .iloc[0, 0]
-            )
-            sufijo = " " + str(sufijo)
-        except Exception:
-            sufijo = ""
+        sufijo = plantilla.suffix
         result += "\nOUTPUT MODIFY\n  /SELECT ALL EXCEPT (TABLES)\n  /DELETEOBJECT DELETE = YES."
         result += (
             "\nOUTPUT EXPORT\n  /CONTENTS  EXPORT=VISIBLE  LAYERS=VISIBLE  MODELVIEWS=PRINTSETTING\n  /XLSX  DOCUMENTFILE='"
@@ -1443,26 +1437,15 @@ def getCruces2(
             + "'\n     LOCATION=LASTCOLUMN  NOTESCAPTIONS=NO.\n"
             + "OUTPUT CLOSE NAME=*.\nEXECUTE.\n"
         )
-        temp_file_name = get_temp_file(spss_file)
-        data, study_metadata = pyreadstat.read_sav(
-            temp_file_name, apply_value_formats=False
-        )
+        data, study_metadata = sav.data, sav.metadata
         result += (
             "\n*___TOTAL____________________________________________________________________________\n ____________________________________________________________________________________\n ______"
             + nombrehoja
             + sufijo
             + "______________________________________________________________________________.\n"
         )
-        varsList = (
-            pd.read_excel(file_xlsx, usecols="M", skiprows=3, names=["varsSegment"])
-            .dropna()["varsSegment"]
-            .tolist()
-        )
-        varsList_segment = (
-            pd.read_excel(file_xlsx, usecols="N", skiprows=3, names=["vars_Segment"])
-            .dropna()["vars_Segment"]
-            .tolist()
-        )
+        varsList = plantilla.segment_vars
+        varsList_segment = plantilla.vars_segment
 
         if not varsList_segment:
             for var in varsList:
@@ -1488,7 +1471,7 @@ def getCruces2(
                     result += "DATASET ACTIVATE REF_" + name_dataset + ".\n"
                     condition = data[var] == refindex
                     result += getCruces(
-                        spss_file, xlsx_file, checkinclude, condition=condition
+                        sav, plantilla, checkinclude, condition=condition
                     )
                     result += "\nOUTPUT MODIFY\n  /SELECT ALL EXCEPT (TABLES)\n  /DELETEOBJECT DELETE = YES."
                     result += (
@@ -1544,7 +1527,7 @@ def getCruces2(
                             condition2 = data[var_segment] == refindex_segment
                             condition = condition1 & condition2
                             result += getCruces(
-                                spss_file, xlsx_file, checkinclude, condition=condition
+                                sav, plantilla, checkinclude, condition=condition
                             )
                             result += "\nOUTPUT MODIFY\n  /SELECT ALL EXCEPT (TABLES)\n  /DELETEOBJECT DELETE = YES."
                             result += (
@@ -1595,15 +1578,12 @@ def getCruces2(
 
 
 def getCruces(
-    spss_file: BytesIO, xlsx_file: BytesIO, checkinclude=False, condition=None
+    spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec, checkinclude=False, condition=None
 ):
     try:
-        file_xlsx = get_temp_file(xlsx_file)
-        varsList = pd.read_excel(
-            file_xlsx,
-            usecols="G,H,I,J",
-            skiprows=3,
-            names=["vars", "varsTypes", "crossVars", "sheetname"],
+        plantilla = PlantillaSpec.from_file(xlsx_file)
+        varsList = plantilla.columns(
+            "G,H,I,J", ["vars", "varsTypes", "crossVars", "sheetname"]
         ).dropna(subset=["vars"])
         crosscode = ""
         for i in range(len(varsList)):
@@ -1618,17 +1598,14 @@ def getCruces(
                         includeall=checkinclude,
                     )
                 else:
-                    lcTable = pd.read_excel(
-                        file_xlsx,
-                        sheet_name=varsList.iloc[i][3],
-                        usecols="A,B",
+                    lcTable = plantilla.columns(
+                        "A,B",
+                        ["vars", "sheetNames"],
                         skiprows=1,
-                        names=["vars", "sheetNames"],
+                        sheet_name=varsList.iloc[i][3],
                     ).dropna()
-                    temp_file_name = get_temp_file(spss_file)
-                    data2, study_metadata = pyreadstat.read_sav(
-                        temp_file_name, apply_value_formats=False
-                    )
+                    sav = SavSession.from_file(spss_file)
+                    data2, study_metadata = sav.data, sav.metadata
                     colvars = [crossvar]
                     if condition is None:
                         data = data2
@@ -1751,11 +1728,9 @@ def getCruces(
         return ""
 
 
-def getVarsSav(spss_file: BytesIO):
-    temp_file_name = get_temp_file(spss_file)
-    data, study_metadata = pyreadstat.read_sav(
-        temp_file_name, apply_value_formats=False
-    )
+def getVarsSav(spss_file: BytesIO | SavSession):
+    sav = SavSession.from_file(spss_file)
+    study_metadata = sav.metadata
     return study_metadata.column_names
 
 
@@ -1778,15 +1753,11 @@ def writeAgrupMulti(prefix, listVars, label):
         return ""
 
 
-def getCloneCodeVars(spss_file: BytesIO, xlsx_file: BytesIO):
-    file_xlsx = get_temp_file(xlsx_file)
-    colVars = pd.melt(
-        pd.read_excel(file_xlsx, nrows=2), var_name="colVars", value_name="colVarsNames"
-    ).drop(0)
-    temp_file_name = get_temp_file(spss_file)
-    data, study_metadata = pyreadstat.read_sav(
-        temp_file_name, apply_value_formats=False
-    )
+def getCloneCodeVars(spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec):
+    plantilla = PlantillaSpec.from_file(xlsx_file)
+    colVars = plantilla.col_vars_list
+    sav = SavSession.from_file(spss_file)
+    study_metadata = sav.metadata
     columnVars = colVars.iloc[:, 0]
 
     columnsclone = "\nDELETE VARIABLES"
@@ -1831,11 +1802,9 @@ def getCloneCodeVars(spss_file: BytesIO, xlsx_file: BytesIO):
     return columnsclone
 
 
-def getInverseCodeVars(spss_file: BytesIO, inverseVars):
-    temp_file_name = get_temp_file(spss_file)
-    data, study_metadata = pyreadstat.read_sav(
-        temp_file_name, apply_value_formats=False
-    )
+def getInverseCodeVars(spss_file: BytesIO | SavSession, inverseVars):
+    sav = SavSession.from_file(spss_file)
+    study_metadata = sav.metadata
     dictValues = study_metadata.variable_value_labels
     inverserecodes = ""
     inverserecodes = "\nSPSS_TUTORIALS_CLONE_VARIABLES VARIABLES="
@@ -1855,11 +1824,9 @@ def getInverseCodeVars(spss_file: BytesIO, inverseVars):
     return inverserecodes
 
 
-def checkInverseCodeVars(spss_file: BytesIO, inverseVars):
-    temp_file_name = get_temp_file(spss_file)
-    data, study_metadata = pyreadstat.read_sav(
-        temp_file_name, apply_value_formats=False
-    )
+def checkInverseCodeVars(spss_file: BytesIO | SavSession, inverseVars):
+    sav = SavSession.from_file(spss_file)
+    study_metadata = sav.metadata
     dictValues = study_metadata.variable_value_labels
     inverserecodes = ""
     inverserecodes = "\nSPSS_TUTORIALS_CLONE_VARIABLES VARIABLES="
@@ -1872,13 +1839,11 @@ def checkInverseCodeVars(spss_file: BytesIO, inverseVars):
     return False
 
 
-def getScaleCodeVars(spss_file: BytesIO, scaleVars):
+def getScaleCodeVars(spss_file: BytesIO | SavSession, scaleVars):
     scalerecodes = ""
     try:
-        temp_file_name = get_temp_file(spss_file)
-        data, study_metadata = pyreadstat.read_sav(
-            temp_file_name, apply_value_formats=False
-        )
+        sav = SavSession.from_file(spss_file)
+        study_metadata = sav.metadata
         dictValues = study_metadata.variable_value_labels
         scalerecodes = "\nSPSS_TUTORIALS_CLONE_VARIABLES VARIABLES="
         for i in range(len(scaleVars)):
@@ -1943,12 +1908,10 @@ def getScaleCodeVars(spss_file: BytesIO, scaleVars):
         return ""
 
 
-def getGroupCreateMultisCode(spss_file: BytesIO):
+def getGroupCreateMultisCode(spss_file: BytesIO | SavSession):
     agrupresult = ""
-    temp_file_name = get_temp_file(spss_file)
-    data, study_metadata = pyreadstat.read_sav(
-        temp_file_name, apply_value_formats=False
-    )
+    sav = SavSession.from_file(spss_file)
+    study_metadata = sav.metadata
     serie = False
     prefix = ""
     multis = []
@@ -1976,23 +1939,13 @@ def getGroupCreateMultisCode(spss_file: BytesIO):
     return agrupresult
 
 
-def getSegmentCode(spss_file: BytesIO, xlsx_file: BytesIO):
+def getSegmentCode(spss_file: BytesIO | SavSession, xlsx_file: BytesIO | PlantillaSpec):
     try:
-        temp_file_name = get_temp_file(spss_file)
-        data, study_metadata = pyreadstat.read_sav(
-            temp_file_name, apply_value_formats=False
-        )
-        file_xlsx = get_temp_file(xlsx_file)
-        varsList = (
-            pd.read_excel(file_xlsx, usecols="M", skiprows=3, names=["varsSegment"])
-            .dropna()["varsSegment"]
-            .tolist()
-        )
-        varsList_segment = (
-            pd.read_excel(file_xlsx, usecols="N", skiprows=3, names=["vars_Segment"])
-            .dropna()["vars_Segment"]
-            .tolist()
-        )
+        sav = SavSession.from_file(spss_file)
+        data, study_metadata = sav.data, sav.metadata
+        plantilla = PlantillaSpec.from_file(xlsx_file)
+        varsList = plantilla.segment_vars
+        varsList_segment = plantilla.vars_segment
 
         filterdatabase = ""
         namedatasetspss = "ConjuntoDatos1"
@@ -2181,11 +2134,9 @@ def entero_a_romano(num):
             num -= valor
     return resultado
 
-def getVarsForPlantilla(spss_file: BytesIO):
-    temp_file_name = get_temp_file(spss_file)
-    data, study_metadata = pyreadstat.read_sav(
-        temp_file_name, apply_value_formats=False
-    )
+def getVarsForPlantilla(spss_file: BytesIO | SavSession):
+    sav = SavSession.from_file(spss_file)
+    data, study_metadata = sav.data, sav.metadata
     dict_values = study_metadata.variable_value_labels
     list_vars = study_metadata.column_names
     n_total = study_metadata.number_rows
@@ -2199,23 +2150,6 @@ def getVarsForPlantilla(spss_file: BytesIO):
 
     ws_plantilla = wb_new.create_sheet(title="Estadisticas Plantilla")
 
-    redFill = PatternFill(start_color="C80000", end_color="C80000", fill_type="solid")
-
-    yellowFill = PatternFill(
-        start_color="FFFF00", end_color="FFFF00", fill_type="solid"
-    )
-
-    greenFillTitle = PatternFill(
-        start_color="70AD47", end_color="70AD47", fill_type="solid"
-    )
-
-    medium_border = Border(
-        left=Side(style="medium"),
-        right=Side(style="medium"),
-        top=Side(style="medium"),
-        bottom=Side(style="medium"),
-    )
-
     ws_plantilla.cell(row=1, column=1).value = "Variable"
     ws_plantilla.cell(row=1, column=2).value = "Tipo de Variable"
     ws_plantilla.cell(row=1, column=3).value = "NValids"
@@ -2226,9 +2160,9 @@ def getVarsForPlantilla(spss_file: BytesIO):
     ws_plantilla.cell(row=1,column=8).value="Opt. Labels"
 
     for col in range(1,9):
-        ws_plantilla.cell(row=1,column=col).fill=greenFillTitle
-        ws_plantilla.cell(row=1,column=col).font = Font(color = "FFFFFF")
-        ws_plantilla.cell(row=1,column=col).border = medium_border
+        ws_plantilla.cell(row=1,column=col).fill=GREEN_TITLE_FILL
+        ws_plantilla.cell(row=1,column=col).font = WHITE_FONT
+        ws_plantilla.cell(row=1,column=col).border = MEDIUM_BORDER
         column_letter = get_column_letter(col)
         if col==1:
             width_col=22
@@ -2305,14 +2239,14 @@ def getVarsForPlantilla(spss_file: BytesIO):
                 len(list(set(index_list)))
             )
             if ws_plantilla.cell(row=row_num, column=3).value != str(n_total):
-                ws_plantilla.cell(row=row_num, column=3).fill = yellowFill
+                ws_plantilla.cell(row=row_num, column=3).fill = YELLOW_FILL
             if ws_plantilla.cell(row=row_num, column=3).value == "0":
-                ws_plantilla.cell(row=row_num, column=3).fill = redFill
+                ws_plantilla.cell(row=row_num, column=3).fill = RED_FILL
             ws_plantilla.cell(row=row_num, column=4).value = (
                 str(count_unique) + "|" + str(count_total)
             )
             if ws_plantilla.cell(row=row_num, column=4).value == "1|1":
-                ws_plantilla.cell(row=row_num, column=4).fill = yellowFill
+                ws_plantilla.cell(row=row_num, column=4).fill = YELLOW_FILL
         else:
             textPlantilla += "\n" + var + "\t"
             ws_plantilla.cell(row=row_num, column=1).value = var
@@ -2326,7 +2260,7 @@ def getVarsForPlantilla(spss_file: BytesIO):
                         ws_plantilla.cell(row=row_num, column=2).value = "E"
                         if "5" not in dict_values[var][5]:
                             ws_plantilla.cell(row=row_num, column=6).value = "not 5"
-                            ws_plantilla.cell(row=row_num, column=6).fill = yellowFill
+                            ws_plantilla.cell(row=row_num, column=6).fill = YELLOW_FILL
                 elif dict_values[var][1] == "":
                     textPlantilla += "N\t"
                     ws_plantilla.cell(row=row_num, column=2).value = "N"
@@ -2341,15 +2275,15 @@ def getVarsForPlantilla(spss_file: BytesIO):
                 len(data[var].dropna())
             )
             if ws_plantilla.cell(row=row_num, column=3).value != str(n_total):
-                ws_plantilla.cell(row=row_num, column=3).fill = yellowFill
+                ws_plantilla.cell(row=row_num, column=3).fill = YELLOW_FILL
             if ws_plantilla.cell(row=row_num, column=3).value == "0":
-                ws_plantilla.cell(row=row_num, column=3).fill = redFill
+                ws_plantilla.cell(row=row_num, column=3).fill = RED_FILL
 
             ws_plantilla.cell(row=row_num, column=4).value = str(
                 len(list(set(data[var].dropna())))
             )
             if ws_plantilla.cell(row=row_num, column=4).value == "1":
-                ws_plantilla.cell(row=row_num, column=4).fill = yellowFill
+                ws_plantilla.cell(row=row_num, column=4).fill = YELLOW_FILL
 
             try:
                 textPlantilla += (
@@ -2375,30 +2309,26 @@ def getVarsForPlantilla(spss_file: BytesIO):
     return textPlantilla, write_temp_excel(wb_new)
 
 
-def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
+def get_comparison_tables(spss_file1: BytesIO | SavSession, spss_file2: BytesIO | SavSession):
     # Create a new Workbook
     wb_new = Workbook()
     # Remove the default sheet created with the new workbook
     default_sheet = wb_new.active
     wb_new.remove(default_sheet)
+    sav1 = SavSession.from_file(spss_file1)
+    sav2 = SavSession.from_file(spss_file2)
     for caso in range(2):
         ws_plantilla = wb_new.create_sheet(
             title="Estadisticas Plantilla " + str(caso + 1)
         )
         if caso == 0:
-            archivo1 = spss_file1
-            archivo2 = spss_file2
+            archivo1 = sav1
+            archivo2 = sav2
         else:
-            archivo1 = spss_file2
-            archivo2 = spss_file1
-        temp_file_name = get_temp_file(archivo1)
-        data, study_metadata = pyreadstat.read_sav(
-            temp_file_name, apply_value_formats=False
-        )
-        temp_file_name2 = get_temp_file(archivo2)
-        data2, study_metadata2 = pyreadstat.read_sav(
-            temp_file_name2, apply_value_formats=False
-        )
+            archivo1 = sav2
+            archivo2 = sav1
+        data, study_metadata = archivo1.data, archivo1.metadata
+        study_metadata2 = archivo2.metadata
 
         dict_values = study_metadata.variable_value_labels
         list_vars = study_metadata.column_names
@@ -2410,32 +2340,6 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
         dict_labels = study_metadata.column_names_to_labels
         dict_labels2 = study_metadata2.column_names_to_labels
 
-        redFill = PatternFill(
-            start_color="C80000", end_color="C80000", fill_type="solid"
-        )
-
-        yellowFill = PatternFill(
-            start_color="FFFF00", end_color="FFFF00", fill_type="solid"
-        )
-
-        blueFill = PatternFill(
-            start_color="C5D9F1", end_color="C5D9F1", fill_type="solid"
-        )
-
-        grayFill = PatternFill(
-            start_color="DBDBDB", end_color="DBDBDB", fill_type="solid"
-        )
-
-        greenFillTitle = PatternFill(
-            start_color="70AD47", end_color="70AD47", fill_type="solid"
-        )
-
-        medium_border = Border(
-            left=Side(style="medium"),
-            right=Side(style="medium"),
-            top=Side(style="medium"),
-            bottom=Side(style="medium"),
-        )
         # green_thin_border = Border(
         #     left=Side(border_style="thin", color="F7F9F1"),
         #     right=Side(border_style="thin", color="F7F9F1"),
@@ -2480,12 +2384,12 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
 
         for col in range(1, 18):
             if col in [7, 8, 9, 12, 13, 17]:
-                fillcol = blueFill
+                fillcol = BLUE_FILL
             else:
-                fillcol = greenFillTitle
+                fillcol = GREEN_TITLE_FILL
             ws_plantilla.cell(row=1, column=col).fill = fillcol
-            ws_plantilla.cell(row=1, column=col).font = Font(color="FFFFFF")
-            ws_plantilla.cell(row=1, column=col).border = medium_border
+            ws_plantilla.cell(row=1, column=col).font = WHITE_FONT
+            ws_plantilla.cell(row=1, column=col).border = MEDIUM_BORDER
             column_letter = get_column_letter(col)
             if col in [1]:
                 width_col = 22
@@ -2555,14 +2459,14 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
                     len(list(set(index_list)))
                 )
                 if ws_plantilla.cell(row=row_num, column=3).value != str(n_total):
-                    ws_plantilla.cell(row=row_num, column=3).fill = yellowFill
+                    ws_plantilla.cell(row=row_num, column=3).fill = YELLOW_FILL
                 if ws_plantilla.cell(row=row_num, column=3).value == "0":
-                    ws_plantilla.cell(row=row_num, column=3).fill = redFill
+                    ws_plantilla.cell(row=row_num, column=3).fill = RED_FILL
                 ws_plantilla.cell(row=row_num, column=4).value = (
                     str(count_unique) + "|" + str(count_total)
                 )
                 if ws_plantilla.cell(row=row_num, column=4).value == "1|1":
-                    ws_plantilla.cell(row=row_num, column=4).fill = yellowFill
+                    ws_plantilla.cell(row=row_num, column=4).fill = YELLOW_FILL
                 if var in list_vars2:
                     ws_plantilla.cell(row=row_num, column=7).value = var
                     try:
@@ -2579,7 +2483,7 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
                         ws_plantilla.cell(row=row_num, column=8).value = "Yes"
                     elif (labelval1 == labelval2) and (count_total != count_total2):
                         ws_plantilla.cell(row=row_num, column=8).value = "Same Labels"
-                        ws_plantilla.cell(row=row_num, column=8).fill = yellowFill
+                        ws_plantilla.cell(row=row_num, column=8).fill = YELLOW_FILL
                         ws_plantilla.cell(
                             row=row_num, column=9
                         ).value = "Distint number of variables in multiple"
@@ -2588,10 +2492,10 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
                         )
                     else:
                         ws_plantilla.cell(row=row_num, column=8).value = "No"
-                        ws_plantilla.cell(row=row_num, column=8).fill = redFill
+                        ws_plantilla.cell(row=row_num, column=8).fill = RED_FILL
                         ws_plantilla.cell(row=row_num, column=9).value = str(labelval2)
-                        ws_plantilla.cell(row=row_num, column=9).fill = grayFill
-                        ws_plantilla.cell(row=row_num, column=7).fill = grayFill
+                        ws_plantilla.cell(row=row_num, column=9).fill = GRAY_FILL
+                        ws_plantilla.cell(row=row_num, column=7).fill = GRAY_FILL
                         ws_plantilla.cell(row=row_num, column=10).value = str(labelval1)
                         ws_plantilla.cell(row=row_num, column=11).value = (
                             str(len(labelval2))
@@ -2608,12 +2512,12 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
                         ws_plantilla.cell(row=row_num, column=12).value = "Yes"
                     else:
                         ws_plantilla.cell(row=row_num, column=12).value = "No"
-                        ws_plantilla.cell(row=row_num, column=12).fill = blueFill
+                        ws_plantilla.cell(row=row_num, column=12).fill = BLUE_FILL
                         ws_plantilla.cell(row=row_num, column=13).value = str(
                             label_base2
                         )
-                        ws_plantilla.cell(row=row_num, column=13).fill = grayFill
-                        ws_plantilla.cell(row=row_num, column=7).fill = grayFill
+                        ws_plantilla.cell(row=row_num, column=13).fill = GRAY_FILL
+                        ws_plantilla.cell(row=row_num, column=7).fill = GRAY_FILL
                         ws_plantilla.cell(row=row_num, column=14).value = str(
                             label_base1
                         )
@@ -2626,7 +2530,7 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
                         )
                 else:
                     ws_plantilla.cell(row=row_num, column=7).value = "No"
-                    ws_plantilla.cell(row=row_num, column=7).fill = blueFill
+                    ws_plantilla.cell(row=row_num, column=7).fill = BLUE_FILL
             else:
                 ws_plantilla.cell(row=row_num, column=1).value = var
                 try:
@@ -2642,7 +2546,7 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
                                 ws_plantilla.cell(row=row_num, column=6).value = "not 5"
                                 ws_plantilla.cell(
                                     row=row_num, column=6
-                                ).fill = yellowFill
+                                ).fill = YELLOW_FILL
                     elif dict_values[var][1] == "":
                         ws_plantilla.cell(row=row_num, column=2).value = "N"
                     else:
@@ -2653,15 +2557,15 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
                     len(data[var].dropna())
                 )
                 if ws_plantilla.cell(row=row_num, column=3).value != str(n_total):
-                    ws_plantilla.cell(row=row_num, column=3).fill = yellowFill
+                    ws_plantilla.cell(row=row_num, column=3).fill = YELLOW_FILL
                 if ws_plantilla.cell(row=row_num, column=3).value == "0":
-                    ws_plantilla.cell(row=row_num, column=3).fill = redFill
+                    ws_plantilla.cell(row=row_num, column=3).fill = RED_FILL
 
                 ws_plantilla.cell(row=row_num, column=4).value = str(
                     len(list(set(data[var].dropna())))
                 )
                 if ws_plantilla.cell(row=row_num, column=4).value == "1":
-                    ws_plantilla.cell(row=row_num, column=4).fill = yellowFill
+                    ws_plantilla.cell(row=row_num, column=4).fill = YELLOW_FILL
                 try:
                     ws_plantilla.cell(row=row_num, column=5).value = "/" + str(
                         len(dict_values[var])
@@ -2686,10 +2590,10 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
                         ws_plantilla.cell(row=row_num, column=8).value = "Yes"
                     else:
                         ws_plantilla.cell(row=row_num, column=8).value = "No"
-                        ws_plantilla.cell(row=row_num, column=8).fill = redFill
+                        ws_plantilla.cell(row=row_num, column=8).fill = RED_FILL
                         ws_plantilla.cell(row=row_num, column=9).value = str(labelval2)
-                        ws_plantilla.cell(row=row_num, column=9).fill = grayFill
-                        ws_plantilla.cell(row=row_num, column=7).fill = grayFill
+                        ws_plantilla.cell(row=row_num, column=9).fill = GRAY_FILL
+                        ws_plantilla.cell(row=row_num, column=7).fill = GRAY_FILL
                         ws_plantilla.cell(row=row_num, column=10).value = str(labelval1)
                         ws_plantilla.cell(row=row_num, column=11).value = (
                             str(len(labelval2))
@@ -2706,12 +2610,12 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
                         ws_plantilla.cell(row=row_num, column=12).value = "Yes"
                     else:
                         ws_plantilla.cell(row=row_num, column=12).value = "No"
-                        ws_plantilla.cell(row=row_num, column=12).fill = blueFill
+                        ws_plantilla.cell(row=row_num, column=12).fill = BLUE_FILL
                         ws_plantilla.cell(row=row_num, column=13).value = str(
                             label_base2
                         )
-                        ws_plantilla.cell(row=row_num, column=13).fill = grayFill
-                        ws_plantilla.cell(row=row_num, column=7).fill = grayFill
+                        ws_plantilla.cell(row=row_num, column=13).fill = GRAY_FILL
+                        ws_plantilla.cell(row=row_num, column=7).fill = GRAY_FILL
                         ws_plantilla.cell(row=row_num, column=14).value = str(
                             label_base1
                         )
@@ -2724,7 +2628,7 @@ def get_comparison_tables(spss_file1: BytesIO, spss_file2: BytesIO):
                         )
                 else:
                     ws_plantilla.cell(row=row_num, column=7).value = "No"
-                    ws_plantilla.cell(row=row_num, column=7).fill = blueFill
+                    ws_plantilla.cell(row=row_num, column=7).fill = BLUE_FILL
             row_num += 1
 
     return write_temp_excel(wb_new)
@@ -2768,22 +2672,9 @@ def get_lc_comparison(lc_xlsx_file1: BytesIO, lc_xlsx_file2: BytesIO):
         ws_lc_comparison.cell(row=1, column=9).value = f"LC2={name_sheet2}"
         ws_lc_comparison.cell(row=1, column=10).value = " "
 
-        blueFill = PatternFill(
-            start_color="C5D9F1", end_color="C5D9F1", fill_type="solid"
-        )
-        yellowFill = PatternFill(
-            start_color="FFFF00", end_color="FFFF00", fill_type="solid"
-        )
-        medium_border = Border(
-            left=Side(style="medium"),
-            right=Side(style="medium"),
-            top=Side(style="medium"),
-            bottom=Side(style="medium"),
-        )
-
         for col in range(1, 10):
-            ws_lc_comparison.cell(row=1, column=col).fill = blueFill
-            ws_lc_comparison.cell(row=1, column=col).border = medium_border
+            ws_lc_comparison.cell(row=1, column=col).fill = BLUE_FILL
+            ws_lc_comparison.cell(row=1, column=col).border = MEDIUM_BORDER
 
         row_num=2
         for sheet in wb_lc1:
@@ -2799,7 +2690,7 @@ def get_lc_comparison(lc_xlsx_file1: BytesIO, lc_xlsx_file2: BytesIO):
                 duplicados = set([valor for valor in valores if valores.count(valor) > 1])
 
                 if duplicados:
-                    ws_lc_comparison.cell(row=row_num, column=col_dup+2).fill=yellowFill
+                    ws_lc_comparison.cell(row=row_num, column=col_dup+2).fill=YELLOW_FILL
                     text_dups=""
                     for dup in duplicados:
                         list_rows=[]
@@ -2884,7 +2775,7 @@ def get_lc_comparison(lc_xlsx_file1: BytesIO, lc_xlsx_file2: BytesIO):
             for cell in row:
                 if cell.value and isinstance(cell.value, str):  # Si el contenido es texto
                     max_lines = max(max_lines, cell.value.count("\n") + 1)
-                    cell.alignment = Alignment(wrap_text=True)
+                    cell.alignment = WRAP_ALIGNMENT
 
             # Ajustar la altura de la fila (cada línea adicional suma un tamaño base)
             ws_lc_comparison.row_dimensions[row[0].row].height = max_lines * 15  # Ajustar según necesidad
@@ -2920,10 +2811,7 @@ def merge_with_border_range(ws, cell_range: str, border: Border):
     min_col, min_row, max_col, max_row = range_boundaries(cell_range)
 
     # Aplicar borde a cada celda del rango
-    for row in ws.iter_rows(min_row=min_row, max_row=max_row,
-                            min_col=min_col, max_col=max_col):
-        for cell in row:
-            cell.border = border
+    style_range(ws, min_row, min_col, max_row, max_col, border=border)
 
 def apply_outer_border_range(ws, cell_range: str, border_style="medium"):
     """
@@ -2937,7 +2825,7 @@ def apply_outer_border_range(ws, cell_range: str, border_style="medium"):
             cell = ws.cell(row=row, column=col)
             current = cell.border
 
-            cell.border = Border(
+            cell.border = sides_border(
                 left=side if col == min_col else current.left,
                 right=side if col == max_col else current.right,
                 top=side if row == min_row else current.top,
@@ -2949,18 +2837,15 @@ def apply_medium_bottom_border(cell):
     Applies a medium bottom border to the given cell,
     preserving the existing top, left, and right borders.
     """
-    # Define medium bottom border
-    medium = Side(style="medium")
-
     # Get current borders of the cell
     current_border = cell.border
 
     # Create a new border, keeping other sides unchanged
-    new_border = Border(
+    new_border = sides_border(
         left=current_border.left,
         right=current_border.right,
         top=current_border.top,
-        bottom=medium
+        bottom=MEDIUM
     )
 
     # Assign the new border to the cell
@@ -2971,18 +2856,15 @@ def apply_medium_top_border(cell):
     Applies a medium top border to the given cell,
     preserving the existing bottom, left, and right borders.
     """
-    # Define medium top border
-    medium = Side(style="medium")
-
     # Get current borders of the cell
     current_border = cell.border
 
     # Create a new border, keeping other sides unchanged
-    new_border = Border(
+    new_border = sides_border(
         left=current_border.left,
         right=current_border.right,
         bottom=current_border.bottom,
-        top=medium
+        top=MEDIUM
     )
 
     # Assign the new border to the cell
@@ -3001,8 +2883,8 @@ def merge_and_style_with_wrap(ws, cell_range: str, border):
     cell = ws.cell(row=min_row, column=min_col)
 
     # Aplicar negrita y ajuste de texto
-    cell.font = Font(bold=True)
-    cell.alignment = Alignment(horizontal="center", vertical="center", wrapText=True)
+    cell.font = BOLD_FONT
+    cell.alignment = CENTER_WRAP_ALIGNMENT
 
 def merge_identical_cells_with_border(ws, col_letter: str, start_row: int):
     """
@@ -3013,9 +2895,6 @@ def merge_identical_cells_with_border(ws, col_letter: str, start_row: int):
     :param start_row: Starting row for merging
     :return: List of ending rows of each merged block
     """
-    medium_side = Side(style="medium")
-    full_border = Border(top=medium_side, bottom=medium_side, left=medium_side, right=medium_side)
-
     current_value = None
     merge_start = start_row
     end_rows = []
@@ -3029,7 +2908,7 @@ def merge_identical_cells_with_border(ws, col_letter: str, start_row: int):
                     cell_range = f"{col_letter}{merge_start}:{col_letter}{row - 1}"
                 else:
                     cell_range = f"{col_letter}{merge_start}"
-                merge_and_style_with_wrap(ws, cell_range, full_border)
+                merge_and_style_with_wrap(ws, cell_range, MEDIUM_BORDER)
                 end_rows.append(row - 1)
             current_value = cell_value
             merge_start = row
@@ -3105,25 +2984,6 @@ def get_kpis_tables(xlsx_tablas, xlsx_kpis_list):
         lambda x: f"{x.upper()}." if isinstance(x, str) and len(x.strip().split()) == 1 and not x.endswith('.') else x
     )
 
-
-    grayFill = PatternFill(
-        start_color="BFBFBF", end_color="BFBFBF", fill_type="solid"
-    )
-    greenFill = PatternFill(
-    start_color="D8E4BC", end_color="D8E4BC", fill_type="solid"
-    )
-    redFill = PatternFill(
-        start_color="E6B8B7", end_color="E6B8B7", fill_type="solid"
-    )
-    centrado = Alignment(horizontal='center', vertical='center')
-
-    # Definir estilos de borde
-    medium = Side(style="medium")     # Borde grueso
-    thin = Side(style="thin")
-    complete_border = Border(left=medium, right=medium, top=medium, bottom=medium)
-    simple_border = Border(left=thin, right=thin, top=thin, bottom=thin)
-
-
     word_multis="MULTI"
     first_row=6
 
@@ -3141,9 +3001,9 @@ def get_kpis_tables(xlsx_tablas, xlsx_kpis_list):
             dict_multis={}
 
             # ws_kpis.merge_cells(f"A{first_row+2}:C{first_row+2}")
-            merge_with_border_range(ws_kpis,f"A{first_row+2}:C{first_row+2}",complete_border)
+            merge_with_border_range(ws_kpis,f"A{first_row+2}:C{first_row+2}",MEDIUM_BORDER)
             ws_kpis[f"A{first_row+2}"]="Base"
-            ws_kpis[f"A{first_row+2}"].border=complete_border
+            ws_kpis[f"A{first_row+2}"].border=MEDIUM_BORDER
 
             refs_list = [
                 cell.value
@@ -3203,9 +3063,9 @@ def get_kpis_tables(xlsx_tablas, xlsx_kpis_list):
                     first_col=get_column_letter(min(indexs))
                     last_col=get_column_letter(max(indexs))
                     merge_cells_visits= f"{first_col}{first_row}:{last_col}{first_row}"
-                    merge_with_border_range(ws_kpis,merge_cells_visits,complete_border)
+                    merge_with_border_range(ws_kpis,merge_cells_visits,MEDIUM_BORDER)
                     ws_kpis[f"{first_col}{first_row}"]=visits_name_list[visits_list.index(visit)]
-                    ws_kpis[f"{first_col}{first_row}"].fill=grayFill
+                    ws_kpis[f"{first_col}{first_row}"].fill=KPI_GRAY_FILL
                     for i, var in enumerate(indexs):
                         ws_kpis[f"{get_column_letter(var)}{first_row+1}"]=refs_list[i]
                         if fila_total:
@@ -3275,14 +3135,14 @@ def get_kpis_tables(xlsx_tablas, xlsx_kpis_list):
                                         ws_kpis[f"{get_column_letter(var)}{actual_row+1}"]=ws_tables.cell(row=fila_inicio + 1, column=refs_col_indexes[i]).value
 
                     if jr_question:
-                        merge_with_border_range(ws_kpis,f"B{actual_row}:B{actual_row+2}",simple_border)
+                        merge_with_border_range(ws_kpis,f"B{actual_row}:B{actual_row+2}",THIN_BORDER)
                         ws_kpis[f"B{actual_row}"]=kpi
                         ws_kpis[f"C{actual_row}"]=ws_tables.cell(row=fila_inicio + 1, column=2).value
                         ws_kpis[f"C{actual_row+1}"]="JR"
                         ws_kpis[f"C{actual_row+2}"]=ws_tables.cell(row=fila_inicio + 5, column=2).value
-                        ws_kpis[f"C{actual_row}"].border =simple_border
-                        ws_kpis[f"C{actual_row+1}"].border =simple_border
-                        ws_kpis[f"C{actual_row+2}"].border =simple_border
+                        ws_kpis[f"C{actual_row}"].border =THIN_BORDER
+                        ws_kpis[f"C{actual_row+1}"].border =THIN_BORDER
+                        ws_kpis[f"C{actual_row+2}"].border =THIN_BORDER
                         ws_kpis[f"A{actual_row}"]=group_kpi
                         ws_kpis[f"A{actual_row+1}"]=group_kpi
                         ws_kpis[f"A{actual_row+2}"]=group_kpi
@@ -3290,24 +3150,24 @@ def get_kpis_tables(xlsx_tablas, xlsx_kpis_list):
                     elif promedio_question:
                         ws_kpis[f"B{actual_row}"]=kpi
                         ws_kpis[f"C{actual_row}"]="Promedio"
-                        ws_kpis[f"C{actual_row}"].border =simple_border
+                        ws_kpis[f"C{actual_row}"].border =THIN_BORDER
                         ws_kpis[f"A{actual_row}"]=group_kpi
                         actual_row+=1
                     elif unique_question:
-                        merge_with_border_range(ws_kpis,f"B{actual_row}:B{actual_row+fila_final-fila_inicio}",simple_border)
+                        merge_with_border_range(ws_kpis,f"B{actual_row}:B{actual_row+fila_final-fila_inicio}",THIN_BORDER)
                         ws_kpis[f"B{actual_row}"]=kpi
                         for i in range(fila_final-fila_inicio+1):
                             ws_kpis[f"C{actual_row+i}"]=ws_tables.cell(row=fila_inicio+i, column=2).value
-                            ws_kpis[f"C{actual_row+i}"].border =simple_border
+                            ws_kpis[f"C{actual_row+i}"].border =THIN_BORDER
                             ws_kpis[f"A{actual_row+i}"]=group_kpi
                         actual_row+=fila_final-fila_inicio+1
                     else:
-                        merge_with_border_range(ws_kpis,f"B{actual_row}:B{actual_row+1}",simple_border)
+                        merge_with_border_range(ws_kpis,f"B{actual_row}:B{actual_row+1}",THIN_BORDER)
                         ws_kpis[f"B{actual_row}"]=kpi
                         ws_kpis[f"C{actual_row}"]="T2B"
                         ws_kpis[f"C{actual_row+1}"]="TB"
-                        ws_kpis[f"C{actual_row}"].border =simple_border
-                        ws_kpis[f"C{actual_row+1}"].border =simple_border
+                        ws_kpis[f"C{actual_row}"].border =THIN_BORDER
+                        ws_kpis[f"C{actual_row+1}"].border =THIN_BORDER
                         ws_kpis[f"A{actual_row}"]=group_kpi
                         ws_kpis[f"A{actual_row+1}"]=group_kpi
                         actual_row+=2
@@ -3326,12 +3186,12 @@ def get_kpis_tables(xlsx_tablas, xlsx_kpis_list):
                                         for i, var in enumerate(indexs):
                                                 ws_kpis[f"{get_column_letter(var)}{actual_row}"]=ws_tables.cell(row=fila_inicio, column=refs_col_indexes[i]).value
                                                 ws_kpis[f"{get_column_letter(var)}{actual_row+1}"]=ws_tables.cell(row=fila_inicio + 1, column=refs_col_indexes[i]).value
-                        merge_with_border_range(ws_kpis,f"B{actual_row}:B{actual_row+1}",simple_border)
+                        merge_with_border_range(ws_kpis,f"B{actual_row}:B{actual_row+1}",THIN_BORDER)
                         ws_kpis[f"B{actual_row}"]=question2
                         ws_kpis[f"C{actual_row}"]="T2B"
                         ws_kpis[f"C{actual_row+1}"]="TB"
-                        ws_kpis[f"C{actual_row}"].border =simple_border
-                        ws_kpis[f"C{actual_row+1}"].border =simple_border
+                        ws_kpis[f"C{actual_row}"].border =THIN_BORDER
+                        ws_kpis[f"C{actual_row+1}"].border =THIN_BORDER
                         ws_kpis[f"A{actual_row}"]=group_kpi
                         ws_kpis[f"A{actual_row+1}"]=group_kpi
                         actual_row+=2
@@ -3362,12 +3222,12 @@ def get_kpis_tables(xlsx_tablas, xlsx_kpis_list):
                                                                 ws_kpis[f"{get_column_letter(var)}{actual_row}"]=ws_tables.cell(row=fila_inicio, column=refs_col_indexes[i]).value
                                                                 ws_kpis[f"{get_column_letter(var)}{actual_row+1}"]=ws_tables.cell(row=fila_inicio + 1, column=refs_col_indexes[i]).value
 
-                                        merge_with_border_range(ws_kpis,f"B{actual_row}:B{actual_row+1}",simple_border)
+                                        merge_with_border_range(ws_kpis,f"B{actual_row}:B{actual_row+1}",THIN_BORDER)
                                         ws_kpis[f"B{actual_row}"]=atribute_question
                                         ws_kpis[f"C{actual_row}"]="T2B"
                                         ws_kpis[f"C{actual_row+1}"]="TB"
-                                        ws_kpis[f"C{actual_row}"].border =simple_border
-                                        ws_kpis[f"C{actual_row+1}"].border =simple_border
+                                        ws_kpis[f"C{actual_row}"].border =THIN_BORDER
+                                        ws_kpis[f"C{actual_row+1}"].border =THIN_BORDER
                                         ws_kpis[f"A{actual_row}"]=group_kpi
                                         ws_kpis[f"A{actual_row+1}"]=group_kpi
                                         actual_row+=2
@@ -3430,10 +3290,12 @@ def get_kpis_tables(xlsx_tablas, xlsx_kpis_list):
 
 
             columns_refs_data = df_refs_x_visits.values.flatten().tolist()
+            style_range(
+                ws_kpis, 1, 1, ws_kpis.max_row, ws_kpis.max_column,
+                alignment=CENTER_ALIGNMENT,
+            )
             for row in ws_kpis.iter_rows():
                 for cell in row:
-                    cell.alignment = centrado
-
                     col_idx = cell.column  # número de columna
                     fila = cell.row
                     if col_idx in [3] and fila in bottom_thick_border_list:
@@ -3441,8 +3303,6 @@ def get_kpis_tables(xlsx_tablas, xlsx_kpis_list):
                     if col_idx in [2] and fila-1 in bottom_thick_border_list:
                         apply_medium_top_border(cell)
                     if fila >= first_row+1 and col_idx in columns_refs_data:
-                        cell.alignment = centrado
-
                         if cell.value in (None, ""):
                             cell.value="-"
 
@@ -3453,15 +3313,15 @@ def get_kpis_tables(xlsx_tablas, xlsx_kpis_list):
 
                         # Verifica condiciones especiales
                         if val_actual == "T2B" or val_actual == "JR":
-                            cell.fill=greenFill
+                            cell.fill=KPI_GREEN_FILL
 
-                        left_border = medium if col_idx in left_thick_border_list else thin
-                        right_border = medium if col_idx in right_thick_border_list else thin
-                        bottom_border = medium if fila in bottom_thick_border_list or fila == first_row + 2 else thin
+                        left_border = MEDIUM if col_idx in left_thick_border_list else THIN
+                        right_border = MEDIUM if col_idx in right_thick_border_list else THIN
+                        bottom_border = MEDIUM if fila in bottom_thick_border_list or fila == first_row + 2 else THIN
 
-                        top_border=thin
+                        top_border=THIN
 
-                        custom_border = Border(
+                        custom_border = sides_border(
                             left=left_border,
                             top=top_border,
                             right=right_border,
@@ -3612,18 +3472,6 @@ def update_penalty_sheets(wb_postprocess_kpis, xlsx_kpis_list):
     visits_df_names = visits_df_names.applymap(
         lambda x: x.strip() if isinstance(x, str) else x
     )
-    grayFill = PatternFill(
-        start_color="BFBFBF", end_color="BFBFBF", fill_type="solid"
-    )
-    redFill = PatternFill(
-        start_color="E6B8B7", end_color="E6B8B7", fill_type="solid"
-    )
-    # Definir estilos de borde
-    medium = Side(style="medium")     # Borde grueso
-    thin = Side(style="thin")
-    complete_border = Border(left=medium, right=medium, top=medium, bottom=medium)
-    simple_border = Border(left=thin, right=thin, top=thin, bottom=thin)
-    centrado = Alignment(horizontal="center", vertical="center", wrap_text=True)
 
     first_row=6
     for sheet_name in wb_postprocess_kpis.sheetnames:
@@ -3631,9 +3479,9 @@ def update_penalty_sheets(wb_postprocess_kpis, xlsx_kpis_list):
             ws_kpis = wb_new_penaltys.create_sheet(title=sheet_name)
             ws_tables=wb_postprocess_kpis[sheet_name]
 
-            merge_with_border_range(ws_kpis,f"A{first_row+2}:B{first_row+2}",complete_border)
+            merge_with_border_range(ws_kpis,f"A{first_row+2}:B{first_row+2}",MEDIUM_BORDER)
             ws_kpis[f"A{first_row+2}"]="Base"
-            ws_kpis[f"A{first_row+2}"].border=complete_border
+            ws_kpis[f"A{first_row+2}"].border=MEDIUM_BORDER
 
             refs_list = [
                 cell.value
@@ -3693,9 +3541,9 @@ def update_penalty_sheets(wb_postprocess_kpis, xlsx_kpis_list):
                     first_col=get_column_letter(min(indexs))
                     last_col=get_column_letter(max(indexs))
                     merge_cells_visits= f"{first_col}{first_row}:{last_col}{first_row}"
-                    merge_with_border_range(ws_kpis,merge_cells_visits,complete_border)
+                    merge_with_border_range(ws_kpis,merge_cells_visits,MEDIUM_BORDER)
                     ws_kpis[f"{first_col}{first_row}"]=visits_name_list[visits_list.index(visit)]
-                    ws_kpis[f"{first_col}{first_row}"].fill=grayFill
+                    ws_kpis[f"{first_col}{first_row}"].fill=KPI_GRAY_FILL
                     for i, var in enumerate(indexs):
                         ws_kpis[f"{get_column_letter(var)}{first_row+1}"]=refs_list[i]
                         if fila_total:
@@ -3740,7 +3588,7 @@ def update_penalty_sheets(wb_postprocess_kpis, xlsx_kpis_list):
                                                 cell.value = val
                                                 cell.number_format = "0.00"
                                                 if val <= -3:
-                                                    cell.fill = redFill
+                                                    cell.fill = KPI_RED_FILL
                                             except ValueError:
                                                 pass
 
@@ -3750,12 +3598,12 @@ def update_penalty_sheets(wb_postprocess_kpis, xlsx_kpis_list):
                             label_question_str = " ".join([words[0]] + words[2:])
                         else:
                             label_question_str = label_question.value.strip()
-                    merge_with_border_range(ws_kpis,f"A{actual_row}:A{actual_row+1}",simple_border)
+                    merge_with_border_range(ws_kpis,f"A{actual_row}:A{actual_row+1}",THIN_BORDER)
                     ws_kpis[f"A{actual_row}"]=label_question_str
                     ws_kpis[f"B{actual_row}"]=ws_tables.cell(row=init_row + 6, column=2).value
                     ws_kpis[f"B{actual_row+1}"]=ws_tables.cell(row=init_row + 7, column=2).value
-                    ws_kpis[f"B{actual_row}"].border =simple_border
-                    ws_kpis[f"B{actual_row+1}"].border =simple_border
+                    ws_kpis[f"B{actual_row}"].border =THIN_BORDER
+                    ws_kpis[f"B{actual_row+1}"].border =THIN_BORDER
                     bottom_thick_border_list.append(actual_row+1)
                     actual_row+=2
 
@@ -3764,10 +3612,12 @@ def update_penalty_sheets(wb_postprocess_kpis, xlsx_kpis_list):
 
 
             columns_refs_data = df_refs_x_visits.values.flatten().tolist()
+            style_range(
+                ws_kpis, 1, 1, ws_kpis.max_row, ws_kpis.max_column,
+                alignment=CENTER_WRAP_ALIGNMENT,
+            )
             for row in ws_kpis.iter_rows():
                 for cell in row:
-                    cell.alignment = centrado
-
                     col_idx = cell.column  # número de columna
                     fila = cell.row
                     if col_idx in [2] and fila in bottom_thick_border_list:
@@ -3775,18 +3625,16 @@ def update_penalty_sheets(wb_postprocess_kpis, xlsx_kpis_list):
                     if col_idx in [1] and fila-1 in bottom_thick_border_list:
                         apply_medium_top_border(cell)
                     if fila >= first_row+1 and col_idx in columns_refs_data:
-                        cell.alignment = centrado
-
                         if cell.value in (None, ""):
                             cell.value="-"
 
-                        left_border = medium if col_idx in left_thick_border_list else thin
-                        right_border = medium if col_idx in right_thick_border_list else thin
-                        bottom_border = medium if fila in bottom_thick_border_list or fila == first_row + 2 else thin
+                        left_border = MEDIUM if col_idx in left_thick_border_list else THIN
+                        right_border = MEDIUM if col_idx in right_thick_border_list else THIN
+                        bottom_border = MEDIUM if fila in bottom_thick_border_list or fila == first_row + 2 else THIN
 
-                        top_border=thin
+                        top_border=THIN
 
-                        custom_border = Border(
+                        custom_border = sides_border(
                             left=left_border,
                             top=top_border,
                             right=right_border,
@@ -3852,30 +3700,20 @@ def get_diferences_with_kpis(xlsx_pretables_file: BytesIO, xlsx_kpis_list: Bytes
             break
 
 
-    # Estilos# Definir estilos de borde
-    medium = Side(style="medium")     # Borde grueso
-    thin = Side(style="thin")
-    bold = Font(bold=True)
-    enlace = Font(color="0000EE", underline="single")
-    centrado = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    fondo_header = PatternFill("solid", fgColor="F79646")
-    fondo_sections = PatternFill("solid", fgColor="FCD5B4")
-    fondo_subsections = PatternFill("solid", fgColor="FDE9D9")
-    complete_border = Border(left=medium, right=medium, top=medium, bottom=medium)
-    simple_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    # Estilos
     style_border_tables="medium"
 
     # Título
     ws_index["B2"] = "ÍNDICE"
-    merge_with_border_range(ws_index,"B2:H2",complete_border)
-    ws_index["B2"].font = Font(bold=True, color="FFFFFF", size=14)
-    ws_index["B2"].fill = fondo_header
+    merge_with_border_range(ws_index,"B2:H2",MEDIUM_BORDER)
+    ws_index["B2"].font = INDEX_TITLE_FONT
+    ws_index["B2"].fill = INDEX_HEADER_FILL
 
     if "Filtros" in wb_new.sheetnames:
         cellf = ws_index.cell(row=4, column=2, value="Filtros")   # D con hipervínculo
         cellf.hyperlink = f"#'Filtros'!A1"
-        cellf.font = enlace
-        cellf.border=complete_border
+        cellf.font = LINK_FONT
+        cellf.border=MEDIUM_BORDER
 
     # Obtener listas desde el wb
     grillas_sheets = [s for s in wb_new.sheetnames if s.lower().startswith("grillas")]
@@ -3895,8 +3733,8 @@ def get_diferences_with_kpis(xlsx_pretables_file: BytesIO, xlsx_kpis_list: Bytes
     if grillas_sheets:
         # Grillas
         ws_index[f"B{start_row_tables}"] = "Grillas"
-        ws_index[f"B{start_row_tables}"].font = bold
-        ws_index[f"B{start_row_tables}"].fill = fondo_sections
+        ws_index[f"B{start_row_tables}"].font = BOLD_FONT
+        ws_index[f"B{start_row_tables}"].fill = INDEX_SECTIONS_FILL
         for i, name in enumerate(grillas_sheets, start=start_row_tables):
             part2 = name.split(" ", 1)
             namepart2=part2[1] if len(part2) > 1 else ""
@@ -3904,22 +3742,22 @@ def get_diferences_with_kpis(xlsx_pretables_file: BytesIO, xlsx_kpis_list: Bytes
             if namepart2=="":
                 cell = ws_index.cell(row=i, column=3, value="Total")   # D con hipervínculo
                 cell.hyperlink = f"#{safe_name}!A1"
-                cell.font = enlace
-                merge_with_border_range(ws_index,f"C{i}:D{i}",complete_border)
+                cell.font = LINK_FONT
+                merge_with_border_range(ws_index,f"C{i}:D{i}",MEDIUM_BORDER)
             else:
-                ws_index.cell(row=i, column=3).fill = fondo_subsections  # C vacía con color
+                ws_index.cell(row=i, column=3).fill = INDEX_SUBSECTIONS_FILL  # C vacía con color
                 cell = ws_index.cell(row=i, column=4, value=namepart2)   # D con hipervínculo
                 cell.hyperlink = f"#{safe_name}!A1"
-                cell.font = enlace
-                cell.border=simple_border
-        merge_with_border_range(ws_index,f"B{start_row_tables}:B{start_row_tables+len(grillas_sheets)-1}",complete_border)
+                cell.font = LINK_FONT
+                cell.border=THIN_BORDER
+        merge_with_border_range(ws_index,f"B{start_row_tables}:B{start_row_tables+len(grillas_sheets)-1}",MEDIUM_BORDER)
         apply_outer_border_range(ws_index,f"C{start_row_tables}:D{start_row_tables+len(grillas_sheets)-1}",style_border_tables)
 
     if penaltys_sheets:
         # Penaltys
         ws_index[f"F{start_row_tables}"] = "Penaltys"
-        ws_index[f"F{start_row_tables}"].font = bold
-        ws_index[f"F{start_row_tables}"].fill = fondo_sections
+        ws_index[f"F{start_row_tables}"].font = BOLD_FONT
+        ws_index[f"F{start_row_tables}"].fill = INDEX_SECTIONS_FILL
         for i, name in enumerate(penaltys_sheets, start=start_row_tables):
             part2 = name.split(" ", 1)
             namepart2=part2[1] if len(part2) > 1 else ""
@@ -3927,22 +3765,22 @@ def get_diferences_with_kpis(xlsx_pretables_file: BytesIO, xlsx_kpis_list: Bytes
             if namepart2=="":
                 cell = ws_index.cell(row=i, column=7, value="Total")   # D con hipervínculo
                 cell.hyperlink = f"#{safe_name}!A1"
-                cell.font = enlace
-                merge_with_border_range(ws_index,f"G{i}:H{i}",complete_border)
+                cell.font = LINK_FONT
+                merge_with_border_range(ws_index,f"G{i}:H{i}",MEDIUM_BORDER)
             else:
-                ws_index.cell(row=i, column=7).fill = fondo_subsections  # C vacía con color
+                ws_index.cell(row=i, column=7).fill = INDEX_SUBSECTIONS_FILL  # C vacía con color
                 cell = ws_index.cell(row=i, column=8, value=namepart2)   # D con hipervínculo
                 cell.hyperlink = f"#{safe_name}!A1"
-                cell.font = enlace
-                cell.border=simple_border
-        merge_with_border_range(ws_index,f"F{start_row_tables}:F{start_row_tables+len(penaltys_sheets)-1}",complete_border)
+                cell.font = LINK_FONT
+                cell.border=THIN_BORDER
+        merge_with_border_range(ws_index,f"F{start_row_tables}:F{start_row_tables+len(penaltys_sheets)-1}",MEDIUM_BORDER)
         apply_outer_border_range(ws_index,f"G{start_row_tables}:H{start_row_tables+len(penaltys_sheets)-1}",style_border_tables)
 
     if kpis_sheets:
         # KPIs
         ws_index[f"J{start_row_tables}"] = "KPI's"
-        ws_index[f"J{start_row_tables}"].font = bold
-        ws_index[f"J{start_row_tables}"].fill = fondo_sections
+        ws_index[f"J{start_row_tables}"].font = BOLD_FONT
+        ws_index[f"J{start_row_tables}"].fill = INDEX_SECTIONS_FILL
         for i, name in enumerate(kpis_sheets, start=start_row_tables):
             part2 = name.split(" ", 1)
             namepart2=part2[1] if len(part2) > 1 else ""
@@ -3950,20 +3788,20 @@ def get_diferences_with_kpis(xlsx_pretables_file: BytesIO, xlsx_kpis_list: Bytes
             if namepart2=="":
                 cell = ws_index.cell(row=i, column=11, value="Total")   # D con hipervínculo
                 cell.hyperlink = f"#{safe_name}!A1"
-                cell.font = enlace
+                cell.font = LINK_FONT
             else:
                 cell = ws_index.cell(row=i, column=11, value=namepart2)   # D con hipervínculo
                 cell.hyperlink = f"#{safe_name}!A1"
-                cell.font = enlace
-                cell.border=simple_border
-        merge_with_border_range(ws_index,f"J{start_row_tables}:J{start_row_tables+len(kpis_sheets)-1}",complete_border)
+                cell.font = LINK_FONT
+                cell.border=THIN_BORDER
+        merge_with_border_range(ws_index,f"J{start_row_tables}:J{start_row_tables+len(kpis_sheets)-1}",MEDIUM_BORDER)
         apply_outer_border_range(ws_index,f"K{start_row_tables}:K{start_row_tables+len(kpis_sheets)-1}",style_border_tables)
 
     if abiertas_sheets:
         # Abiertas
         ws_index[f"M{start_row_tables}"] = "Abiertas"
-        ws_index[f"M{start_row_tables}"].font = bold
-        ws_index[f"M{start_row_tables}"].fill = fondo_sections
+        ws_index[f"M{start_row_tables}"].font = BOLD_FONT
+        ws_index[f"M{start_row_tables}"].fill = INDEX_SECTIONS_FILL
         for i, name in enumerate(abiertas_sheets, start=start_row_tables):
             part2 = name.split(" ", 1)
             namepart2=part2[1] if len(part2) > 1 else ""
@@ -3971,20 +3809,21 @@ def get_diferences_with_kpis(xlsx_pretables_file: BytesIO, xlsx_kpis_list: Bytes
             if namepart2=="":
                 cell = ws_index.cell(row=i, column=14, value="Total")   # D con hipervínculo
                 cell.hyperlink = f"#{safe_name}!A1"
-                cell.font = enlace
-                merge_with_border_range(ws_index,f"N{i}:O{i}",complete_border)
+                cell.font = LINK_FONT
+                merge_with_border_range(ws_index,f"N{i}:O{i}",MEDIUM_BORDER)
             else:
-                ws_index.cell(row=i, column=14).fill = fondo_subsections  # C vacía con color
+                ws_index.cell(row=i, column=14).fill = INDEX_SUBSECTIONS_FILL  # C vacía con color
                 cell = ws_index.cell(row=i, column=15, value=namepart2)   # D con hipervínculo
                 cell.hyperlink = f"#{safe_name}!A1"
-                cell.font = enlace
-                cell.border=simple_border
-        merge_with_border_range(ws_index,f"M{start_row_tables}:M{start_row_tables+len(grillas_sheets)-1}",complete_border)
+                cell.font = LINK_FONT
+                cell.border=THIN_BORDER
+        merge_with_border_range(ws_index,f"M{start_row_tables}:M{start_row_tables+len(grillas_sheets)-1}",MEDIUM_BORDER)
         apply_outer_border_range(ws_index,f"N{start_row_tables}:O{start_row_tables+len(grillas_sheets)-1}",style_border_tables)
 
-    for row in ws_index.iter_rows():
-        for cell in row:
-            cell.alignment = centrado
+    style_range(
+        ws_index, 1, 1, ws_index.max_row, ws_index.max_column,
+        alignment=CENTER_WRAP_ALIGNMENT,
+    )
 
     # Pixel-to-width approximations for openpyxl (1 width unit ≈ 7.001 pixels for Calibri 11)
     px_to_width = lambda px: round(px / 7.001, 2)
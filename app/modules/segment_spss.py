@@ -17,8 +17,6 @@ import openpyxl
 from openpyxl.chart import BarChart, Reference
 from openpyxl.chart.marker import DataPoint
 from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Alignment, Font
 from openpyxl.drawing.colors import ColorChoice
 from openpyxl.chart.shapes import GraphicalProperties
 from openpyxl.drawing.fill import GradientStop, GradientFillProperties
@@ -30,7 +28,22 @@ from scipy.stats import chi2_contingency, pearsonr
 # import matplotlib.pyplot as plt
 # import seaborn as sns
 
-from app.modules.utils import get_inverted_scales_keywords, get_temp_file
+from app.modules.excel_styles import (
+    BOLD_FONT,
+    CENTER_ALIGNMENT,
+    HIGHLY_SIGNIFICANT_FONT,
+    SIGNIFICANT_FONT,
+    TOP_LEFT_WRAP_ALIGNMENT,
+)
+from app.modules.excel_writer import WriteOnlySheet, WriteOnlyWorkbook
+from app.modules.utils import (
+    get_inverted_scales_keywords,
+    get_temp_file,
+    read_sav_db,
+    read_sav_meta,
+    release_temp_file,
+    temp_file,
+)
 
 time_zone = timezone("America/Bogota")
 
@@ -72,13 +85,15 @@ def process_chi2(
     correction: bool = False,
     kpis_list_file: BytesIO= None,
 ):
-    data, study_metadata = pyreadstat.read_sav(file_path, apply_value_formats=False)
+    study_metadata = read_sav_meta(file_path)
 
     variables_data = study_metadata.variable_value_labels
 
     filtered_variables = [
         variable for variable, scale in variables_data.items() if len(scale) == 5
     ]
+    # Only the 5 point scales are tested
+    data = read_sav_db(file_path, columns=filtered_variables)
     filtered_variables_data = {
         k: v for k, v in variables_data.items() if k in filtered_variables
     }
@@ -153,12 +168,12 @@ def process_chi2(
     )
 
     if kpis_list_file is not None:
-        file_xlsx_kpis_list = get_temp_file(kpis_list_file)
-        kpis_df_questions = pd.read_excel(
-            file_xlsx_kpis_list,
-            usecols="B,C,D",
-            names=["names_kpis", "number_question_kpi", "number_question2_kpi"],
-        ).dropna(subset=["names_kpis"])
+        with temp_file(kpis_list_file) as file_xlsx_kpis_list:
+            kpis_df_questions = pd.read_excel(
+                file_xlsx_kpis_list,
+                usecols="B,C,D",
+                names=["names_kpis", "number_question_kpi", "number_question2_kpi"],
+            ).dropna(subset=["names_kpis"])
         kpis_df_questions = kpis_df_questions.applymap(
             lambda x: x.strip() if isinstance(x, str) else x
         )
@@ -209,7 +224,7 @@ def process_chi2(
 
 
 def get_correlation_data(file_path: str, correlation_variables: list[str]):
-    data: pd.DataFrame = pyreadstat.read_sav(file_path, apply_value_formats=False)[0]
+    data = read_sav_db(file_path, columns=correlation_variables)
 
     return data[correlation_variables]
 
@@ -388,7 +403,7 @@ def create_chart_top10(
 
 
 def read_sav_metadata(file_name: str) -> pd.DataFrame:
-    metadata = pyreadstat.read_sav(file_name, apply_value_formats=False)[1]
+    metadata = read_sav_meta(file_name)
 
     variable_info = pd.DataFrame(
         [metadata.column_names_to_labels, metadata.variable_value_labels]
@@ -416,56 +431,47 @@ def set_time_zone_to_file(zip_file: io.BytesIO, file: str):
     )
 
 
-def format_ws(sheet):
+def format_ws(sheet: WriteOnlySheet):
     """
     Adjusts the row height of all rows in the given sheet based on their content.
     """
     max_row = sheet.max_row
     max_column = sheet.max_column
-    sheet.column_dimensions["A"].width = 200 / 8.43
+    sheet.column_widths[1] = 200 / 8.43
     # sheet.row_dimensions[1].height = 100
     # Apply bold formatting to the first two columns
-    for i, row in enumerate(sheet.iter_rows()):
-        if i == 0:
-            for cell in row:
-                cell.font = Font(bold=True)
-                cell.alignment = Alignment(
-                    horizontal="left", vertical="top", wrap_text=True
-                )
-        for cell in [row[0]]:  # First two columns
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(
-                horizontal="left", vertical="top", wrap_text=True
-            )
+    header_styles = dict(font=BOLD_FONT, alignment=TOP_LEFT_WRAP_ALIGNMENT)
+    sheet.style_range(1, 1, 1, max_column, **header_styles)
+    sheet.style_range(1, 1, max_row, 1, **header_styles)
 
     # Set fixed column width for all columns
     fixed_column_width = 100 / 8.43
     for col in range(2, max_column + 1):
-        column_letter = get_column_letter(col)
-        sheet.column_dimensions[column_letter].width = fixed_column_width
+        sheet.column_widths[col] = fixed_column_width
 
     # Set fixed row height for all rows
     fixed_row_height = 80 / 1.33
     for row in range(1, max_row + 1):
-        sheet.row_dimensions[row].height = fixed_row_height
+        sheet.row_heights[row] = fixed_row_height
 
     # Apply the formatting to all cells excluding the first row and first column
-    for row in sheet.iter_rows(
-        min_row=2, min_col=2, max_row=max_row, max_col=max_column
-    ):
-        for cell in row:
-            if cell.value < 0.01 and cell.value > 0:
-                cell.font = Font(color="000BDB")
-            elif cell.value >= 0.01 and cell.value < 0.05:
-                cell.font = Font(color="FFC179")
+    for row in range(2, max_row + 1):
+        for col in range(2, max_column + 1):
+            cell = sheet.cell(row, col)
+            # Missing p-values are written as empty cells
+            if cell.value is not None:
+                if cell.value < 0.01 and cell.value > 0:
+                    cell.font = HIGHLY_SIGNIFICANT_FONT
+                elif cell.value >= 0.01 and cell.value < 0.05:
+                    cell.font = SIGNIFICANT_FONT
 
             cell.number_format = "0.00"
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.alignment = CENTER_ALIGNMENT
 
     # Clear existing content in the worksheet
-    for row in sheet.iter_rows(min_row=1, max_row=max_row, max_col=max_column):
-        for cell in row:
-            cell.value = None
+    for row in range(1, max_row + 1):
+        for col in range(1, max_column + 1):
+            sheet.cell(row, col).value = None
 
 
 # def generate_graph_analysis(df: pd.DataFrame):
@@ -503,10 +509,20 @@ def create_zip(zip_name: str, files: dict):
 
 
 def add_segment_conditions(df: pd.DataFrame, spss_file: BytesIO):
-    temp_file_name = get_temp_file(spss_file)
-    data, study_metadata = pyreadstat.read_sav(
-        temp_file_name, apply_value_formats=False
-    )
+    # Only the variables referenced as #var# in the conditions are decoded
+    segment_variables = {
+        var[:-1] if var.endswith("*") else var
+        for condition in df.iloc[:, 2]
+        if condition is not None and "#" in condition
+        for var in re.findall(r"#(.*?)#", condition)
+    }
+    if not segment_variables:
+        return df
+
+    with temp_file(spss_file) as temp_file_name:
+        study_metadata = read_sav_meta(temp_file_name)
+        data = read_sav_db(temp_file_name, columns=sorted(segment_variables))
+
     for i in range(len(df) - 1, -1, -1):
         row_original = df.iloc[i]
         condition = row_original[2]
@@ -586,6 +602,8 @@ def segment_spss(
     survey_data, metadata = pyreadstat.read_sav(
         temp_file_name, apply_value_formats=False
     )
+    if isinstance(spss_file, BytesIO):
+        release_temp_file(temp_file_name)
 
     survey_data: pd.DataFrame = survey_data.dropna(how="all")
 
@@ -637,8 +655,7 @@ def segment_spss(
         corr_xlsx_file_name = (
             f"correlations_{spss_file.name.split('.')[0].replace('Base ', '')}.xlsx"
         )
-        corr_wb = openpyxl.Workbook()
-        corr_wb.remove(corr_wb.active)
+        corr_wb = WriteOnlyWorkbook()
 
     warning_empty = ""
 
@@ -749,23 +766,15 @@ def segment_spss(
                 index=metadata.column_names_to_labels,
             ).reset_index(names="")
 
-            # Create a new workbook object and select the active worksheet
-            corr_wb.create_sheet(job["scenario_name"])
-            corr_ws = corr_wb[job["scenario_name"]]
+            # Create a new worksheet in the write-only correlations workbook
+            corr_ws = corr_wb.create_sheet(job["scenario_name"])
 
             # Write DataFrame content to the worksheet
-            for r in dataframe_to_rows(p_value_df, index=False, header=True):
-                corr_ws.append(r)
+            corr_ws.append_dataframe(p_value_df)
 
             format_ws(corr_ws)
 
-            start_row = 1
-            for r_idx, r in enumerate(
-                dataframe_to_rows(correlation_df, index=False, header=True),
-                start=start_row,
-            ):
-                for c_idx, value in enumerate(r, start=1):
-                    corr_ws.cell(row=r_idx, column=c_idx, value=value)
+            corr_ws.append_dataframe(correlation_df)
 
             # pdf_graph_temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
 
@@ -790,8 +799,7 @@ def segment_spss(
 
     if jobs["correlation_variables"].any():
         # Save the new Excel file
-        corr_wb.save(corr_xlsx_temp_file)
-        corr_wb.close()
+        corr_wb.save(corr_xlsx_temp_file.name)
 
         files[corr_xlsx_file_name] = corr_xlsx_temp_file.name
         corr_xlsx_temp_file.close()
@@ -1,6 +1,5 @@
 import os
 from io import BytesIO
-import tempfile
 from datetime import datetime
 from pytz import timezone
 
@@ -26,17 +25,8 @@ from app.cloud import SharePoint, BigQueryClient
 time_zone = timezone("America/Bogota")
 
 
-def get_temp_file(spss_file: BytesIO):
-    # Save BytesIO object to a temporary file
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-        tmp_file.write(spss_file.getvalue())
-        temp_file_name = tmp_file.name
-
-    return temp_file_name
-
-
 def read_sav_metadata(file_name: str) -> pd.DataFrame:
-    metadata = pyreadstat.read_sav(file_name, apply_value_formats=False)[1]
+    metadata = pyreadstat.read_sav(file_name, metadataonly=True)[1]
 
     variable_info = pd.DataFrame(
         [metadata.column_names_to_labels, metadata.variable_value_labels]
@@ -9,7 +9,7 @@ from firebase_admin import firestore
 import streamlit as st
 
 from app.cloud import SharePoint, BigQueryClient
-from app.modules.utils import write_bytes
+from app.modules.utils import write_bytes, read_sav_meta
 
 
 @st.cache_data(show_spinner=False)
@@ -347,7 +347,7 @@ def process_study(spss_file_name: str, study_info: dict):
     demographic_variables = study_info["demographic_variables"]
     final_columns = study_info["db_variables"]
 
-    metadata = pyreadstat.read_sav(spss_file_name, apply_value_formats=False)[1]
+    metadata = read_sav_meta(spss_file_name)
 
     final_data_template = pd.DataFrame(columns=final_columns)
 
@@ -1,12 +1,11 @@
 from io import BytesIO
 import re
-import pyreadstat
 import numpy as np
 import pandas as pd
 from unidecode import unidecode
 from difflib import SequenceMatcher
 
-from app.modules.segment_spss import get_temp_file
+from app.modules.utils import SavSession
 
 def questionFinder(txtC):
     questions=""
@@ -286,13 +285,10 @@ def genLabels2(txtC):
         result+=line.split()[0]+" \""+re.search("\s.*",line).group()[1:]+"\""+"\n"
     return result
 
-def processSavMulti(spss_file: BytesIO):
+def processSavMulti(spss_file: BytesIO | SavSession):
     try:
-        temp_file_name = get_temp_file(spss_file)
-        data, study_metadata = pyreadstat.read_sav(
-            temp_file_name,
-            apply_value_formats=False
-        )
+        sav = SavSession.from_file(spss_file)
+        study_metadata = sav.metadata
         vals=study_metadata.variable_value_labels
         labels="* Encoding: UTF-8.\n"
         serie=False
@@ -1,13 +1,19 @@
 from io import BytesIO
-import tempfile
 from unidecode import unidecode
 import pyreadstat
 import numpy as np
 import pandas as pd
 
+from app.modules.utils import (
+    get_temp_file,
+    read_sav_meta,
+    release_temp_file,
+    write_to_buffer,
+)
+
 
 def prepare_variable_mapping(file_name_xlsx: str, file_name_sav: str):
-    metadata_db = pyreadstat.read_sav(file_name_sav)[1]
+    metadata_db = read_sav_meta(file_name_sav)
     variable_mapping = pd.read_excel(file_name_xlsx, sheet_name="MAPEO")
 
     inverted_gender = variable_mapping[variable_mapping["belcorp"] == "GENERO INV."][
@@ -225,27 +231,16 @@ def transform(
     return transformed_df
 
 
-def get_temp_file(spss_file: BytesIO):
-    # Save BytesIO object to a temporary file
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-        tmp_file.write(spss_file.getvalue())
-        temp_file_name = tmp_file.name
-
-    return temp_file_name
-
-
 def write_temp_sav(df: pd.DataFrame, metadata):
-    with tempfile.NamedTemporaryFile() as tmpfile:
-        # Write the DataFrame to the temporary SPSS file
-        pyreadstat.write_sav(
+    return write_to_buffer(
+        lambda file_name: pyreadstat.write_sav(
             df,
-            tmpfile.name,
+            file_name,
             column_labels=metadata.column_names_to_labels,
             variable_value_labels=metadata.variable_value_labels,
-        )
-
-        with open(tmpfile.name, "rb") as f:
-            return BytesIO(f.read())
+        ),
+        ".sav",
+    )
 
 
 def transform_to_belcorp(xlsx_file: BytesIO, sav_file: BytesIO):
@@ -257,13 +252,13 @@ def transform_to_belcorp(xlsx_file: BytesIO, sav_file: BytesIO):
     variable_mapping = prepare_variable_mapping(temp_file_name_xlsx, temp_file_name_sav)
     df_db = get_sav_db(temp_file_name_sav)
 
-    _, metadata_norma = pyreadstat.read_sav(
-        "static/templates/BBDD NORMAS - Plantilla.sav"
-    )
+    metadata_norma = read_sav_meta("static/templates/BBDD NORMAS - Plantilla.sav")
 
     df_list = separate_moments(variable_mapping, df_db)
 
     specifications = get_specifications(temp_file_name_xlsx)
+    release_temp_file(temp_file_name_xlsx)
+    release_temp_file(temp_file_name_sav)
     country = unidecode(
         specifications[specifications[0] == "PAIS"][1].values[0].lower()
     )
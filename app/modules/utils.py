@@ -1,17 +1,29 @@
 import os
+import ast
 from io import BytesIO
 import json
 import zipfile
+import hashlib
+import shutil
 import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import cached_property, lru_cache
 import requests
 
 import pandas as pd
+import pyarrow.feather as feather
 import pyreadstat
 from openpyxl import Workbook
+from openpyxl.utils import column_index_from_string
 
 import streamlit as st
 from firebase_admin import firestore, auth
 
+from app.modules.excel_writer import WriteOnlyWorkbook
 from app.modules.preprocessing import reorder_columns
 from app.cloud.cloud_storage import CloudStorageClient
 
@@ -63,13 +75,542 @@ def get_authorized_pages_names(pages_roles: dict):
     return pages_to_show
 
 
+@lru_cache(maxsize=None)
+def usable_cpus() -> int:
+    """
+    Number of CPUs the app can actually run on. `os.cpu_count` reports the
+    host's CPUs, not the container's limit (e.g. `--cpu=1` on Cloud Run).
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2, then v1 CPU quota
+    for quota_file, period_file in (
+        ("/sys/fs/cgroup/cpu.max", None),
+        (
+            "/sys/fs/cgroup/cpu/cpu.cfs_quota_us",
+            "/sys/fs/cgroup/cpu/cpu.cfs_period_us",
+        ),
+    ):
+        try:
+            with open(quota_file) as f:
+                values = f.read().split()
+            if period_file is not None:
+                with open(period_file) as f:
+                    values.append(f.read().strip())
+        except OSError:
+            continue
+
+        quota, period = values[0], values[1]
+        if quota not in ("max", "-1"):
+            cpus = min(cpus, max(1, int(quota) // int(period)))
+        break
+
+    return cpus
+
+
+class SerialExecutor(Executor):
+    """Executor running every job right away in the calling thread."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+@contextmanager
+def worker_pool(num_jobs: int, max_workers: int | None = None):
+    """
+    Executor for `num_jobs` CPU bound jobs.
+
+    Jobs run serially in the calling thread when there is a single job or a
+    single usable CPU, where a pool only adds overhead, and in a thread pool
+    otherwise. Processes are not used: forking the multi-threaded server can
+    leave a child stuck on a lock another thread held at fork time, and
+    main.py is not import safe for spawned workers.
+
+    Args:
+        num_jobs (int): Number of jobs that will be submitted.
+        max_workers (int | None): Upper bound of workers, the usable CPUs by
+            default.
+    """
+    workers = min(num_jobs, max_workers or usable_cpus())
+    if workers <= 1:
+        executor = SerialExecutor()
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+    with executor:
+        yield executor
+
+
+class TempFileCache:
+    """
+    Uploads spilled to disk once per content.
+
+    Files are named after a hash of their bytes, so every module asking for
+    the same upload gets the same path back without writing it again. Each
+    `get` pins the file until the caller hands it back with `release`; once
+    the directory grows past `max_bytes`, the least recently used files that
+    nobody holds are deleted. Pinned files are never deleted, even if that
+    keeps the directory over the bound.
+
+    Args:
+        directory (str): Directory holding the spilled files.
+        max_bytes (int): Size the directory is trimmed down to.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._sizes: OrderedDict[str, int] = OrderedDict()
+        self._pins: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        # Reuse what a previous run left behind, oldest first
+        entries = os.scandir(directory)
+        for entry in sorted(entries, key=lambda entry: entry.stat().st_mtime):
+            if entry.name.endswith(".part"):
+                os.unlink(entry.path)
+            else:
+                self._sizes[entry.path] = entry.stat().st_size
+
+    def get(self, file: BytesIO, suffix: str | None = None) -> str:
+        """
+        Returns the path of a file on disk with the contents of `file`.
+
+        Args:
+            file (BytesIO): Content to spill.
+            suffix (str | None): File extension, part of the cache key.
+
+        Returns:
+            str: Path of the cached file. It is shared, so it must not be
+                modified or deleted by the caller, only released.
+        """
+        buffer = file.getbuffer()
+        try:
+            digest = hashlib.blake2b(buffer, digest_size=20).hexdigest()
+            path = os.path.join(self.directory, f"{digest}{suffix or ''}")
+
+            with self._lock:
+                if path in self._sizes and os.path.exists(path):
+                    self._sizes.move_to_end(path)
+                    self._pins[path] = self._pins.get(path, 0) + 1
+                    return path
+
+                # Write next to the target and rename, so no reader sees a
+                # partially written file
+                partial_path = f"{path}.{threading.get_ident()}.part"
+                with open(partial_path, "wb") as tmp_file:
+                    tmp_file.write(buffer)
+                os.replace(partial_path, path)
+
+                self._sizes[path] = buffer.nbytes
+                self._sizes.move_to_end(path)
+                self._pins[path] = self._pins.get(path, 0) + 1
+                self._evict()
+        finally:
+            buffer.release()
+
+        return path
+
+    def release(self, path: str):
+        """
+        Unpins a file returned by `get`. It stays cached for other callers
+        until eviction needs the space and nobody else holds it.
+        """
+        with self._lock:
+            pins = self._pins.get(path, 0) - 1
+            if pins > 0:
+                self._pins[path] = pins
+            else:
+                self._pins.pop(path, None)
+            self._evict()
+
+    def _evict(self):
+        evict_least_recently_used(
+            self._sizes, self.max_bytes, _remove_file, pinned=self._pins
+        )
+
+
+def _remove_file(path: str):
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+def evict_least_recently_used(
+    sizes: OrderedDict, max_bytes: int, remove, pinned=()
+):
+    """
+    Removes the oldest entries of `sizes` (path to size, least recently used
+    first) until their total fits in `max_bytes`. Pinned entries are in use
+    and never removed, even if that leaves the total over the bound.
+
+    Args:
+        sizes (OrderedDict): Entries to trim, updated in place.
+        max_bytes (int): Size the entries are trimmed down to.
+        remove (Callable[[str], None]): Deletes an entry from disk.
+        pinned (Container[str]): Entries that must be kept.
+    """
+    total = sum(sizes.values())
+    for path in list(sizes):
+        if total <= max_bytes:
+            break
+        if path in pinned:
+            continue
+        total -= sizes.pop(path)
+        remove(path)
+
+
+_temp_files = TempFileCache(
+    os.path.join(tempfile.gettempdir(), "connecta-temp-files"),
+    int(os.getenv("TEMP_FILES_CACHE_MAX_MB", 128)) * 1024 * 1024,
+)
+
+
 def get_temp_file(file: BytesIO, suffix: str | None = None):
-    # Save BytesIO object to a temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-        tmp_file.write(file.getvalue())
-        temp_file_name = tmp_file.name
+    # Spill once per content, every caller with the same upload shares the
+    # path. It is kept until released with `release_temp_file`
+    return _temp_files.get(file, suffix)
+
+
+def release_temp_file(temp_file_name: str):
+    _temp_files.release(temp_file_name)
+
 
-    return temp_file_name
+@contextmanager
+def temp_file(file: BytesIO, suffix: str | None = None):
+    """`get_temp_file` released when the block exits."""
+    temp_file_name = get_temp_file(file, suffix)
+    try:
+        yield temp_file_name
+    finally:
+        release_temp_file(temp_file_name)
+
+
+class StudyCache:
+    """
+    Decoded studies kept on disk as uncompressed Feather files.
+
+    Entries are keyed by blob name and generation, so a study is decoded from
+    SPSS once per uploaded version and later loads only copy the Arrow data
+    into pandas. Older generations of a blob are deleted when a newer one is
+    stored, and the least recently loaded studies once the directory grows
+    past `max_bytes`.
+
+    Recency is tracked with the folders' modification times rather than in
+    memory, so it survives restarts, and eviction only runs when `evict` is
+    called.
+
+    Args:
+        directory (str): Directory holding one folder per cached study.
+        max_bytes (int): Size the directory is trimmed down to.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+        os.makedirs(directory, exist_ok=True)
+        # Drop entries a previous run left half written
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".part"):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _prefix(self, blob_name: str) -> str:
+        return hashlib.blake2b(blob_name.encode(), digest_size=20).hexdigest()
+
+    def _path(self, blob_name: str, generation: str) -> str:
+        return os.path.join(self.directory, f"{self._prefix(blob_name)}-{generation}")
+
+    def contains(self, blob_name: str, generation: str) -> bool:
+        return os.path.isdir(self._path(blob_name, generation))
+
+    def load(
+        self, blob_name: str, generation: str
+    ) -> tuple[pd.DataFrame, pd.DataFrame, dict] | None:
+        """
+        Returns the cached data, metadata and config of a study, or None if
+        that generation has not been stored.
+        """
+        path = self._path(blob_name, generation)
+        if not os.path.isdir(path):
+            return None
+
+        try:
+            # Mark the study as recently used for eviction
+            os.utime(path)
+
+            db = feather.read_table(
+                os.path.join(path, "db.feather"), memory_map=True
+            ).to_pandas()
+            metadata_df = (
+                feather.read_table(
+                    os.path.join(path, "metadata.feather"), memory_map=True
+                )
+                .to_pandas()
+                .set_index("name")
+            )
+            config = load_json(os.path.join(path, "config.json"))
+        except FileNotFoundError:
+            # Evicted by another session meanwhile
+            return None
+
+        return db, metadata_df, config
+
+    def store(
+        self,
+        blob_name: str,
+        generation: str,
+        db: pd.DataFrame,
+        metadata_df: pd.DataFrame,
+        config: dict,
+    ):
+        path = self._path(blob_name, generation)
+        if os.path.isdir(path):
+            return
+
+        # Write a sibling folder and rename it, so loads never see a partial entry
+        partial_path = f"{path}.{threading.get_ident()}.part"
+        os.makedirs(partial_path, exist_ok=True)
+        try:
+            feather.write_feather(
+                db.reset_index(drop=True),
+                os.path.join(partial_path, "db.feather"),
+                compression="uncompressed",
+            )
+            feather.write_feather(
+                metadata_df.reset_index(),
+                os.path.join(partial_path, "metadata.feather"),
+                compression="uncompressed",
+            )
+            with open(
+                os.path.join(partial_path, "config.json"), "w", encoding="utf-8"
+            ) as f:
+                json.dump(config, f)
+            os.replace(partial_path, path)
+        except OSError:
+            # Another session stored the same generation first
+            if not os.path.isdir(path):
+                raise
+        finally:
+            shutil.rmtree(partial_path, ignore_errors=True)
+
+        prefix = self._prefix(blob_name)
+        for entry in os.scandir(self.directory):
+            if (
+                entry.name.startswith(f"{prefix}-")
+                and not entry.name.endswith(".part")
+                and entry.path != path
+            ):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def evict(self, keep: list[tuple[str, str]] | None = None):
+        """
+        Deletes the least recently loaded studies until the directory fits in
+        `max_bytes`.
+
+        Args:
+            keep (list[tuple[str, str]]): `(blob_name, generation)` of studies
+                in use, never deleted.
+        """
+        keep_paths = {
+            self._path(blob_name, generation) for blob_name, generation in keep or []
+        }
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir() or entry.name.endswith(".part"):
+                continue
+            try:
+                size = sum(file.stat().st_size for file in os.scandir(entry.path))
+                modified = entry.stat().st_mtime
+            except FileNotFoundError:
+                # Removed by another session meanwhile
+                continue
+
+            entries.append((modified, entry.path, size))
+
+        sizes = OrderedDict((path, size) for _, path, size in sorted(entries))
+        evict_least_recently_used(
+            sizes,
+            self.max_bytes,
+            lambda path: shutil.rmtree(path, ignore_errors=True),
+            pinned=keep_paths,
+        )
+
+
+class SavSession:
+    """
+    Parsed `.sav` upload shared by the SPSS syntax generators.
+
+    The file is spilled to disk and decoded by pyreadstat a single time, so
+    every generator that receives the session reads the same `data` and
+    `metadata` instead of parsing the upload again. Only the metadata is read
+    up front; rows are decoded the first time `data` is used.
+
+    Args:
+        file (BytesIO): The uploaded `.sav` file.
+    """
+
+    def __init__(self, file: BytesIO):
+        self.file = file
+        self.name = getattr(file, "name", None)
+        self.temp_file_name = get_temp_file(file)
+        # `data` is read lazily, so the spill is held as long as the session
+        weakref.finalize(self, release_temp_file, self.temp_file_name)
+        self.metadata = read_sav_meta(self.temp_file_name)
+
+    @cached_property
+    def data(self) -> pd.DataFrame:
+        # The full read also fills the row count of the metadata
+        data, self.metadata = pyreadstat.read_sav(
+            self.temp_file_name, apply_value_formats=False
+        )
+        return data
+
+    @classmethod
+    def from_file(cls, file: "BytesIO | SavSession") -> "SavSession":
+        """Return `file` if it is already a session, otherwise parse it."""
+        if isinstance(file, cls):
+            return file
+        return cls(file)
+
+
+
+@st.cache_data(show_spinner=False)
+def _read_plantilla_sheets(content: bytes) -> dict[str, pd.DataFrame]:
+    # Cached on the workbook bytes, so reruns with the same plantilla reuse it
+    return pd.read_excel(BytesIO(content), sheet_name=None, header=None)
+
+
+class PlantillaSpec:
+    """
+    Parsed plantilla workbook shared by the SPSS syntax generators.
+
+    Every sheet is read once without headers and the column views the
+    generators use (vars, types, scales, cruces, segment vars, sheet name,
+    suffix and column vars) are sliced from that raw grid. The code book
+    (LC) workbook is read through it too, via `columns(..., sheet_name=...)`.
+
+    Args:
+        file (BytesIO): The uploaded plantilla or code book `.xlsx` file.
+    """
+
+    def __init__(self, file: BytesIO):
+        self.file = file
+        self.name = getattr(file, "name", None)
+        self.sheets = _read_plantilla_sheets(file.getvalue())
+        self.main_sheet = next(iter(self.sheets))
+
+    @classmethod
+    def from_file(cls, file: "BytesIO | PlantillaSpec") -> "PlantillaSpec":
+        """Return `file` if it is already a spec, otherwise parse it."""
+        if isinstance(file, cls):
+            return file
+        return cls(file)
+
+    def columns(
+        self,
+        usecols: str,
+        names: list[str],
+        skiprows: int = 3,
+        sheet_name: str | int | None = None,
+    ) -> pd.DataFrame:
+        """
+        Equivalent of `pd.read_excel(file, usecols=..., skiprows=..., names=...)`.
+
+        Args:
+            usecols (str): Comma separated column letters, e.g. "A,B,D,E".
+            names (list[str]): Names given to the selected columns.
+            skiprows (int): Rows skipped before the (replaced) header row.
+            sheet_name (str | int | None): Sheet name or position, the first
+                one by default.
+
+        Returns:
+            pd.DataFrame: The selected columns below the header row.
+        """
+        if sheet_name is None:
+            sheet_name = self.main_sheet
+        elif isinstance(sheet_name, int) and sheet_name not in self.sheets:
+            sheet_name = list(self.sheets)[sheet_name]
+        raw = self.sheets[sheet_name]
+        indexes = [column_index_from_string(col.strip()) - 1 for col in usecols.split(",")]
+        frame = raw.reindex(columns=indexes).iloc[skiprows + 1 :]
+        frame.columns = names
+        return frame.reset_index(drop=True).infer_objects()
+
+    def column_values(self, usecol: str) -> list:
+        """Non empty values of a single plantilla column below the header row."""
+        return self.columns(usecol, ["values"])["values"].dropna().tolist()
+
+    @property
+    def segment_vars(self) -> list:
+        return self.column_values("M")
+
+    @property
+    def vars_segment(self) -> list:
+        return self.column_values("N")
+
+    @property
+    def sheet_name(self) -> str:
+        # Raises IndexError when the plantilla has no sheet name, as before
+        return self.column_values("O")[0]
+
+    @property
+    def suffix(self) -> str:
+        values = self.column_values("P")
+        return " " + str(values[0]) if values else ""
+
+    @property
+    def col_vars_list(self) -> pd.DataFrame:
+        """
+        Column variables and their labels as
+        `pd.melt(pd.read_excel(file, nrows=2), var_name="colVars",
+        value_name="colVarsNames").drop(0)` lists them.
+
+        Returns:
+            pd.DataFrame: `colVars` (header names) and `colVarsNames` (the
+                values below them, column by column), indexed from 1.
+        """
+        header = self.sheets[self.main_sheet].iloc[:3]
+        filled = header.notna().any().to_numpy().nonzero()[0]
+        width = filled[-1] + 1 if len(filled) else 0
+
+        names = []
+        counts = {}
+        for i, name in enumerate(header.iloc[0, :width] if len(header) else []):
+            name = f"Unnamed: {i}" if pd.isna(name) else name
+            count = counts.get(name, 0)
+            while count > 0:
+                counts[name] = count + 1
+                name = f"{name}.{count}"
+                count = counts.get(name, 0)
+            counts[name] = count + 1
+            names.append(name)
+
+        rows = header.iloc[1:, :width]
+        return pd.DataFrame(
+            {
+                "colVars": pd.Series(names, dtype=object).repeat(len(rows)).to_numpy(),
+                "colVarsNames": rows.to_numpy(dtype=object).ravel(order="F"),
+            }
+        ).drop(0)
+
+    @property
+    def col_vars(self) -> pd.Series:
+        """
+        Column variables as `pd.melt(pd.read_excel(file, nrows=2)).drop(0)` lists them.
+
+        Returns:
+            pd.Series: Header names repeated once per data row, indexed from 1.
+        """
+        return self.col_vars_list["colVars"]
 
 
 def write_multiple_df_bytes(dfs_dict: dict[str, pd.DataFrame]) -> BytesIO:
@@ -115,13 +656,43 @@ def write_bytes(data: pd.DataFrame | str, metadata=None):
     return bytes_io
 
 
-def read_sav_db(file_name: str, apply_value_formats: bool = False) -> pd.DataFrame:
-    return pyreadstat.read_sav(file_name, apply_value_formats=apply_value_formats)[0]
+def read_sav_db(
+    file_name: str,
+    apply_value_formats: bool = False,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Reads the data of a SAV file.
+
+    Args:
+        file_name (str): Path of the SAV file.
+        apply_value_formats (bool): Replace values by their labels.
+        columns (list[str] | None): Only decode these variables, all when None.
+
+    Returns:
+        pd.DataFrame: The data, with columns in file order.
+    """
+    return pyreadstat.read_sav(
+        file_name, apply_value_formats=apply_value_formats, usecols=columns
+    )[0]
+
+
+def read_sav_meta(file_name: str):
+    """Reads the metadata of a SAV file without decoding any row."""
+    return pyreadstat.read_sav(file_name, metadataonly=True)[1]
 
 
 def read_sav_metadata(file_name: str) -> pd.DataFrame:
-    metadata = pyreadstat.read_sav(file_name, apply_value_formats=False)[1]
+    return metadata_to_df(read_sav_meta(file_name))
+
+
+def read_sav(file_name: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Reads the data and the metadata DataFrame of a SAV file in one pass."""
+    db, metadata = pyreadstat.read_sav(file_name, apply_value_formats=False)
+    return db, metadata_to_df(metadata)
 
+
+def metadata_to_df(metadata) -> pd.DataFrame:
     variable_info = pd.DataFrame(
         [metadata.column_names_to_labels, metadata.variable_value_labels]
     )
@@ -135,39 +706,99 @@ def read_sav_metadata(file_name: str) -> pd.DataFrame:
     return variable_info
 
 
-def write_temp_sav(df: pd.DataFrame, metadata):
+class ValueLabels(dict):
+    """
+    Value labels of a variable (code -> label) with a reverse label -> code
+    index. Instances are shared through `parse_value_labels` and must not be
+    mutated.
+    """
+
+    @cached_property
+    def codes(self) -> dict:
+        label_codes = {}
+        for code, label in self.items():
+            label_codes.setdefault(label, code)
+        return label_codes
+
+
+@lru_cache(maxsize=4096)
+def parse_value_labels(values: str) -> ValueLabels | None:
+    """
+    Parses a `values` string written by `read_sav_metadata` back into its value
+    labels. Strings are only parsed as Python literals, once per distinct string.
+
+    Args:
+        values (str): Stringified value labels dict.
+
+    Returns:
+        ValueLabels | None: The value labels, or None if `values` is not a dict.
+    """
+    if not isinstance(values, str) or not values.strip():
+        return None
+    try:
+        value_labels = ast.literal_eval(values)
+    except (ValueError, SyntaxError):
+        return None
+    return ValueLabels(value_labels) if isinstance(value_labels, dict) else None
+
+
+def write_sav_file(df: pd.DataFrame, metadata, file_name: str):
     variable_format = {column: "F20.0" for column in df.columns}
     variable_format.update(
         {column: "" for column in df.select_dtypes(include=["object"]).columns}
     )
 
-    with tempfile.NamedTemporaryFile() as tmpfile:
-        # Write the DataFrame to the temporary SPSS file
-        pyreadstat.write_sav(
-            df,
-            tmpfile.name,
-            column_labels=metadata.column_names_to_labels,
-            variable_value_labels=metadata.variable_value_labels,
-            variable_measure={column: "nominal" for column in df.columns},
-            variable_format=variable_format,
-        )
+    pyreadstat.write_sav(
+        df,
+        file_name,
+        column_labels=metadata.column_names_to_labels,
+        variable_value_labels=metadata.variable_value_labels,
+        variable_measure={column: "nominal" for column in df.columns},
+        variable_format=variable_format,
+    )
 
-        with open(tmpfile.name, "rb") as f:
-            return BytesIO(f.read())
 
+def write_to_buffer(write, suffix: str = "") -> BytesIO:
+    """
+    Returns the output of a writer that only accepts file paths (such as
+    `pyreadstat.write_sav`) as a BytesIO.
 
-def write_temp_excel(data: Workbook | pd.DataFrame, index: bool = False):
-    with tempfile.NamedTemporaryFile() as tmpfile:
-        if isinstance(data, Workbook):
-            # Write the DataFrame to the temporary SPSS file
-            data.save(tmpfile.name)
-        elif isinstance(data, pd.DataFrame):
-            data.to_excel(tmpfile, index=index)
+    The temporary file is read with a single `read` whose bytes the BytesIO
+    adopts without copying, so the payload is held in memory only once.
 
+    Args:
+        write (Callable[[str], None]): Writes the output to the given path.
+        suffix (str): Suffix of the temporary file.
+
+    Returns:
+        BytesIO: The written file.
+    """
+    with tempfile.NamedTemporaryFile(suffix=suffix) as tmpfile:
+        write(tmpfile.name)
         with open(tmpfile.name, "rb") as f:
             return BytesIO(f.read())
 
 
+def write_temp_sav(df: pd.DataFrame, metadata):
+    return write_to_buffer(
+        lambda file_name: write_sav_file(df, metadata, file_name), ".sav"
+    )
+
+
+def write_temp_excel(
+    data: Workbook | WriteOnlyWorkbook | pd.DataFrame, index: bool = False
+):
+    # Excel writers take file objects, so the workbook goes straight to memory
+    buffer = BytesIO()
+    if isinstance(data, (Workbook, WriteOnlyWorkbook)):
+        data.save(buffer)
+    elif isinstance(data, pd.DataFrame):
+        data.to_excel(buffer, index=index)
+
+    buffer.seek(0)
+    return buffer
+
+
 def try_download(
     label: str,
     data: BytesIO,
@@ -177,76 +808,66 @@ def try_download(
 ):
     st.download_button(
         label=label,
-        data=data.getvalue(),
+        data=data,
         file_name=f"{file_name}.{file_extension}",
         mime=f"application/{file_extension}",
         type=type,
     )
 
 
-def split_sav_file_to_chunks(file_name: str, max_records: int = 500):
-    # Read the .sav file
-    df, meta = pyreadstat.read_sav(file_name)
-
-    # Calculate number of chunks
-    num_chunks = (len(df) + max_records - 1) // max_records
-    chunks = []
-
-    # Split dataframe into chunks
-    for i in range(num_chunks):
-        start_idx = i * max_records
-        end_idx = min((i + 1) * max_records, len(df))
-
-        chunk = df.iloc[start_idx:end_idx]
-        chunks.append(chunk)
-
-    return chunks, meta
+def split_sav_file_to_zip(file_name: str, prefix: str, max_records: int = 500):
+    """
+    Splits a `.sav` file into `.sav` chunks of `max_records` rows, packed in a
+    zip. Rows are read one chunk at a time, so only a single chunk is ever in
+    memory.
 
+    Args:
+        file_name (str): Path of the `.sav` file to split.
+        prefix (str): Suffix of the chunk file names.
+        max_records (int): Rows per chunk.
 
-def create_zip_with_chunks(chunks: list[pd.DataFrame], meta, prefix: str):
-    # Create a BytesIO stream for zip file
+    Returns:
+        BytesIO: The zip with the chunks.
+    """
     zip_buffer = BytesIO()
 
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for i, chunk in enumerate(chunks):
-            # Write each chunk to a temporary BytesIO buffer
-            chunk_buffer = write_temp_sav(chunk, meta)
-            chunk_buffer.seek(0)
+    chunks = pyreadstat.read_file_in_chunks(
+        pyreadstat.read_sav, file_name, chunksize=max_records
+    )
 
-            # Add chunk to zip file
-            zip_file.writestr(f"chunk_{i + 1}_{prefix}.sav", chunk_buffer.read())
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for i, (chunk, meta) in enumerate(chunks, start=1):
+            # pyreadstat only writes to paths, the zip streams the file from disk
+            with tempfile.NamedTemporaryFile(suffix=".sav") as tmpfile:
+                write_sav_file(chunk, meta, tmpfile.name)
+                zip_file.write(tmpfile.name, f"chunk_{i}_{prefix}.sav")
 
     zip_buffer.seek(0)
     return zip_buffer
 
 
 def join_sav(original_db_path: str, files_path: list[str]):
-    original_db, original_meta = pyreadstat.read_sav(
-        original_db_path, apply_value_formats=False
-    )
-
-    dfs = [
-        pyreadstat.read_sav(file_path, apply_value_formats=False)[0]
-        for file_path in files_path
-    ]
+    # Only the variables of the original are needed, not its rows
+    original_meta = read_sav_meta(original_db_path)
+    original_columns = pd.DataFrame(columns=original_meta.column_names)
 
-    total_df = pd.concat(dfs).sort_values(by="Response_ID").reset_index(drop=True)
+    total_df = pd.concat(
+        [read_sav_db(file_path) for file_path in files_path], ignore_index=True
+    )
+    total_df = total_df.sort_values(by="Response_ID").reset_index(drop=True)
     total_df = total_df.drop(columns=["ABIERTAS", "ETIQUETAS"])
 
-    last_numeric_var = get_last_numeric_var(original_db_path)
-    final_df = reorder_columns(total_df, original_db, last_numeric_var)
-    variable_format = {column: "F20.0" for column in final_df.columns}
-    variable_format.update(
-        {column: "" for column in final_df.select_dtypes(include=["object"]).columns}
-    )
+    last_numeric_var = last_numeric_var_from_meta(original_meta)
+    final_df = reorder_columns(total_df, original_columns, last_numeric_var)
 
     return write_temp_sav(final_df, original_meta)
 
 
 def get_last_numeric_var(original_db_path):
-    original_db, original_meta = pyreadstat.read_sav(
-        original_db_path, apply_value_formats=False
-    )
+    return last_numeric_var_from_meta(read_sav_meta(original_db_path))
+
+
+def last_numeric_var_from_meta(original_meta):
     var_type_base = original_meta.original_variable_types  # F-- Float / A-- String
 
     last_num_var = ""
@@ -388,15 +1009,13 @@ def upload_study_to_gcs(
     study_name: str,
     extension: str,
 ):
-    temp_file_name = get_temp_file(uploaded_file_sav, extension)
     file_name = f"{_to_code(study_id)}_{_to_code(study_name)}"
     blob_name = (
         f"databases/{category}/{subcategory}/{country_code}/"
         f"{company}/{file_name}.{extension}"
     )
-    upload_to_gcs(temp_file_name, blob_name, "connecta-app-1-service-processing")
-    # delete temp file
-    os.unlink(temp_file_name)
+    with temp_file(uploaded_file_sav, extension) as temp_file_name:
+        upload_to_gcs(temp_file_name, blob_name, "connecta-app-1-service-processing")
 
 
 def get_study_config(
@@ -8,12 +8,11 @@ def validate_segmentation_spss_db(jobs: pd.DataFrame, temp_file_name: str) -> bo
 
     validations = []
 
-    survey_data: pd.DataFrame = pyreadstat.read_sav(
+    # Only the variable names are needed, no rows are decoded
+    db_variables = pyreadstat.read_sav(
         temp_file_name,
-        apply_value_formats=False
-    )[0]
-
-    db_variables = survey_data.columns
+        metadataonly=True
+    )[1].column_names
 
     for _, scenario in jobs.iterrows():
         if scenario['condition'] and (
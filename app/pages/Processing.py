@@ -34,11 +34,16 @@ from app.modules.processing_viewer import (
     get_studies_names,
 )
 from app.modules.utils import (
+    PlantillaSpec,
+    SavSession,
     upload_study_to_gcs,
     _to_show,
     try_download,
     get_temp_file,
+    release_temp_file,
+    temp_file,
     read_sav_metadata,
+    parse_value_labels,
     write_temp_sav,
     get_countries,
     get_study_config,
@@ -105,6 +110,8 @@ def main():
                         final_df, metadata = generate_open_ended_db(
                             results, temp_file_name_sav
                         )
+                        release_temp_file(temp_file_name_xlsx)
+                        release_temp_file(temp_file_name_sav)
 
                         final_db = write_temp_sav(final_df, metadata)
                         st.success("Database preprocessed successfully.")
@@ -165,6 +172,8 @@ def main():
                 and uploaded_file_process_xlsx
                 and uploaded_file_process_sav
             ) or (uploaded_file_process_xlsx and uploaded_file_process_sav):
+                sav_session = SavSession(uploaded_file_process_sav)
+                plantilla = PlantillaSpec(uploaded_file_process_xlsx)
                 with st.spinner("Processing Code SPSS..."):
                     name_ruta = "*" + ruta + ".\n"
                 col1, col2 = st.columns(2)
@@ -173,28 +182,28 @@ def main():
                     with col1.container(height=250):
                         st.code(
                             getPreProcessCode(
-                                uploaded_file_process_sav,
-                                uploaded_file_process_xlsx,
+                                sav_session,
+                                plantilla,
                                 uploaded_file_process_xlsx_LC,
                             ),
                             line_numbers=True,
                         )
                     warning = ""
                     if checkPreProcessCodeUnique(
-                        uploaded_file_process_sav, uploaded_file_process_xlsx
+                        sav_session, plantilla
                     )[0]:
                         if warning == "":
                             warning += "Run PreProcess Code only one time"
                         warning += " --- Code with Inverse code"
                     if checkPreProcessCodeUnique(
-                        uploaded_file_process_sav, uploaded_file_process_xlsx
+                        sav_session, plantilla
                     )[1]:
                         if warning == "":
                             warning += "Run PreProcess Code only one time"
                         warning += " --- Code with Custom Scales code"
                     warning += getWarning(
-                        uploaded_file_process_sav,
-                        uploaded_file_process_xlsx,
+                        sav_session,
+                        plantilla,
                         uploaded_file_process_xlsx_LC,
                     )
                     if warning != "":
@@ -204,7 +213,7 @@ def main():
                     with col2.container(height=250):
                         st.code(
                             getSegmentCode(
-                                uploaded_file_process_sav, uploaded_file_process_xlsx
+                                sav_session, plantilla
                             ),
                             line_numbers=True,
                         )
@@ -219,8 +228,8 @@ def main():
                             warning = ""
                             with st.spinner("Processing Code SPSS..."):
                                 process_code, warning = getProcessCode2(
-                                    uploaded_file_process_sav,
-                                    uploaded_file_process_xlsx,
+                                    sav_session,
+                                    plantilla,
                                     uploaded_file_process_xlsx_LC,
                                     checkinclude,
                                     rutaarchivo=ruta,
@@ -228,14 +237,14 @@ def main():
                                 st.code(
                                     name_ruta
                                     + getPreProcessCode(
-                                        uploaded_file_process_sav,
-                                        uploaded_file_process_xlsx,
+                                        sav_session,
+                                        plantilla,
                                         uploaded_file_process_xlsx_LC,
                                     )
                                     + "\n"
                                     + getSegmentCode(
-                                        uploaded_file_process_sav,
-                                        uploaded_file_process_xlsx,
+                                        sav_session,
+                                        plantilla,
                                     )
                                     + "\nDATASET ACTIVATE ConjuntoDatos1.\n"
                                     + process_code,
@@ -252,23 +261,23 @@ def main():
                         if penaltys_button:
                             warning = ""
                             with st.spinner("Penaltys Code SPSS..."):
-                                if getPenaltysCode(uploaded_file_process_xlsx) != "":
+                                if getPenaltysCode(plantilla) != "":
                                     st.code(
                                         name_ruta
                                         + getPreProcessCode(
-                                            uploaded_file_process_sav,
-                                            uploaded_file_process_xlsx,
+                                            sav_session,
+                                            plantilla,
                                             uploaded_file_process_xlsx_LC,
                                         )
                                         + "\n"
                                         + getSegmentCode(
-                                            uploaded_file_process_sav,
-                                            uploaded_file_process_xlsx,
+                                            sav_session,
+                                            plantilla,
                                         )
                                         + "\nDATASET ACTIVATE ConjuntoDatos1.\n"
                                         + getPenaltysCode2(
-                                            uploaded_file_process_sav,
-                                            uploaded_file_process_xlsx,
+                                            sav_session,
+                                            plantilla,
                                             rutaarchivo=ruta,
                                         ),
                                         line_numbers=True,
@@ -287,8 +296,8 @@ def main():
                             with st.spinner("Cruces Code SPSS..."):
                                 if (
                                     getCruces(
-                                        uploaded_file_process_sav,
-                                        uploaded_file_process_xlsx,
+                                        sav_session,
+                                        plantilla,
                                         checkinclude,
                                     )
                                     != ""
@@ -296,19 +305,19 @@ def main():
                                     st.code(
                                         name_ruta
                                         + getPreProcessCode(
-                                            uploaded_file_process_sav,
-                                            uploaded_file_process_xlsx,
+                                            sav_session,
+                                            plantilla,
                                             uploaded_file_process_xlsx_LC,
                                         )
                                         + "\n"
                                         + getSegmentCode(
-                                            uploaded_file_process_sav,
-                                            uploaded_file_process_xlsx,
+                                            sav_session,
+                                            plantilla,
                                         )
                                         + "\nDATASET ACTIVATE ConjuntoDatos1.\n"
                                         + getCruces2(
-                                            uploaded_file_process_sav,
-                                            uploaded_file_process_xlsx,
+                                            sav_session,
+                                            plantilla,
                                             checkinclude,
                                             rutaarchivo=ruta,
                                         ),
@@ -317,24 +326,22 @@ def main():
                                 else:
                                     st.code("No Cruces", line_numbers=True)
             elif process_button and uploaded_file_process_sav:
+                sav_session = SavSession(uploaded_file_process_sav)
                 col1, col2 = st.columns(2)
                 with col1:
                     col1.markdown("Preprocess code:")
                     with col1.container(height=250):
                         st.code(
-                            getPreProcessCode2(uploaded_file_process_sav),
+                            getPreProcessCode2(sav_session),
                             line_numbers=True,
                         )
                 with col2:
                     col2.markdown("Text for Plantilla:")
                     with col2.container(height=250):
-                        st.code(
-                            getVarsForPlantilla(uploaded_file_process_sav)[0],
-                            line_numbers=True,
+                        text_plantilla, results_plantilla = getVarsForPlantilla(
+                            sav_session
                         )
-                        results_plantilla = getVarsForPlantilla(
-                            uploaded_file_process_sav
-                        )[1]
+                        st.code(text_plantilla, line_numbers=True)
         try:
             try_download(
                 "Download Stadistics Plantilla",
@@ -552,8 +559,8 @@ def main():
         )
 
         if uploaded_file_sav:
-            temp_file_name = get_temp_file(uploaded_file_sav)
-            metadata_df = read_sav_metadata(temp_file_name)
+            with temp_file(uploaded_file_sav) as temp_file_name:
+                metadata_df = read_sav_metadata(temp_file_name)
             with st.expander("Database Metadata"):
                 st.data_editor(metadata_df)
 
@@ -700,7 +707,9 @@ def main():
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("##### Add references")
-                references_metadata = eval(metadata_df.loc["REF.1", "values"])
+                references_metadata = parse_value_labels(
+                    metadata_df.loc["REF.1", "values"]
+                )
 
                 current_references = get_references(category, subcategory, company)
 
@@ -1,5 +1,3 @@
-import ast
-
 import pandas as pd
 
 import streamlit as st
@@ -11,21 +9,24 @@ from app.modules.processing_viewer import (
     get_questions,
     get_study_countries,
     get_studies_names,
-    download_studies_data,
+    load_studies_data,
     combine_metadata,
     combine_dictionaries,
     filter_df,
     get_cross_questions,
+    build_count_table,
     build_statistical_significance_df,
+    get_db_key,
+    get_filter_index,
+    get_studies_key,
     create_html_table,
+    get_html_table_pages,
     remap_references,
 )
 from app.modules.processing import get_references
 from app.modules.utils import (
     _to_show,
-    read_sav_db,
-    read_sav_metadata,
-    load_json,
+    parse_value_labels,
     get_countries,
     get_companies_blobs,
 )
@@ -95,7 +96,7 @@ def main():
     if not selected_studies:
         return
 
-    studies_data = download_studies_data(
+    studies_data = load_studies_data(
         product_category,
         product_subcategory,
         selected_country_code,
@@ -112,16 +113,14 @@ def main():
         studies_configs = []
         for col, (study, data) in zip(sav_cols, studies_data.items()):
             col.markdown(f"### {study}")
-            sav_db = read_sav_db(data["sav"])
-            metadata_df = read_sav_metadata(data["sav"])
             sav_db, metadata_df = remap_references(
-                study, sav_db, metadata_df, current_references
+                study, data["db"], data["metadata"], current_references
             )
             studies_dbs.append(sav_db)
-            studies_configs.append(load_json(data["json"])["config"])
+            studies_configs.append(data["config"])
             metadata_df["answer_options_count"] = (
                 metadata_df["values"]
-                .apply(lambda x: len(ast.literal_eval(x)) if x else 0)
+                .apply(lambda x: len(parse_value_labels(x) or {}))
                 .astype(int)
             )
             col.dataframe(metadata_df, use_container_width=True)
@@ -139,7 +138,12 @@ def main():
 
     fields = st.columns(len(config["filters"]))
 
-    db = filter_df(fields, config["filters"], metadata_df, db)
+    filter_index = get_filter_index(
+        db,
+        get_studies_key(studies_data, current_references),
+        tuple(filter["variable"] for filter in config["filters"]),
+    )
+    mask = filter_df(fields, config["filters"], metadata_df, filter_index)
     if "filter_REF.1" in st.session_state:
         references = st.session_state["filter_REF.1"]
         if not references:
@@ -147,7 +151,7 @@ def main():
     else:
         references = []
 
-    if db.empty:
+    if not mask.any():
         st.warning("The filters you applied to the database, return no records.")
         return
 
@@ -245,22 +249,43 @@ def main():
 
     if question_groups and selected_questions and selected_cross_questions:
         try:
-            df = build_statistical_significance_df(
+            # Counts only depend on the data and the selection; significance
+            # and formatting are recomputed on top of the cached counts
+            count_table = build_count_table(
                 db,
+                mask,
                 metadata_df,
+                get_db_key(studies_data, current_references, config["filters"]),
                 selected_cross_questions,
                 selected_questions,
                 config,
                 questions_by_group,
                 view_type=view_type,
-                show_question_text=show_question_text,
                 references=references,
             )
+            df = build_statistical_significance_df(
+                count_table,
+                view_type=view_type,
+                show_question_text=show_question_text,
+            )
             if by_reference and view_type == "Detailed":
                 # remove columns that contain "TOTAL" in any of the header levels
-                df = df.loc[:, ~df.columns.get_level_values(1).str.contains("TOTAL")]
+                df = df.filter_columns(
+                    ~df.columns.get_level_values(1).str.contains("TOTAL")
+                )
+
+            # Large tables are shown a page of rows at a time
+            n_pages = get_html_table_pages(df)
+            page = None
+            if n_pages > 1:
+                page = (
+                    st.number_input(
+                        f"Page (of {n_pages})", min_value=1, max_value=n_pages, step=1
+                    )
+                    - 1
+                )
 
-            html_table = create_html_table(df, decimal_precision)
+            html_table = create_html_table(df, decimal_precision, page)
 
             st.markdown(
                 '<div style="overflow-x: auto; margin-bottom: 1.5rem;">{}</div>'.format(
@@ -269,7 +294,9 @@ def main():
                 unsafe_allow_html=True,
             )
 
-            # Encode the HTML content as UTF-8 bytes
+            # Encode the HTML content as UTF-8 bytes, always the whole table
+            if page is not None:
+                html_table = create_html_table(df, decimal_precision)
             html_bytes = html_table.encode("utf-8")
 
             st.download_button(
@@ -11,10 +11,11 @@ from app.modules.processor import (
 )
 from app.modules.utils import (
     get_temp_file,
+    release_temp_file,
+    temp_file,
     write_multiple_df_bytes,
     write_temp_sav,
-    split_sav_file_to_chunks,
-    create_zip_with_chunks,
+    split_sav_file_to_zip,
     try_download,
     join_sav,
 )
@@ -155,9 +156,8 @@ def main():
             "Upload `.xlsx` file", type=["xlsx"], key="open_ended_questions_xlsx"
         )
         if open_ended_questions_xlsx:
-            temp_file_name_xlsx = get_temp_file(open_ended_questions_xlsx, ".xlsx")
-
-            df = pd.read_excel(temp_file_name_xlsx)
+            with temp_file(open_ended_questions_xlsx, ".xlsx") as temp_file_name_xlsx:
+                df = pd.read_excel(temp_file_name_xlsx)
             df[df.columns[0]] = df[df.columns[0]].astype(str)
 
             config = {
@@ -193,7 +193,7 @@ def main():
         try:
             st.download_button(
                 label="Download transformation",
-                data=transformed.getvalue(),
+                data=transformed,
                 file_name="open_ended_transformed.xlsx",
                 mime="application/xlsx",
                 type="primary",
@@ -227,13 +227,15 @@ def main():
                 final_df, metadata = generate_open_ended_db(
                     temp_file_name_xlsx, temp_file_name_sav
                 )
+                release_temp_file(temp_file_name_xlsx)
+                release_temp_file(temp_file_name_sav)
 
                 final_db = write_temp_sav(final_df, metadata)
 
         try:
             st.download_button(
                 label="Download transformation",
-                data=final_db.getvalue(),
+                data=final_db,
                 file_name="open_ended_coded_transformed.sav",
                 mime="application/sav",
                 type="primary",
@@ -283,11 +285,10 @@ def main():
 
             if split_file and number_of_records and split_database:
                 original_file_name = split_file.name.split(".")[0]
-                temp_split_file = get_temp_file(split_file)
-                chunks, meta = split_sav_file_to_chunks(
-                    temp_split_file, number_of_records
-                )
-                zip_buffer = create_zip_with_chunks(chunks, meta, original_file_name)
+                with temp_file(split_file) as temp_split_file:
+                    zip_buffer = split_sav_file_to_zip(
+                        temp_split_file, original_file_name, number_of_records
+                    )
             elif not split_file and split_database:
                 st.error("Upload all required files.")
 
@@ -317,6 +318,8 @@ def main():
                 temp_original_db_file = get_temp_file(original_db)
                 temp_join_files = [get_temp_file(join_file) for join_file in join_files]
                 joined_database = join_sav(temp_original_db_file, temp_join_files)
+                for temp_file_name in [temp_original_db_file, *temp_join_files]:
+                    release_temp_file(temp_file_name)
             elif not (original_db and join_files) and join_databases:
                 st.error("Upload all required files.")
 
@@ -49,7 +49,7 @@ def main():
         # Offer the sav file for download
         st.download_button(
             label="Generate Transformation",
-            data=results.getvalue(),
+            data=results,
             file_name=f"BBDD NORMAS - {study}.sav",
             mime="application/sav",
         )
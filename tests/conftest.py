@@ -0,0 +1,12 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# `app.cloud.firestore` opens a Firestore client on import, which needs GCP
+# credentials; the modules under test only import its helpers
+firestore_stub = types.ModuleType("app.cloud.firestore")
+firestore_stub.create_document = lambda *args, **kwargs: None
+firestore_stub.get_document = lambda *args, **kwargs: None
+sys.modules.setdefault("app.cloud.firestore", firestore_stub)
@@ -0,0 +1,52 @@
+from io import BytesIO
+
+import pandas as pd
+import pyreadstat
+from openpyxl import Workbook
+
+from app.modules.processor import getCloneCodeVars
+from app.modules.utils import PlantillaSpec, SavSession
+
+
+def make_plantilla() -> BytesIO:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["EDAD", "SEXO", "P5A"])
+    sheet.append(["Edad", "Sexo", "Marcas"])
+    sheet.append(["Edad en años", "Género", "Marcas usadas"])
+
+    file = BytesIO()
+    workbook.save(file)
+    file.seek(0)
+    return file
+
+
+def make_sav(tmp_path) -> BytesIO:
+    df = pd.DataFrame(
+        {"EDAD": [30.0], "SEXO": [1.0], "P5A1": [1.0], "P5A2": [2.0], "P6": [1.0]}
+    )
+    path = str(tmp_path / "study.sav")
+    pyreadstat.write_sav(df, path, column_labels=list(df.columns))
+    with open(path, "rb") as f:
+        return BytesIO(f.read())
+
+
+def test_col_vars_list_matches_melted_header():
+    file = make_plantilla()
+    expected = pd.melt(
+        pd.read_excel(file, nrows=2), var_name="colVars", value_name="colVarsNames"
+    ).drop(0)
+
+    plantilla = PlantillaSpec(file)
+
+    pd.testing.assert_frame_equal(plantilla.col_vars_list, expected)
+    pd.testing.assert_series_equal(plantilla.col_vars, expected["colVars"])
+
+
+def test_get_clone_code_vars(tmp_path):
+    syntax = getCloneCodeVars(make_sav(tmp_path), make_plantilla())
+
+    assert "\nDELETE VARIABLES COL_EDAD COL_SEXO COL_SEXO.\n" in syntax
+    assert "/MCGROUP NAME=$COL_P5 LABEL='Marcas'\n    VARIABLES=P5A1 P5A2 .\n" in syntax
+    assert "\nVARIABLE LABELS COL_SEXO 'Sexo'." in syntax
+    assert "\nVARIABLE LABELS COL_EDAD 'Edad en años'." in syntax